@@ -0,0 +1,103 @@
+import threading
+from abc import ABC, abstractmethod
+from typing import Any, Iterable, Optional
+
+
+class CacheStats:
+    """
+    Thread safe counters of a cache backend
+    """
+
+    def __init__(self):
+        self.__lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.errors = 0
+
+    def add(self, hits: int = 0, misses: int = 0, evictions: int = 0, errors: int = 0) -> None:
+        with self.__lock:
+            self.hits += hits
+            self.misses += misses
+            self.evictions += evictions
+            self.errors += errors
+
+    def as_dict(self) -> dict:
+        with self.__lock:
+            requests = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "errors": self.errors,
+                "hit_ratio": self.hits / requests if requests else 0.0,
+            }
+
+
+class CacheBackend(ABC):
+    """
+    Key-value cache with a time to live per entry.
+    Keys are strings, values are any picklable objects except None, which stands for a missing entry.
+    A backend never raises because the cache is unavailable: it answers with misses and counts the errors.
+    """
+
+    def __init__(self, name: str, ttl: float):
+        """
+        :param ttl: default time to live of entries, seconds
+        """
+        self.name = name
+        self.ttl = ttl
+        self.counters = CacheStats()
+
+    #############
+    # MANY
+    #############
+
+    @abstractmethod
+    def get_many(self, keys: list[str]) -> list[Optional[Any]]:
+        """
+        :return: values (or None) in the order of keys
+        """
+
+    @abstractmethod
+    def set_many(self, items: dict[str, Any], ttl: Optional[float] = None) -> None:
+        """
+        :param ttl: time to live of the entries, seconds; None for the default of the backend
+        """
+
+    @abstractmethod
+    def delete_many(self, keys: Iterable[str]) -> None:
+        pass
+
+    @abstractmethod
+    def clear(self) -> None:
+        pass
+
+    #############
+    # ONE
+    #############
+
+    def get(self, key: str) -> Optional[Any]:
+        return self.get_many([key])[0]
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        self.set_many({key: value}, ttl)
+
+    def delete(self, key: str) -> None:
+        self.delete_many([key])
+
+    #############
+    # STATS
+    #############
+
+    def stats(self) -> dict:
+        return {
+            "name": self.name,
+            "backend": self.kind(),
+            "ttl": self.ttl,
+            **self.counters.as_dict(),
+        }
+
+    @abstractmethod
+    def kind(self) -> str:
+        pass
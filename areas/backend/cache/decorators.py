@@ -0,0 +1,32 @@
+from functools import wraps
+from typing import Callable, Optional
+
+from cache.backend import CacheBackend
+
+
+def cached(backend: CacheBackend, key: Callable[..., str], ttl: Optional[float] = None):
+    """
+    Cache results of a function in `backend`, under the key built from the arguments of each call.
+    None results and exceptions are not cached.
+
+        @cached(principal_cache.backend, key=lambda self, _id: principal_cache.key(_id))
+        def get_user_from_db_by_id(self, _id: UUID) -> User: ...
+
+    :param key: builds the key from the arguments of the function
+    :param ttl: time to live of the results, seconds; None for the default of the backend
+    """
+
+    def decorator(function):
+        @wraps(function)
+        def decorated(*args, **kwargs):
+            cache_key = key(*args, **kwargs)
+            result = backend.get(cache_key)
+            if result is None:
+                result = function(*args, **kwargs)
+                if result is not None:
+                    backend.set(cache_key, result, ttl)
+            return result
+
+        return decorated
+
+    return decorator
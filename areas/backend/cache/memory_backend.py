@@ -0,0 +1,67 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Iterable, Optional
+
+from cache.backend import CacheBackend
+
+
+class MemoryCacheBackend(CacheBackend):
+    """
+    Thread safe in-process cache with a bounded number of entries (LRU) and time to live.
+    Values are kept as they are, callers must not modify what they put or get.
+    """
+
+    def __init__(self, name: str, max_size: int, ttl: float):
+        super().__init__(name, ttl)
+        self.max_size = max_size
+
+        self.__items: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+        self.__lock = threading.Lock()
+
+    def get_many(self, keys: list[str]) -> list[Optional[Any]]:
+        now = time.monotonic()
+        values = []
+        with self.__lock:
+            for key in keys:
+                item = self.__items.get(key)
+                if item is None or item[0] < now:
+                    if item is not None:
+                        del self.__items[key]
+                    values.append(None)
+                else:
+                    self.__items.move_to_end(key)
+                    values.append(item[1])
+
+        hits = sum(value is not None for value in values)
+        self.counters.add(hits=hits, misses=len(values) - hits)
+        return values
+
+    def set_many(self, items: dict[str, Any], ttl: Optional[float] = None) -> None:
+        expires = time.monotonic() + (self.ttl if ttl is None else ttl)
+        evictions = 0
+        with self.__lock:
+            for key, value in items.items():
+                self.__items[key] = (expires, value)
+                self.__items.move_to_end(key)
+            while len(self.__items) > self.max_size:
+                self.__items.popitem(last=False)
+                evictions += 1
+        self.counters.add(evictions=evictions)
+
+    def delete_many(self, keys: Iterable[str]) -> None:
+        with self.__lock:
+            for key in keys:
+                self.__items.pop(key, None)
+
+    def clear(self) -> None:
+        with self.__lock:
+            self.__items.clear()
+
+    def stats(self) -> dict:
+        with self.__lock:
+            size = len(self.__items)
+        return {**super().stats(), "size": size, "max_size": self.max_size}
+
+    def kind(self) -> str:
+        return "memory"
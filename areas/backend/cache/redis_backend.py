@@ -0,0 +1,123 @@
+import pickle
+from typing import Any, Iterable, Optional
+
+import redis
+
+from cache.backend import CacheBackend
+
+_SCAN_COUNT = 1000
+_GLOB_SPECIAL = str.maketrans({char: '\\' + char for char in '*?[]\\'})
+
+
+class RedisCacheBackend(CacheBackend):
+    """
+    Cache in a Redis server, shared by every process using the same url and prefix.
+    Values are pickled, so only trusted servers must be used. Entries are evicted by the server,
+    these evictions are not counted here.
+    """
+
+    def __init__(self, name: str, url: str, ttl: float, prefix: Optional[str] = None,
+                 pool_size: int = 16, timeout: float = 1.0):
+        """
+        :param url: redis://[[user]:password@]host[:port][/db]
+        :param prefix: prefix of the keys in the server, the name of the cache by default
+        :param pool_size: maximum number of connections, callers wait up to `timeout` for a free one
+        :param timeout: connect, read and pool wait timeout, seconds
+        """
+        super().__init__(name, ttl)
+        self.prefix = f"{name}:" if prefix is None else prefix
+        self.__pool = redis.BlockingConnectionPool.from_url(
+            url, max_connections=pool_size, timeout=timeout,
+            socket_timeout=timeout, socket_connect_timeout=timeout,
+        )
+        self.__client = redis.Redis(connection_pool=self.__pool)
+
+    #############
+    # CACHE
+    #############
+
+    def get_many(self, keys: list[str]) -> list[Optional[Any]]:
+        if not keys:
+            return []
+        try:
+            reply = self.__client.mget([self.__key(key) for key in keys])
+        except (redis.RedisError, OSError):
+            self.counters.add(misses=len(keys), errors=1)
+            return [None] * len(keys)
+
+        values = [None if data is None else self.__loads(data) for data in reply]
+        hits = sum(value is not None for value in values)
+        self.counters.add(hits=hits, misses=len(values) - hits)
+        return values
+
+    def set_many(self, items: dict[str, Any], ttl: Optional[float] = None) -> None:
+        if not items:
+            return
+        milliseconds = max(1, int((self.ttl if ttl is None else ttl) * 1000))
+        try:
+            pipeline = self.__client.pipeline(transaction=False)
+            for key, value in items.items():
+                pipeline.set(self.__key(key), pickle.dumps(value, pickle.HIGHEST_PROTOCOL), px=milliseconds)
+            pipeline.execute()
+        except Exception:
+            # Server errors and values that can't be pickled alike: the entries are just not cached
+            self.counters.add(errors=1)
+
+    def delete_many(self, keys: Iterable[str]) -> None:
+        keys = [self.__key(key) for key in keys]
+        if not keys:
+            return
+        try:
+            self.__client.delete(*keys)
+        except (redis.RedisError, OSError):
+            self.counters.add(errors=1)
+
+    def clear(self) -> None:
+        """
+        Delete every key with the prefix of this cache
+        """
+        try:
+            batch = []
+            for key in self.__client.scan_iter(match=self.prefix.translate(_GLOB_SPECIAL) + '*', count=_SCAN_COUNT):
+                batch.append(key)
+                if len(batch) == _SCAN_COUNT:
+                    self.__client.delete(*batch)
+                    batch = []
+            if batch:
+                self.__client.delete(*batch)
+        except (redis.RedisError, OSError):
+            self.counters.add(errors=1)
+
+    def stats(self) -> dict:
+        connection = self.__pool.connection_kwargs
+        return {
+            **super().stats(),
+            "server": f"{connection.get('host', 'localhost')}:{connection.get('port', 6379)}/{connection.get('db', 0)}",
+            "prefix": self.prefix,
+        }
+
+    def kind(self) -> str:
+        return "redis"
+
+    def close(self) -> None:
+        """
+        Close the connections of the pool
+        """
+        self.__pool.disconnect()
+
+    #############
+    # KEYS AND VALUES
+    #############
+
+    def __key(self, key: str) -> str:
+        return self.prefix + key
+
+    def __loads(self, data: bytes) -> Optional[Any]:
+        """
+        :return: the value, or None if it can't be unpickled, e.g. it was written by another version of the code
+        """
+        try:
+            return pickle.loads(data)
+        except Exception:
+            self.counters.add(errors=1)
+            return None
@@ -1,5 +1,39 @@
+import os
+
 # Public MinIO config
 
 endpoint= "play.min.io"
 access_key = "Q3AM3UQ867SPQQA43P2F"
-secret_key = "zuf+tfteSlswRu7BJ86wekitnifILbZam1KYY3TG"
\ No newline at end of file
+secret_key = "zuf+tfteSlswRu7BJ86wekitnifILbZam1KYY3TG"
+
+# Lifetime of presigned upload and download URLs, seconds
+presigned_url_expires = 15 * 60
+# Storage objects nothing references any more (blobs of replaced versions, unfinalized uploads) are removed
+# after this grace period, which outlasts presigned URLs and reads already under way; seconds
+storage_grace_period = 4 * presigned_url_expires
+# Interval of the sweep removing them in each process, see repository.storage_sweeper; seconds
+storage_sweep_interval = 10 * 60
+# Key signing the tokens that bind a presigned upload to its user and document
+upload_token_secret = os.environ.get("UPLOAD_TOKEN_SECRET", "UPLOAD-TOKEN-SECRET-KEY")
+
+# Threads serving requests in each worker process (e.g. gunicorn --threads), sizes the connection pools below
+worker_threads = int(os.environ.get("WORKER_THREADS", 16))
+
+# Storage connections: pool of keep-alive connections shared by the process, one per worker thread by default
+storage_pool_size = int(os.environ.get("STORAGE_POOL_SIZE", worker_threads))
+# Storage timeouts, seconds
+storage_connect_timeout = 5
+storage_read_timeout = 60
+
+# Local read-through cache of document content, see repository.cache.blob_cache; sizes in bytes.
+# Blobs up to the memory blob size are kept in memory, larger ones up to the disk blob size in the directory.
+blob_cache_directory = "cache/blobs"
+blob_cache_memory_size = 64 * 1024 * 1024
+blob_cache_memory_blob_size = 1024 * 1024
+blob_cache_disk_size = 2 * 1024 * 1024 * 1024
+blob_cache_disk_blob_size = 256 * 1024 * 1024
+
+# Backend of the principal and workspace caches, see repository.cache.backends:
+# "memory" keeps entries in each process, "redis" shares them between workers through the server at cache_redis_url
+cache_backend = "memory"
+cache_redis_url = "redis://localhost:6379/0"
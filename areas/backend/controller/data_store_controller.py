@@ -37,6 +37,9 @@ class DataStoreController:
         ==================
     """
 
+    def get_cache_stats(self) -> list[dict]:
+        return self.data_store_service.get_cache_stats()
+
     #############
     # SEARCH
     #############
@@ -57,6 +60,18 @@ class DataStoreController:
     def get_workspaces_open(self) -> list[WorkSpace]:
         return self.data_store_service.get_workspaces_open()
 
+    def get_workspaces_summary(self, user_mail: str, archived: bool) -> list[tuple[WorkSpace, int]]:
+        return self.data_store_service.get_workspaces_summary(user_mail, archived)
+
+    def get_workspaces_access_summary(self, user_mail: str) -> list[tuple[WorkSpace, AccessType, int]]:
+        return self.data_store_service.get_workspaces_access_summary(user_mail)
+
+    def get_workspaces_open_summary(self) -> list[tuple[WorkSpace, int]]:
+        return self.data_store_service.get_workspaces_open_summary()
+
+    def get_workspace_revision(self, user_mail: str, space_id: UUID, archived: bool = False) -> int:
+        return self.data_store_service.get_workspace_revision(user_mail, space_id, archived)
+
     def get_workspace_by_id(self, user_mail: str, space_id: UUID, archived) -> Optional[tuple[str, str, WorkSpace]]:
         return self.data_store_service.get_workspace_by_id(user_mail, space_id, archived)
 
@@ -70,8 +85,14 @@ class DataStoreController:
     def delete_user_workspace(self, space_id: UUID):
         self.data_store_service.delete_user_workspace(space_id)
 
-    def create_workspace(self, user_mail: str, workspace: WorkSpace, document_name: str, document_data: str, task: str):
-        return self.data_store_service.create_workspace(user_mail, workspace, document_name, document_data, task)
+    def create_workspace(self, user_mail: str, workspace: WorkSpace, document_name: str,
+                         document_data: str | BinaryIO, task: str, document_length: int = -1):
+        return self.data_store_service.create_workspace(user_mail, workspace, document_name, document_data, task,
+                                                        document_length)
+
+    def copy_workspace(self, user_mail: str, workspace: WorkSpace, document_name: str,
+                       source_document_id: UUID, task: str):
+        return self.data_store_service.copy_workspace(user_mail, workspace, document_name, source_document_id, task)
 
     def get_all_workspaces(self, page: int, limit: int, deleted: bool) -> list[(str, WorkSpace)]:
         return self.data_store_service.get_all_workspaces(page, limit, deleted)
@@ -131,27 +152,39 @@ class DataStoreController:
     # Create Document
 
     def add_new_document(self, user_email: str, workspace_id: UUID, new_document_name: str, new_document_type: str,
-                     new_document_data: str) -> UUID:
+                     new_document_data: str | BinaryIO, length: int = -1) -> UUID:
         return self.data_store_service.add_new_document(user_email, workspace_id, new_document_name, new_document_type,
-                                                    new_document_data)
-
-    def download_item(self, user_mail: str, item_id: UUID) -> [BinaryIO, Document]:
-        return self.data_store_service.download_item(user_mail=user_mail, item_id=item_id)
+                                                    new_document_data, length)
 
     def get_file_by_id(self, user_mail: str, item_id: UUID) -> Document:
         return self.data_store_service.get_file_by_id(user_mail, item_id)
 
-    def get_binary_file_from_cloud_by_id(self, file_name: str):
-        return self.data_store_service.get_binary_file_from_cloud_by_id(file_name)
+    def get_binary_file_from_cloud_by_id(self, file_name: str, offset: int = 0, length: int = 0):
+        return self.data_store_service.get_binary_file_from_cloud_by_id(file_name, offset, length)
+
+    def get_file_size_from_cloud(self, file_name: str) -> int:
+        return self.data_store_service.get_file_size_from_cloud(file_name)
 
-    def get_base64_file_from_cloud_by_id(self, file_name: str):
-        return self.data_store_service.get_base64_file_from_cloud_by_id(f"{file_name}")
+    def get_document_object_name(self, document_id: UUID) -> str:
+        return self.data_store_service.get_document_object_name(document_id)
 
     def rename_item(self, user_mail: str, item_id: UUID, new_name: str):
         return self.data_store_service.rename_item_by_id(item_id=item_id, user_mail=user_mail, new_name=new_name)
 
-    def update_document(self, user_mail: str, document_id: UUID, document_name: str, new_file_data: str) -> UUID:
-        return self.data_store_service.update_document(user_mail, document_id, document_name, new_file_data)
+    def update_document(self, user_mail: str, document_id: UUID, document_name: str, new_file_data: str | BinaryIO,
+                        length: int = -1) -> UUID:
+        return self.data_store_service.update_document(user_mail, document_id, document_name, new_file_data, length)
+
+    # Presigned URLs
+
+    def get_presigned_download_url(self, user_mail: str, document_id: UUID) -> str:
+        return self.data_store_service.get_presigned_download_url(user_mail, document_id)
+
+    def get_presigned_upload_url(self, user_mail: str, document_id: UUID) -> tuple[str, str]:
+        return self.data_store_service.get_presigned_upload_url(user_mail, document_id)
+
+    def finalize_document_upload(self, user_mail: str, document_id: UUID, token: str, document_name: str) -> UUID:
+        return self.data_store_service.finalize_document_upload(user_mail, document_id, token, document_name)
 
     #############
     # LEGACY
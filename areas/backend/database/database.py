@@ -1,6 +1,9 @@
-from typing import List
+import re
+import uuid
+from typing import Any, List
 
 from flask import current_app
+from sqlalchemy.dialects import postgresql
 from sqlalchemy.orm import Mapped
 
 from app_db import get_current_db
@@ -9,6 +12,19 @@ from core.role import Role
 
 db = get_current_db(current_app)
 
+# UUID keys are native `uuid` on PostgreSQL and stay text on SQLite; values are passed around as strings
+UUIDString = db.String().with_variant(postgresql.UUID(as_uuid=False), 'postgresql')
+
+_UUID_TEXT = re.compile(r'[0-9a-fA-F]{8}-?[0-9a-fA-F]{4}-?[0-9a-fA-F]{4}-?[0-9a-fA-F]{4}-?[0-9a-fA-F]{12}')
+
+
+def is_uuid(value: Any) -> bool:
+    """
+    Whether a value can be compared with UUIDString columns. PostgreSQL rejects a statement with any other value
+    and fails the whole transaction, so malformed ids from requests must be turned away before querying.
+    """
+    return isinstance(value, uuid.UUID) or (isinstance(value, str) and _UUID_TEXT.fullmatch(value) is not None)
+
 
 class DepartmentModel(db.Model):
     __tablename__ = 'department'
@@ -20,9 +36,13 @@ class DepartmentModel(db.Model):
 
 class UserModel(db.Model):
     __tablename__ = 'user'
-    __table_args__ = {'extend_existing': True}
+    __table_args__ = (
+        db.Index('uq_user_email', 'email', unique=True),
+        db.Index('ix_user_username', 'username'),
+        {'extend_existing': True},
+    )
 
-    id = db.Column('user_id', db.String, primary_key=True)
+    id = db.Column('user_id', UUIDString, primary_key=True)
 
     email = db.Column(db.String(100))
     passwordHash = db.Column(db.String(70))
@@ -36,66 +56,93 @@ class DocumentModel(db.Model):
     __tablename__ = "document"
     __table_args__ = {'extend_existing': True}
 
-    id = db.Column('document_id', db.String, primary_key=True)
+    id = db.Column('document_id', UUIDString, primary_key=True)
 
     name = db.Column(db.String)
     task_id = db.Column(db.String)
     modification_time = db.Column(db.DateTime)
     file_id = db.Column(db.String)
+    # Content of the document, see BlobModel; NULL for documents stored as "<document_id>_<name>" objects
+    blob_id = db.Column(db.String(64))
+
+
+class BlobModel(db.Model):
+    """
+    Immutable file content stored once as "blobs/<id>" and shared by all documents with the same content.
+    The id is the SHA-256 of the content, the upload id for content uploaded with a presigned URL,
+    or the id of the document for content moved from a "<document_id>_<name>" object (see _migrate_legacy_object).
+    """
+    __tablename__ = "blob"
+    __table_args__ = {'extend_existing': True}
+
+    id = db.Column('blob_id', db.String(64), primary_key=True)
+
+    size = db.Column(db.BigInteger)
+    # Number of branches whose document has this content. Only the document of a branch can be read, older
+    # versions and documents of deleted branches can't, so blobs left at 0 are removed,
+    # see DataStoreStorageRepository.collect_unreferenced_blobs
+    ref_count = db.Column(db.Integer, nullable=False, default=0)
+    # When ref_count last dropped to 0, NULL while referenced
+    released_at = db.Column(db.DateTime)
 
 
 class RequestModel(db.Model):
     __tablename__ = "request"
     __table_args__ = {'extend_existing': True}
 
-    id = db.Column('request_id', db.String, primary_key=True)
+    id = db.Column('request_id', UUIDString, primary_key=True)
 
     title = db.Column(db.String, nullable=False)
     description = db.Column(db.String, nullable=True)
-    status = db.Column(db.Integer)
+    status = db.Column(db.SmallInteger)
 
-    source_branch_id = db.Column(db.String, db.ForeignKey("branch.branch_id"))
-    target_branch_id = db.Column(db.String, db.ForeignKey("branch.branch_id"))
+    source_branch_id = db.Column(UUIDString, db.ForeignKey("branch.branch_id"), index=True)
+    target_branch_id = db.Column(UUIDString, db.ForeignKey("branch.branch_id"), index=True)
 
 
 class BranchModel(db.Model):
     __tablename__ = "branch"
     __table_args__ = {'extend_existing': True}
 
-    id = db.Column('branch_id', db.String, primary_key=True)
+    id = db.Column('branch_id', UUIDString, primary_key=True)
 
     name = db.Column('branch_name', db.String)
     parent_branch_id = db.Column(db.String)
     author = db.Column(db.String)
-    status = db.Column(db.String)
+    status = db.Column(db.SmallInteger)
 
-    document_id = db.Column(db.String, db.ForeignKey("document.document_id"))
-    workspace_id = db.Column(db.String, db.ForeignKey("workspace.workspace_id"))
+    document_id = db.Column(UUIDString, db.ForeignKey("document.document_id"), index=True)
+    workspace_id = db.Column(UUIDString, db.ForeignKey("workspace.workspace_id"), index=True)
 
 
 class BaseAccessModel(db.Model):
     __tablename__ = 'accesses'
-    __table_args__ = {'extend_existing': True}
+    __table_args__ = (
+        db.Index('ix_accesses_access_type_value', 'access_type', 'value'),
+        {'extend_existing': True},
+    )
 
     id = db.Column('access_id', db.Integer, primary_key=True, autoincrement=True)
     access_level = db.Column(db.Enum(Access))
     access_type = db.Column(db.Enum(AccessType))
     value = db.Column(db.String)
 
-    workspace_id = db.Column(db.String, db.ForeignKey("workspace.workspace_id"))
+    workspace_id = db.Column(UUIDString, db.ForeignKey("workspace.workspace_id"), index=True)
 
 
 class WorkspaceModel(db.Model):
     __tablename__ = "workspace"
     __table_args__ = {'extend_existing': True}
 
-    id = db.Column('workspace_id', db.String, primary_key=True)
+    id = db.Column('workspace_id', UUIDString, primary_key=True)
     title = db.Column(db.String)
     description = db.Column(db.String)
-    status = db.Column(db.Integer)
+    status = db.Column(db.SmallInteger)
     main_branch = db.Column(db.String)
+    # Bumped by every write to the workspace, its branches, documents, requests and accesses
+    revision = db.Column(db.Integer, nullable=False, default=0, server_default='0')
 
-    user_id = db.Column(db.String, db.ForeignKey("user.user_id"), nullable=True)
+    user_id = db.Column(UUIDString, db.ForeignKey("user.user_id"), nullable=True, index=True)
 
     accesses: Mapped[List[BaseAccessModel]] = db.relationship(
         'BaseAccessModel',
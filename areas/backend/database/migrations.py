@@ -0,0 +1,147 @@
+from typing import Callable
+
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Connection
+
+SCHEMA_VERSION_TABLE = 'schema_version'
+
+# (table, column) pairs that hold UUID keys, see UUIDString in database.database
+UUID_COLUMNS = [
+    ('user', 'user_id'),
+    ('workspace', 'workspace_id'),
+    ('workspace', 'user_id'),
+    ('document', 'document_id'),
+    ('branch', 'branch_id'),
+    ('branch', 'document_id'),
+    ('branch', 'workspace_id'),
+    ('request', 'request_id'),
+    ('request', 'source_branch_id'),
+    ('request', 'target_branch_id'),
+    ('accesses', 'workspace_id'),
+]
+
+# (table, column, referenced table, referenced column) of foreign keys between UUID columns
+UUID_FOREIGN_KEYS = [
+    ('workspace', 'user_id', 'user', 'user_id'),
+    ('branch', 'document_id', 'document', 'document_id'),
+    ('branch', 'workspace_id', 'workspace', 'workspace_id'),
+    ('request', 'source_branch_id', 'branch', 'branch_id'),
+    ('request', 'target_branch_id', 'branch', 'branch_id'),
+    ('accesses', 'workspace_id', 'workspace', 'workspace_id'),
+]
+
+STATUS_COLUMNS = [
+    ('workspace', 'status'),
+    ('branch', 'status'),
+    ('request', 'status'),
+]
+
+
+def _add_hot_lookup_indexes(connection: Connection) -> None:
+    """
+    Indexes for the columns every request filters on
+    """
+    statements = [
+        'CREATE INDEX IF NOT EXISTS ix_branch_workspace_id ON branch (workspace_id)',
+        'CREATE INDEX IF NOT EXISTS ix_branch_document_id ON branch (document_id)',
+        'CREATE INDEX IF NOT EXISTS ix_request_source_branch_id ON request (source_branch_id)',
+        'CREATE INDEX IF NOT EXISTS ix_request_target_branch_id ON request (target_branch_id)',
+        'CREATE INDEX IF NOT EXISTS ix_accesses_workspace_id ON accesses (workspace_id)',
+        'CREATE INDEX IF NOT EXISTS ix_accesses_access_type_value ON accesses (access_type, value)',
+        'CREATE INDEX IF NOT EXISTS ix_workspace_user_id ON workspace (user_id)',
+        'CREATE UNIQUE INDEX IF NOT EXISTS uq_user_email ON "user" (email)',
+        'CREATE INDEX IF NOT EXISTS ix_user_username ON "user" (username)',
+    ]
+    for statement in statements:
+        connection.execute(text(statement))
+
+
+def _use_compact_types(connection: Connection) -> None:
+    """
+    Native uuid keys and smallint statuses on PostgreSQL.
+    SQLite keeps text keys, its column types are not enforced anyway.
+    """
+    if connection.dialect.name != 'postgresql':
+        return
+
+    for table, column, _, _ in UUID_FOREIGN_KEYS:
+        connection.execute(text(f'ALTER TABLE "{table}" DROP CONSTRAINT IF EXISTS {table}_{column}_fkey'))
+
+    for table, column in UUID_COLUMNS:
+        connection.execute(text(
+            f'ALTER TABLE "{table}" ALTER COLUMN {column} TYPE uuid USING {column}::uuid'
+        ))
+
+    for table, column in STATUS_COLUMNS:
+        connection.execute(text(
+            f'ALTER TABLE "{table}" ALTER COLUMN {column} TYPE smallint USING {column}::smallint'
+        ))
+
+    for table, column, referenced_table, referenced_column in UUID_FOREIGN_KEYS:
+        connection.execute(text(
+            f'ALTER TABLE "{table}" ADD CONSTRAINT {table}_{column}_fkey '
+            f'FOREIGN KEY ({column}) REFERENCES "{referenced_table}" ({referenced_column})'
+        ))
+
+
+def _add_document_blobs(connection: Connection) -> None:
+    """
+    Reference from documents to their content-addressed blobs, the blob table itself is created by create_all.
+    Documents created before keep their "<document_id>_<name>" objects, no blob references them yet.
+    """
+    columns = {column['name'] for column in inspect(connection).get_columns('document')}
+    if 'blob_id' not in columns:
+        connection.execute(text('ALTER TABLE document ADD COLUMN blob_id VARCHAR(64)'))
+
+    columns = {column['name'] for column in inspect(connection).get_columns('blob')}
+    if 'ref_count' not in columns:
+        connection.execute(text('ALTER TABLE blob ADD COLUMN ref_count INTEGER NOT NULL DEFAULT 0'))
+    if 'released_at' not in columns:
+        connection.execute(text('ALTER TABLE blob ADD COLUMN released_at TIMESTAMP'))
+
+
+def _add_workspace_revision(connection: Connection) -> None:
+    """
+    Revision counter of workspaces, see WorkspaceModel.revision
+    """
+    columns = {column['name'] for column in inspect(connection).get_columns('workspace')}
+    if 'revision' not in columns:
+        connection.execute(text('ALTER TABLE workspace ADD COLUMN revision INTEGER NOT NULL DEFAULT 0'))
+
+
+# Applied in order, each exactly once. Never edit a released migration, add a new one instead.
+MIGRATIONS: list[tuple[int, str, Callable[[Connection], None]]] = [
+    (1, 'hot lookup indexes', _add_hot_lookup_indexes),
+    (2, 'native uuid and smallint types on postgresql', _use_compact_types),
+    (3, 'content-addressed document blobs', _add_document_blobs),
+    (4, 'workspace revision', _add_workspace_revision),
+]
+
+
+def get_schema_version(connection: Connection) -> int:
+    connection.execute(text(f'CREATE TABLE IF NOT EXISTS {SCHEMA_VERSION_TABLE} (version INTEGER NOT NULL)'))
+    version = connection.execute(text(f'SELECT MAX(version) FROM {SCHEMA_VERSION_TABLE}')).scalar()
+    return version or 0
+
+
+def upgrade(db) -> int:
+    """
+    Apply pending migrations, each in its own transaction
+    :param db: flask_sqlalchemy database, tables must already exist
+    :return: schema version after upgrade
+    """
+    with db.engine.begin() as connection:
+        version = get_schema_version(connection)
+
+    for migration_version, _, migration in MIGRATIONS:
+        if migration_version <= version:
+            continue
+        with db.engine.begin() as connection:
+            migration(connection)
+            connection.execute(
+                text(f'INSERT INTO {SCHEMA_VERSION_TABLE} (version) VALUES (:version)'),
+                {'version': migration_version}
+            )
+        version = migration_version
+
+    return version
@@ -1,9 +1,10 @@
 from functools import wraps
-from flask import jsonify, request
+from flask import g, jsonify, request
 from jwt import InvalidTokenError
 
 from controller.user_controller import UserController
 from core.role import Role
+from core.user import User
 
 userController = UserController()
 
@@ -15,7 +16,7 @@ def token_required(f):
             token = request.cookies.get('token')
             if token is None:
                 return jsonify({'error': 'Unauthorised'}), 401
-            userController.authentication(token)
+            get_user_by_token()
             return f(*args, **kwargs)
         except InvalidTokenError:
             return jsonify({'error': 'Invalid token'}), 403
@@ -30,7 +31,7 @@ def admin_access(f):
             token = request.cookies.get('token')
             if token is None:
                 return jsonify({'error': 'Unauthorised'}), 401
-            user = userController.authentication(token)
+            user = get_user_by_token()
             if user.role != Role.Admin:
                 return jsonify({'error': 'access denied'}), 403
             return f(*args, **kwargs)
@@ -40,6 +41,14 @@ def admin_access(f):
     return decorated
 
 
-def get_user_by_token():
+def get_user_by_token() -> User:
+    """
+    Authenticated user of the current request.
+    The cookie token is checked once per request, the result is kept on flask.g
+    """
     token = request.cookies.get('token')
-    return userController.authentication(token)
+    principal = g.get('principal')
+    if principal is None or principal[0] != token:
+        principal = (token, userController.authentication(token))
+        g.principal = principal
+    return principal[1]
@@ -28,3 +28,7 @@ class DepartmentNotFoundError(Exception):
 
 class AccessError(Exception):
     pass
+
+
+class VersionConflictError(Exception):
+    pass
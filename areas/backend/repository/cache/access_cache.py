@@ -0,0 +1,74 @@
+import uuid
+from typing import Callable, Optional
+
+from core.accesses import Access
+from repository.cache.backends import create_backend
+
+# Effective access level of a user to a workspace, see DataStoreStorageRepository.get_access_level_to_workspace.
+# Entries are keyed by the current versions of their workspace and user, kept in a backend of their own so that
+# the statistics of the cache count entry lookups only. Invalidating gives a new version, so every worker sharing
+# the backends stops reading older entries at once.
+_cache = create_backend(name="access", max_size=10000, ttl=60)
+
+# Versions outlive the entries they key; a lost version is replaced by a new one, which only costs misses
+_VERSION_TTL = 24 * 60 * 60
+_versions = create_backend(name="access_version", max_size=20000, ttl=_VERSION_TTL)
+
+_NO_ACCESS = "no access"
+
+
+def _workspace_version_key(space_id: uuid.UUID | str) -> str:
+    return f"version:workspace:{space_id}"
+
+
+def _user_version_key(user_id: uuid.UUID | str) -> str:
+    return f"version:user:{user_id}"
+
+
+def _new_version() -> str:
+    return uuid.uuid4().hex
+
+
+def get_access_level(user_id: uuid.UUID | str, space_id: uuid.UUID | str,
+                     load: Callable[[], Optional[Access]]) -> Optional[Access]:
+    """
+    :param load: reads the access level from the database, called on a miss
+    :return: access level, None if there is no access
+    """
+    version_keys = [_user_version_key(user_id), _workspace_version_key(space_id)]
+    versions = _versions.get_many(version_keys)
+    missing = {key: _new_version() for key, version in zip(version_keys, versions) if version is None}
+    if missing:
+        _versions.set_many(missing)
+    user_version, space_version = [missing.get(key, version) for key, version in zip(version_keys, versions)]
+
+    key = f"{user_id}:{space_id}:{user_version}:{space_version}"
+    level = _cache.get(key)
+    if level is None:
+        level = load()
+        _cache.set(key, _NO_ACCESS if level is None else level)
+        return level
+    return None if level == _NO_ACCESS else level
+
+
+def invalidate_workspace(space_id: uuid.UUID | str) -> None:
+    """
+    Forget access levels to a workspace, to be called once the change is committed
+    """
+    _versions.set(_workspace_version_key(space_id), _new_version())
+
+
+def invalidate_users(user_ids: list[uuid.UUID | str]) -> None:
+    """
+    Forget access levels of users, to be called once the change is committed
+    """
+    _versions.set_many({_user_version_key(user_id): _new_version() for user_id in user_ids})
+
+
+def clear() -> None:
+    _cache.clear()
+    _versions.clear()
+
+
+def stats() -> dict:
+    return _cache.stats()
@@ -0,0 +1,16 @@
+from cache.backend import CacheBackend
+from cache.memory_backend import MemoryCacheBackend
+from config import cache_backend, cache_redis_url, worker_threads
+
+
+def create_backend(name: str, max_size: int, ttl: float) -> CacheBackend:
+    """
+    Backend of a cache that may be shared between workers, as set by config.cache_backend
+    :param max_size: number of entries kept by the in-process backend
+    :param ttl: time to live of entries, seconds
+    """
+    if cache_backend == "redis":
+        # redis is only needed by deployments that use it
+        from cache.redis_backend import RedisCacheBackend
+        return RedisCacheBackend(name=name, url=cache_redis_url, ttl=ttl, pool_size=worker_threads)
+    return MemoryCacheBackend(name=name, max_size=max_size, ttl=ttl)
@@ -0,0 +1,42 @@
+from typing import Optional
+
+from config import blob_cache_directory, blob_cache_memory_size, blob_cache_memory_blob_size, blob_cache_disk_size, \
+    blob_cache_disk_blob_size
+from repository.cache.tiered_cache import TieredBlobCache, CachedBlobStream
+
+# Content of immutable storage objects by object name, see DataStoreStorageRepository.get_binary_file_from_cloud_by_id
+_cache = TieredBlobCache(
+    name="blob",
+    directory=blob_cache_directory,
+    memory_max_size=blob_cache_memory_size,
+    memory_max_blob_size=blob_cache_memory_blob_size,
+    disk_max_size=blob_cache_disk_size,
+    disk_max_blob_size=blob_cache_disk_blob_size,
+)
+
+
+def open_blob(object_name: str, offset: int = 0, length: int = 0) -> Optional[CachedBlobStream]:
+    return _cache.open(object_name, offset, length)
+
+
+def get_size(object_name: str) -> Optional[int]:
+    return _cache.get_size(object_name)
+
+
+def fits_memory(size: int) -> bool:
+    """
+    :return: whether a blob of this size is kept in the memory tier
+    """
+    return size <= _cache.memory_max_blob_size
+
+
+def read_through(object_name: str, stream, size: Optional[int]):
+    return _cache.read_through(object_name, stream, size)
+
+
+def clear() -> None:
+    _cache.clear()
+
+
+def stats() -> dict:
+    return _cache.stats()
@@ -0,0 +1,23 @@
+import uuid
+
+from repository.cache.backends import create_backend
+
+# Authenticated users (with their department, without their password hash) by the user id carried in the token,
+# see UserRepository.get_user_from_db_by_id
+backend = create_backend(name="principal", max_size=10000, ttl=60)
+
+
+def key(user_id: uuid.UUID | str) -> str:
+    return str(user_id)
+
+
+def invalidate_users(user_ids: list[uuid.UUID | str]) -> None:
+    backend.delete_many([key(user_id) for user_id in user_ids])
+
+
+def clear() -> None:
+    backend.clear()
+
+
+def stats() -> dict:
+    return backend.stats()
@@ -0,0 +1,316 @@
+import hashlib
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from io import BytesIO
+from typing import BinaryIO, Optional
+
+_TEMP_PREFIX = '.tmp-'
+# Temp files not written for this long were left by a process that stopped while writing them, seconds
+_STALE_TEMP_AGE = 60 * 60
+
+
+class CachedBlobStream:
+    """
+    Read-only stream over a cached blob or a byte range of it
+    """
+
+    def __init__(self, file: BinaryIO, size: int):
+        self.__file = file
+        self.__remaining = size
+        self.size = size
+
+    def read(self, amt: Optional[int] = None) -> bytes:
+        if amt is None or amt < 0 or amt > self.__remaining:
+            amt = self.__remaining
+        data = self.__file.read(amt)
+        self.__remaining -= len(data)
+        return data
+
+    def readable(self) -> bool:
+        return True
+
+    def close(self) -> None:
+        self.__file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+class _CachingReader:
+    """
+    Stream with the whole content of a blob, the content is added to the cache as soon as its last byte is read
+    """
+
+    def __init__(self, cache: 'TieredBlobCache', key: str, stream, size: int, in_memory: bool):
+        self.__cache = cache
+        self.__key = key
+        self.__stream = stream
+        self.__read = 0
+        self.__buffer: Optional[bytearray] = bytearray() if in_memory else None
+        self.__file = None if in_memory else cache.create_temp_file()
+        self.size = size
+
+    def read(self, amt: Optional[int] = None) -> bytes:
+        data = self.__stream.read(amt)
+        self.__read += len(data)
+        if self.__buffer is not None:
+            self.__buffer += data
+        elif self.__file is not None:
+            self.__file.write(data)
+
+        if self.__read == self.size:
+            self.__finish(complete=True)
+        return data
+
+    def readable(self) -> bool:
+        return True
+
+    def close(self) -> None:
+        self.__stream.close()
+        self.__finish(complete=False)
+
+    def __finish(self, complete: bool) -> None:
+        if self.__buffer is not None:
+            if complete:
+                self.__cache.put_memory(self.__key, bytes(self.__buffer))
+            self.__buffer = None
+        elif self.__file is not None:
+            self.__file.close()
+            if complete:
+                self.__cache.put_disk(self.__key, self.__file.name, self.size)
+            else:
+                os.remove(self.__file.name)
+            self.__file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+class TieredBlobCache:
+    """
+    Thread safe read-through cache of immutable blobs.
+    Small blobs are kept in memory, larger ones in files of a local directory;
+    each tier is bounded by the total size of its blobs, least recently used blobs are evicted first.
+    The directory may be shared by the worker processes of a host: every write rescans it and trims it by the
+    size of all its files, the modification time of a file tells when it was last used by any process.
+    """
+
+    def __init__(self, name: str, directory: str, memory_max_size: int, memory_max_blob_size: int,
+                 disk_max_size: int, disk_max_blob_size: int):
+        self.name = name
+        self.directory = directory
+        self.memory_max_size = memory_max_size
+        self.memory_max_blob_size = memory_max_blob_size
+        self.disk_max_size = disk_max_size
+        self.disk_max_blob_size = disk_max_blob_size
+
+        self.__memory: OrderedDict[str, bytes] = OrderedDict()
+        self.__memory_size = 0
+        # File name -> size in order of use, read from the directory on first use and on every write,
+        # so the disk tier survives restarts and sees the files of other processes
+        self.__disk: Optional[OrderedDict[str, int]] = None
+        self.__disk_size = 0
+        self.__lock = threading.Lock()
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    #############
+    # READ
+    #############
+
+    def open(self, key: str, offset: int = 0, length: int = 0) -> Optional[CachedBlobStream]:
+        """
+        :param offset: first byte to read
+        :param length: number of bytes to read, 0 to read up to the end
+        :return: stream over the cached blob or None if it is not cached
+        """
+        with self.__lock:
+            data = self.__memory.get(key)
+            if data is not None:
+                self.__memory.move_to_end(key)
+                self.memory_hits += 1
+                end = offset + length if length else len(data)
+                return CachedBlobStream(BytesIO(data[offset:end]), len(data[offset:end]))
+
+            file_name = self.__file_name(key)
+            size = self.__disk_index().get(file_name)
+            if size is not None:
+                self.__disk.move_to_end(file_name)
+
+        if size is not None:
+            path = os.path.join(self.directory, file_name)
+            try:
+                file = open(path, 'rb')
+                # Other processes sharing the directory evict by modification time
+                os.utime(path)
+            except FileNotFoundError:
+                self.__forget_file(file_name)
+            else:
+                with self.__lock:
+                    self.disk_hits += 1
+                file.seek(offset)
+                return CachedBlobStream(file, min(length, size - offset) if length else size - offset)
+
+        with self.__lock:
+            self.misses += 1
+        return None
+
+    def get_size(self, key: str) -> Optional[int]:
+        """
+        :return: size of the cached blob or None if it is not cached
+        """
+        with self.__lock:
+            data = self.__memory.get(key)
+            if data is not None:
+                return len(data)
+            return self.__disk_index().get(self.__file_name(key))
+
+    def read_through(self, key: str, stream, size: Optional[int]):
+        """
+        Wrap a stream with the whole content of a blob, so the blob is cached once the stream is read to the end
+        :param size: size of the blob, blobs of unknown size or too large for both tiers are not cached
+        """
+        if size is None or size > max(self.memory_max_blob_size, self.disk_max_blob_size):
+            return stream
+        return _CachingReader(self, key, stream, size, in_memory=size <= self.memory_max_blob_size)
+
+    #############
+    # WRITE
+    #############
+
+    def create_temp_file(self):
+        os.makedirs(self.directory, exist_ok=True)
+        return tempfile.NamedTemporaryFile(dir=self.directory, prefix=_TEMP_PREFIX, delete=False)
+
+    def put_memory(self, key: str, data: bytes) -> None:
+        with self.__lock:
+            previous = self.__memory.pop(key, None)
+            if previous is not None:
+                self.__memory_size -= len(previous)
+            self.__memory[key] = data
+            self.__memory_size += len(data)
+            while self.__memory_size > self.memory_max_size:
+                _, evicted = self.__memory.popitem(last=False)
+                self.__memory_size -= len(evicted)
+                self.evictions += 1
+
+    def put_disk(self, key: str, temp_path: str, size: int) -> None:
+        file_name = self.__file_name(key)
+        try:
+            os.replace(temp_path, os.path.join(self.directory, file_name))
+        except FileNotFoundError:
+            # Removed as stale by another process, the blob is not cached
+            return
+        files = self.__scan()
+
+        evicted = []
+        with self.__lock:
+            self.__disk = OrderedDict(files)
+            self.__disk_size = sum(self.__disk.values())
+            index = self.__disk
+            if file_name in index:
+                index.move_to_end(file_name)
+            while self.__disk_size > self.disk_max_size:
+                evicted_name, evicted_size = index.popitem(last=False)
+                self.__disk_size -= evicted_size
+                self.evictions += 1
+                evicted.append(evicted_name)
+
+        for evicted_name in evicted:
+            try:
+                os.remove(os.path.join(self.directory, evicted_name))
+            except FileNotFoundError:
+                pass
+
+    def clear(self) -> None:
+        with self.__lock:
+            self.__memory.clear()
+            self.__memory_size = 0
+            file_names = list(self.__disk_index())
+            self.__disk.clear()
+            self.__disk_size = 0
+
+        for file_name in file_names:
+            try:
+                os.remove(os.path.join(self.directory, file_name))
+            except FileNotFoundError:
+                pass
+
+    def stats(self) -> dict:
+        with self.__lock:
+            index = self.__disk_index()
+            requests = self.memory_hits + self.disk_hits + self.misses
+            return {
+                "name": self.name,
+                "memory_size": self.__memory_size,
+                "memory_max_size": self.memory_max_size,
+                "memory_items": len(self.__memory),
+                "disk_size": self.__disk_size,
+                "disk_max_size": self.disk_max_size,
+                "disk_items": len(index),
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "memory_hit_ratio": self.memory_hits / requests if requests else 0.0,
+                "disk_hit_ratio": self.disk_hits / requests if requests else 0.0,
+                "hit_ratio": (self.memory_hits + self.disk_hits) / requests if requests else 0.0,
+            }
+
+    #############
+    # DISK INDEX
+    #############
+
+    @staticmethod
+    def __file_name(key: str) -> str:
+        return hashlib.sha256(key.encode()).hexdigest()
+
+    def __disk_index(self) -> OrderedDict[str, int]:
+        """
+        Must be called with the lock held
+        """
+        if self.__disk is None:
+            self.__disk = OrderedDict(self.__scan())
+            self.__disk_size = sum(self.__disk.values())
+        return self.__disk
+
+    def __scan(self) -> list[tuple[str, int]]:
+        """
+        Read the files of the directory and remove stale temp files
+        :return: file names and sizes, least recently used first
+        """
+        files = []
+        if not os.path.isdir(self.directory):
+            return files
+        stale_before = time.time() - _STALE_TEMP_AGE
+        for entry in os.scandir(self.directory):
+            try:
+                if not entry.is_file():
+                    continue
+                stat = entry.stat()
+                if not entry.name.startswith(_TEMP_PREFIX):
+                    files.append((stat.st_mtime, entry.name, stat.st_size))
+                elif stat.st_mtime < stale_before:
+                    os.remove(entry.path)
+            except FileNotFoundError:
+                # Evicted or renamed by another process meanwhile
+                continue
+        return [(name, size) for _, name, size in sorted(files)]
+
+    def __forget_file(self, file_name: str) -> None:
+        with self.__lock:
+            size = self.__disk_index().pop(file_name, None)
+            if size is not None:
+                self.__disk_size -= size
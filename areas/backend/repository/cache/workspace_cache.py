@@ -0,0 +1,40 @@
+import copy
+import uuid
+from typing import Optional
+
+from core.workspace import WorkSpace
+from repository.cache.backends import create_backend
+
+# Built workspace aggregates by (workspace id, revision), see DataStoreStorageRepository.load_cached_workspaces.
+# Every write bumps the revision of its workspace, so entries of older revisions are never read again
+# and leave the cache as least recently used or expired; nothing has to be invalidated.
+_cache = create_backend(name="workspace", max_size=1000, ttl=3600)
+
+
+def _key(space_id: uuid.UUID | str, revision: int) -> str:
+    return f"{space_id}.{revision}"
+
+
+def get_workspaces(revisions: list[tuple[uuid.UUID | str, int]]) -> list[Optional[WorkSpace]]:
+    """
+    :param revisions: (workspace id, revision) pairs
+    :return: copies of the cached aggregates (or None) in the same order, callers may modify them
+    """
+    workspaces = _cache.get_many([_key(space_id, revision) for space_id, revision in revisions])
+    return [None if workspace is None else copy.deepcopy(workspace) for workspace in workspaces]
+
+
+def set_workspaces(workspaces: list[tuple[uuid.UUID | str, int, WorkSpace]]) -> None:
+    """
+    :param workspaces: (workspace id, revision, aggregate built at this revision); aggregates must not be
+                       modified afterwards
+    """
+    _cache.set_many({_key(space_id, revision): workspace for space_id, revision, workspace in workspaces})
+
+
+def clear() -> None:
+    _cache.clear()
+
+
+def stats() -> dict:
+    return _cache.stats()
@@ -0,0 +1,35 @@
+from typing import Optional
+
+
+class CloudFileStream:
+    """
+    Read-only binary stream over an object storage response.
+    Content is pulled from the connection as it is read, so memory per download does not depend on the file size.
+    The connection goes back to the pool once the stream is closed.
+    """
+
+    def __init__(self, response, size: Optional[int] = None):
+        self.__response = response
+        self.__closed = False
+        self.size = size
+
+    def read(self, amt: Optional[int] = None) -> bytes:
+        if self.__closed:
+            return b""
+        return self.__response.read(amt)
+
+    def readable(self) -> bool:
+        return True
+
+    def close(self) -> None:
+        if self.__closed:
+            return
+        self.__closed = True
+        self.__response.close()
+        self.__response.release_conn()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
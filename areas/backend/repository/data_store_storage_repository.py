@@ -1,18 +1,23 @@
 import base64
+import copy
 import datetime
-import os
+import hashlib
+import re
 import uuid
 from io import BytesIO
 from typing import BinaryIO, Optional
+from urllib.parse import quote
 
 from flask import current_app
 from minio import Minio
-from sqlalchemy import delete, or_
+from minio.commonconfig import ComposeSource, CopySource
+from sqlalchemy import delete, or_, and_, func, select, case
 from sqlalchemy import update
+from sqlalchemy.dialects import postgresql, sqlite
 
 from app_db import get_current_db
-from config import endpoint, secret_key, access_key
-from core.accesses import UrlAccess, Access, AccessType, DepartmentAccess, UserAccess
+from config import presigned_url_expires, storage_grace_period
+from core.accesses import UrlAccess, Access, AccessType, DepartmentAccess, UserAccess, BaseAccess
 from core.branch import Branch
 from core.branch_status import BranchStatus
 from core.document import Document
@@ -21,82 +26,116 @@ from core.request_status import RequestStatus
 from core.workspace import WorkSpace
 from core.workspace_status import WorkSpaceStatus
 from database.database import UserModel, WorkspaceModel, RequestModel, BranchModel, DepartmentModel, \
-    BaseAccessModel, DocumentModel
-from exceptions.exceptions import UserNotFoundError, SpaceNotFoundError, NotAllowedError, AccessError
+    BaseAccessModel, DocumentModel, BlobModel
+from exceptions.exceptions import UserNotFoundError, SpaceNotFoundError, NotAllowedError, AccessError, \
+    AlreadyExistsError, VersionConflictError
+from repository import request_loader
+from repository.cloud_file_stream import CloudFileStream
+from repository.hashing_reader import HashingReader
+from repository.single_flight import SingleFlight
+from repository.storage_client import get_storage_client
+from repository.cache import access_cache, principal_cache, blob_cache, workspace_cache
+from repository.cache.tiered_cache import CachedBlobStream
+
+# Part size of multipart uploads of unknown length, MinIO requires at least 5 MiB
+UPLOAD_PART_SIZE = 10 * 1024 * 1024
+
+# Largest object a single server-side copy can write, larger ones are composed from ranges of this size
+MAX_COPY_SIZE = 5 * 1024 * 1024 * 1024
+
+# Object names of blobs (see BlobModel) and of uploads whose content hash is not known yet
+BLOB_PREFIX = "blobs/"
+UPLOAD_PREFIX = "uploads/"
+
+# Content-addressed blobs never change, so they can be cached locally
+_CACHEABLE_OBJECT_NAME = re.compile(re.escape(BLOB_PREFIX) + '[0-9a-f]{64}')
+
+# Block size of blobs read into the blob cache
+CACHE_FILL_CHUNK_SIZE = 64 * 1024
+
+# Concurrent requests for the same blob or workspace share one load
+_blob_fetches = SingleFlight(name="blob_fetch")
+_workspace_loads = SingleFlight(name="workspace_load")
 
 
 class DataStoreStorageRepository:
     def __init__(self):
         self.db = get_current_db(current_app)
-        self.minio_client = DataStoreStorageRepository.get_minio_client()
 
-    @staticmethod
-    def get_minio_client():
-        client = Minio(
-            endpoint=endpoint,
-            access_key=access_key,
-            secret_key=secret_key,
-        )
+    @property
+    def minio_client(self) -> Minio:
+        """
+        Storage client of the process, created on first use rather than with the repository
+        """
+        return get_storage_client()
 
-        found = client.bucket_exists("sud")
-        if not found:  # pragma: no cover
-            client.make_bucket("sud")  # pragma: no cover
-        else:  # pragma: no cover
-            pass  # pragma: no cover
+    @staticmethod
+    def get_minio_client() -> Minio:
+        return get_storage_client()
 
-        return client
+    @staticmethod
+    def get_cache_stats() -> list[dict]:
+        return [access_cache.stats(), principal_cache.stats(), blob_cache.stats(), workspace_cache.stats(),
+                _blob_fetches.stats(), _workspace_loads.stats()]
 
     #############
     # ACCESSES
     #############
 
-    def has_access_to_workspace(self, workspace: WorkSpace, user: UserModel):
-        accesses: list[BaseAccessModel] = BaseAccessModel.query.filter_by(workspace_id=workspace.get_id()).all()
+    def get_access_level_to_workspace(self, space_id: uuid.UUID, user: UserModel) -> Optional[Access]:
+        """
+        Effective access of user to workspace: owner, user, department and url grants in one query
+        :return: highest granted access or None if there is no access
+        """
+        return access_cache.get_access_level(
+            user.id, space_id, lambda: self._load_access_level_to_workspace(space_id, user)
+        )
 
-        if self.is_author_of_workspace(user.email, workspace.get_id()):
-            return True
+    def _load_access_level_to_workspace(self, space_id: uuid.UUID, user: UserModel) -> Optional[Access]:
+        department_names = select(DepartmentModel.name).where(DepartmentModel.id == user.department_id)
+
+        rows = self.db.session.execute(
+            select(WorkspaceModel.user_id, WorkspaceModel.status, BaseAccessModel.access_level).outerjoin(
+                BaseAccessModel,
+                and_(
+                    BaseAccessModel.workspace_id == WorkspaceModel.id,
+                    or_(
+                        BaseAccessModel.access_type == AccessType.Url,
+                        and_(BaseAccessModel.access_type == AccessType.User, BaseAccessModel.value == user.email),
+                        and_(BaseAccessModel.access_type == AccessType.Department,
+                             BaseAccessModel.value.in_(department_names)),
+                    )
+                )
+            ).where(WorkspaceModel.id == str(space_id))
+        ).all()
 
-        for access in accesses:
-            if access.access_type == AccessType.Url:
-                return True
-            if access.access_type == AccessType.User:
-                if user.email == access.value:
-                    return True
-            if access.access_type == AccessType.Department:
-                department: DepartmentModel = DepartmentModel.query.filter_by(name=access.value).first()
-
-                for user_ in department.users:
-                    if user_.email == user.email:
-                        return True
-        return False
+        if not rows:
+            return None
+
+        # Same rule as is_author_of_workspace: ownership counts for active workspaces only
+        if str(rows[0].user_id) == str(user.id) and str(rows[0].status) == str(WorkSpaceStatus.Active.value):
+            return Access.Edit
+
+        levels = [row.access_level for row in rows if row.access_level is not None]
+        return max(levels, key=lambda level: level.value, default=None)
+
+    def has_access_to_workspace(self, workspace: WorkSpace, user: UserModel):
+        return self.get_access_level_to_workspace(workspace.get_id(), user) is not None
 
     def has_edit_access_to_workspace(self, workspace: WorkSpace, user: UserModel):
-        accesses: list[BaseAccessModel] = BaseAccessModel.query.filter_by(workspace_id=workspace.get_id()).all()
+        return self.get_access_level_to_workspace(workspace.get_id(), user) == Access.Edit
 
-        if self.is_author_of_workspace(user.email, workspace.get_id()):
-            return True
+    @staticmethod
+    def is_author_of_workspace(user_mail: str, space_id: uuid.UUID):
+        workspace: Optional[WorkspaceModel] = WorkspaceModel.query.join(
+            UserModel, UserModel.id == WorkspaceModel.user_id
+        ).filter(
+            WorkspaceModel.id == str(space_id),
+            WorkspaceModel.status == WorkSpaceStatus.Active.value,
+            UserModel.email == user_mail,
+        ).first()
 
-        for access in accesses:
-            if access.access_type == AccessType.Url:
-                return access.access_level == Access.Edit
-            if access.access_type == AccessType.User:
-                if user.email == access.value:
-                    return access.access_level == Access.Edit
-            if access.access_type == AccessType.Department:
-                department: DepartmentModel = DepartmentModel.query.filter_by(name=access.value).first()
-
-                for user_ in department.users:
-                    if user_.email == user.email:
-                        return access.access_level == Access.Edit
-        return False
-
-    def is_author_of_workspace(self, user_mail: str, space_id: uuid.UUID):
-        spaces: list[WorkSpace] = self.get_workspaces(user_mail)
-        for space in spaces:
-            if str(space.get_id()) == str(space_id):
-                return True
-
-        return False
+        return workspace is not None
 
     #############
     # WORKSPACES
@@ -107,32 +146,38 @@ class DataStoreStorageRepository:
         for (space, access) in self.get_workspaces_access(user_mail):
             all_spaces.append(space)
 
-        all_documents: list[tuple[Document, str, str]] = []
+        spaces_of_documents = [
+            (space, branch.document.get_id())
+            for space in all_spaces for branch in space.branches if branch.document is not None
+        ]
+        documentModels: list[DocumentModel] = request_loader.load_many(
+            DocumentModel.id, [document_id for _, document_id in spaces_of_documents]
+        )
+        matches = [
+            (space, documentModel) for (space, _), documentModel in zip(spaces_of_documents, documentModels)
+            if (documentModel.name in document_name) or (document_name in documentModel.name)
+        ]
+        branchModels: list[BranchModel] = request_loader.load_many(
+            BranchModel.document_id, [documentModel.id for _, documentModel in matches]
+        )
 
-        for space in all_spaces:
-            branches: list[Branch] = space.branches
-
-            for branch in branches:
-                if branch.document is not None:
-                    documentModel: DocumentModel = DocumentModel.query.filter_by(id=branch.document.get_id()).first()
-
-                    if (documentModel.name in document_name) or (document_name in documentModel.name):
-                        branch: BranchModel = BranchModel.query.filter_by(document_id=str(documentModel.id)).first()
-                        document = Document(
-                            name=documentModel.name,
-                            task_id=documentModel.task_id,
-                            file=documentModel.file_id,
-                            time=documentModel.modification_time,
-                            _id=documentModel.id,
-                        )
+        all_documents: list[tuple[Document, str, str]] = []
+        for (space, documentModel), branch in zip(matches, branchModels):
+            document = Document(
+                name=documentModel.name,
+                task_id=documentModel.task_id,
+                file=documentModel.file_id,
+                time=documentModel.modification_time,
+                _id=documentModel.id,
+            )
 
-                        all_documents.append((document, branch.id, str(space.get_id())))
+            all_documents.append((document, branch.id, str(space.get_id())))
 
         return all_documents
 
     @staticmethod
     def get_workspaces(user_mail: str, archived: bool = False) -> list[WorkSpace]:
-        user: UserModel = UserModel.query.filter_by(email=user_mail).first()
+        user: UserModel = request_loader.load(UserModel.email, user_mail)
         workspaces: list[WorkspaceModel] = WorkspaceModel.query.filter(
             WorkspaceModel.user_id == user.id,
             or_(WorkspaceModel.status == WorkSpaceStatus.Active.value,
@@ -143,249 +188,203 @@ class DataStoreStorageRepository:
             WorkspaceModel.status == WorkSpaceStatus.Active.value
         ).all()
 
-        workspaces_final = []
-
-        for workspace in workspaces:
-            branches: list[BranchModel] = BranchModel.query.filter_by(workspace_id=workspace.id).all()
-            accesses: list[BaseAccessModel] = BaseAccessModel.query.filter_by(workspace_id=workspace.id).all()
-
-            all_branches = []
-            all_requests = []
-            all_accesses = []
-            indexes = []
-
-            accesses: list[BaseAccessModel] = BaseAccessModel.query.filter_by(workspace_id=workspace.id).all()
-
-            for access in accesses:
-
-                if access.access_type == AccessType.User:
-                    all_accesses.append(
-                        UserAccess(
-                            email=access.value,
-                            access_type=access.access_level,
-                        )
-                    )
-
-                if access.access_type == AccessType.Url:
-                    all_accesses.append(
-                        UrlAccess(
-                            url=access.value,
-                            access_type=access.access_level,
-                        )
-                    )
-
-                if access.access_type == AccessType.Department:
-                    all_accesses.append(
-                        DepartmentAccess(
-                            department_name=access.value,
-                            access_type=access.access_level,
-                        )
-                    )
+        return DataStoreStorageRepository.load_cached_workspaces(workspaces)
 
-            for br in branches:
-                documentModel: DocumentModel = DocumentModel.query.filter_by(id=br.document_id).first()
-                document = None
+    @staticmethod
+    def get_workspaces_access(user_mail: str) -> list[tuple[WorkSpace, AccessType]]:
+        user: UserModel = request_loader.load(UserModel.email, user_mail)
 
-                if documentModel is not None:
-                    document = Document(
-                        name=documentModel.name,
-                        task_id=documentModel.task_id,
-                        file=documentModel.file_id,
-                        time=documentModel.modification_time,
-                        _id=documentModel.id,
-                    )
+        accesses: list[BaseAccessModel] = []
+        if user.department_id is not None:
+            department: DepartmentModel = request_loader.load(DepartmentModel.id, user.department_id)
 
-                all_branches.append(
-                    Branch(
-                        name=br.name,
-                        author=br.author,
-                        parent=br.parent_branch_id,
-                        status=br.status,
-                        document=document,
-                        _id=br.id,
-                    )
-                )
+            accesses += BaseAccessModel.query.filter(
+                BaseAccessModel.access_type == AccessType.Department,
+                BaseAccessModel.value == department.name).all()
 
-                requests: list[RequestModel] = RequestModel.query.filter_by(source_branch_id=br.id).all()
-                requests2: list[RequestModel] = RequestModel.query.filter_by(target_branch_id=br.id).all()
-
-                for req in requests:
-                    req_ = Request(
-                        title=req.title,
-                        description=req.description,
-                        status=req.status,
-                        source_branch_id=req.source_branch_id,
-                        target_branch_id=req.target_branch_id,
-                        _id=req.id,
-                    )
-                    if req.id not in indexes:
-                        all_requests.append(req_)
-                        indexes.append(req.id)
-                for req in requests2:
-                    req_ = Request(
-                        title=req.title,
-                        description=req.description,
-                        status=req.status,
-                        source_branch_id=req.source_branch_id,
-                        target_branch_id=req.target_branch_id,
-                        _id=req.id,
-                    )
-                    if req.id not in indexes:
-                        all_requests.append(req_)
-                        indexes.append(req.id)
+        accesses += BaseAccessModel.query.filter(BaseAccessModel.access_type == AccessType.User,
+                                                 BaseAccessModel.value == user.email).all()
 
-            workspaces_final.append(
-                WorkSpace(
-                    title=workspace.title,
-                    description=workspace.description,
-                    branches=all_branches,
-                    requests=all_requests,
-                    accesses=all_accesses,
-                    main_branch=workspace.main_branch,
-                    status=workspace.status,
-                    _id=workspace.id,
-                )
+        workspaces: dict[str, WorkspaceModel] = {
+            workspace.id: workspace for workspace in DataStoreStorageRepository._query_in(
+                WorkspaceModel.query.filter(WorkspaceModel.status == WorkSpaceStatus.Active.value),
+                WorkspaceModel.id,
+                [access.workspace_id for access in accesses],
+            )
+        }
+        spaces: dict[str, WorkSpace] = {
+            str(space.get_id()): space for space in DataStoreStorageRepository.load_cached_workspaces(
+                list(workspaces.values())
             )
+        }
 
-        return workspaces_final
+        return [
+            (spaces[access.workspace_id], access.access_type)
+            for access in accesses if access.workspace_id in spaces
+        ]
 
     @staticmethod
-    def get_workspaces_access(user_mail: str) -> list[tuple[WorkSpace, AccessType]]:
-        user: UserModel = UserModel.query.filter_by(email=user_mail).first()
-
-        workspaces_final: list[tuple[WorkSpace, AccessType]] = []
+    def get_workspaces_open() -> list[WorkSpace]:
+        accesses: list[BaseAccessModel] = BaseAccessModel.query.filter(
+            BaseAccessModel.access_type == AccessType.Url).all()
 
-        workspaces: list[tuple[WorkspaceModel, AccessType]] = []
-        if user.department_id is not None:
-            department: DepartmentModel = DepartmentModel.query.filter_by(id=user.department_id).first()
+        workspaces: dict[str, WorkspaceModel] = {
+            workspace.id: workspace for workspace in DataStoreStorageRepository._query_in(
+                WorkspaceModel.query.filter(WorkspaceModel.status == WorkSpaceStatus.Active.value),
+                WorkspaceModel.id,
+                [access.workspace_id for access in accesses],
+            )
+        }
+        spaces: dict[str, WorkSpace] = {
+            str(space.get_id()): space for space in DataStoreStorageRepository.load_cached_workspaces(
+                list(workspaces.values())
+            )
+        }
 
-            accesses: list[BaseAccessModel] = BaseAccessModel.query.filter(
-                BaseAccessModel.access_type == AccessType.Department,
-                BaseAccessModel.value == department.name).all()
+        return [spaces[access.workspace_id] for access in accesses if access.workspace_id in spaces]
 
-            for access in accesses:
-                workspace: WorkspaceModel = WorkspaceModel.query.filter(WorkspaceModel.id == access.workspace_id,
-                                                                        WorkspaceModel.status == WorkSpaceStatus.Active.value).first()
-                if workspace is not None:
-                    workspaces.append((workspace, access.access_type))
+    @staticmethod
+    def get_workspaces_summary(user_mail: str, archived: bool = False) -> list[tuple[WorkSpace, int]]:
+        user: UserModel = request_loader.load(UserModel.email, user_mail)
+        statuses = [WorkSpaceStatus.Active.value, WorkSpaceStatus.Archived.value] if archived else \
+            [WorkSpaceStatus.Active.value]
 
-        accesses: list[BaseAccessModel] = BaseAccessModel.query.filter(BaseAccessModel.access_type == AccessType.User,
-                                                                       BaseAccessModel.value == user.email).all()
+        rows = DataStoreStorageRepository._summary_query().filter(
+            WorkspaceModel.user_id == user.id,
+            WorkspaceModel.status.in_(statuses),
+        ).order_by(WorkspaceModel.id).all()
 
-        for access in accesses:
-            workspace: WorkspaceModel = WorkspaceModel.query.filter(WorkspaceModel.id == access.workspace_id,
-                                                                    WorkspaceModel.status == WorkSpaceStatus.Active.value).first()
+        return [DataStoreStorageRepository._to_summary(row) for row in rows]
 
-            if workspace is not None:
-                workspaces.append((workspace, access.access_type))
+    @staticmethod
+    def get_workspaces_access_summary(user_mail: str) -> list[tuple[WorkSpace, AccessType, int]]:
+        user: UserModel = request_loader.load(UserModel.email, user_mail)
 
-        for (workspace, access_type) in workspaces:
-            branches: list[BranchModel] = BranchModel.query.filter_by(workspace_id=workspace.id).all()
+        conditions = [and_(BaseAccessModel.access_type == AccessType.User, BaseAccessModel.value == user.email)]
+        if user.department_id is not None:
+            department: DepartmentModel = request_loader.load(DepartmentModel.id, user.department_id)
+            conditions.append(and_(BaseAccessModel.access_type == AccessType.Department,
+                                   BaseAccessModel.value == department.name))
+
+        rows = DataStoreStorageRepository._summary_query(BaseAccessModel.access_type).join(
+            BaseAccessModel, BaseAccessModel.workspace_id == WorkspaceModel.id
+        ).filter(
+            or_(*conditions),
+            WorkspaceModel.status == WorkSpaceStatus.Active.value,
+        ).group_by(BaseAccessModel.id, BaseAccessModel.access_type).order_by(BaseAccessModel.id).all()
+
+        workspaces_final: list[tuple[WorkSpace, AccessType, int]] = []
+        for row in rows:
+            workspace, branches_num = DataStoreStorageRepository._to_summary(row)
+            workspaces_final.append((workspace, row.access_type, branches_num))
 
-            all_branches = []
-            all_requests = []
-            indexes = []
+        return workspaces_final
 
-            for br in branches:
-                documentModel: DocumentModel = DocumentModel.query.filter_by(id=br.document_id).first()
-                document = None
+    @staticmethod
+    def get_workspaces_open_summary() -> list[tuple[WorkSpace, int]]:
+        rows = DataStoreStorageRepository._summary_query().join(
+            BaseAccessModel, BaseAccessModel.workspace_id == WorkspaceModel.id
+        ).filter(
+            BaseAccessModel.access_type == AccessType.Url,
+            WorkspaceModel.status == WorkSpaceStatus.Active.value,
+        ).group_by(BaseAccessModel.id).order_by(BaseAccessModel.id).all()
 
-                if documentModel is not None:
-                    document = Document(
-                        name=documentModel.name,
-                        task_id=documentModel.task_id,
-                        file=documentModel.file_id,
-                        time=documentModel.modification_time,
-                        _id=documentModel.id,
-                    )
+        return [DataStoreStorageRepository._to_summary(row) for row in rows]
 
-                all_branches.append(
-                    Branch(
-                        name=br.name,
-                        author=br.author,
-                        parent=br.parent_branch_id,
-                        status=br.status,
-                        document=document,
-                        _id=br.id,
-                    )
-                )
+    @staticmethod
+    def _summary_query(*columns):
+        """
+        Workspace columns needed for listings with the number of branches counted by the database
+        """
+        return WorkspaceModel.query.with_entities(
+            WorkspaceModel.id,
+            WorkspaceModel.title,
+            WorkspaceModel.description,
+            WorkspaceModel.status,
+            WorkspaceModel.main_branch,
+            *columns,
+            func.count(BranchModel.id).label('branches_num'),
+        ).outerjoin(
+            BranchModel, BranchModel.workspace_id == WorkspaceModel.id
+        ).group_by(
+            WorkspaceModel.id,
+            WorkspaceModel.title,
+            WorkspaceModel.description,
+            WorkspaceModel.status,
+            WorkspaceModel.main_branch,
+        )
 
-                requests: list[RequestModel] = RequestModel.query.filter_by(source_branch_id=br.id).all()
-                requests2: list[RequestModel] = RequestModel.query.filter_by(target_branch_id=br.id).all()
-
-                for req in requests:
-                    req_ = Request(
-                        title=req.title,
-                        description=req.description,
-                        status=req.status,
-                        source_branch_id=req.source_branch_id,
-                        target_branch_id=req.target_branch_id,
-                        _id=req.id,
-                    )
-                    if req.id not in indexes:
-                        all_requests.append(req_)
-                        indexes.append(req.id)
-                for req in requests2:
-                    req_ = Request(
-                        title=req.title,
-                        description=req.description,
-                        status=req.status,
-                        source_branch_id=req.source_branch_id,
-                        target_branch_id=req.target_branch_id,
-                        _id=req.id,
-                    )
-                    if req.id not in indexes:
-                        all_requests.append(req_)
-                        indexes.append(req.id)
+    @staticmethod
+    def _to_summary(row) -> tuple[WorkSpace, int]:
+        return WorkSpace(
+            title=row.title,
+            description=row.description,
+            branches=[],
+            requests=[],
+            accesses=[],
+            main_branch=row.main_branch,
+            status=row.status,
+            _id=row.id,
+        ), row.branches_num
 
-            workspaces_final.append(
-                (WorkSpace(
-                    title=workspace.title,
-                    description=workspace.description,
-                    branches=all_branches,
-                    requests=all_requests,
-                    accesses=[],
-                    main_branch=workspace.main_branch,
-                    status=workspace.status,
-                    _id=workspace.id,
-                ), access_type)
+    @staticmethod
+    def load_workspaces(workspaces: list[WorkspaceModel]) -> list[WorkSpace]:
+        """
+        Build WorkSpace aggregates (branches, documents, requests, accesses) for given workspace rows.
+        Every child table is read with a fixed number of IN (...) queries, whatever the number of workspaces.
+        :param workspaces: workspace rows to build
+        :return: workspaces in the same order
+        """
+        if not workspaces:
+            return []
+
+        query_in = DataStoreStorageRepository._query_in
+
+        workspace_ids = [workspace.id for workspace in workspaces]
+        branches: list[BranchModel] = query_in(BranchModel.query, BranchModel.workspace_id, workspace_ids)
+        accesses: list[BaseAccessModel] = query_in(BaseAccessModel.query, BaseAccessModel.workspace_id,
+                                                   workspace_ids)
+
+        branch_ids = [br.id for br in branches]
+        documents: dict[str, DocumentModel] = {
+            doc.id: doc for doc in query_in(
+                DocumentModel.query, DocumentModel.id,
+                [br.document_id for br in branches if br.document_id is not None],
             )
+        }
 
-        return workspaces_final
+        requests_by_source: dict[str, list[RequestModel]] = {}
+        requests_by_target: dict[str, list[RequestModel]] = {}
+        for req in query_in(RequestModel.query, RequestModel.source_branch_id, branch_ids):
+            requests_by_source.setdefault(req.source_branch_id, []).append(req)
+        for req in query_in(RequestModel.query, RequestModel.target_branch_id, branch_ids):
+            requests_by_target.setdefault(req.target_branch_id, []).append(req)
 
-    @staticmethod
-    def get_workspaces_open() -> list[WorkSpace]:
-        accesses: list[BaseAccessModel] = BaseAccessModel.query.filter(
-            BaseAccessModel.access_type == AccessType.Url).all()
+        request_loader.prime(WorkspaceModel.id, workspaces)
+        request_loader.prime(BranchModel.id, branches)
+        request_loader.prime(DocumentModel.id, documents.values())
 
-        workspaces_final: list[WorkSpace] = []
-        workspaces: list[WorkspaceModel] = []
+        branches_by_workspace: dict[str, list[BranchModel]] = {}
+        for br in branches:
+            branches_by_workspace.setdefault(br.workspace_id, []).append(br)
 
+        accesses_by_workspace: dict[str, list[BaseAccessModel]] = {}
         for access in accesses:
-            workspace: WorkspaceModel = WorkspaceModel.query.filter(WorkspaceModel.id == access.workspace_id,
-                                                                    WorkspaceModel.status == WorkSpaceStatus.Active.value).first()
-            if workspace is not None:
-                workspaces.append(workspace)
+            accesses_by_workspace.setdefault(access.workspace_id, []).append(access)
 
-        for workspace in workspaces:
-            branches: list[BranchModel] = BranchModel.query.filter_by(workspace_id=workspace.id).all()
+        workspaces_final = []
 
+        for workspace in workspaces:
             all_branches = []
             all_requests = []
-            indexes = []
+            indexes = set()
 
-            for br in branches:
-                documentModel: DocumentModel = DocumentModel.query.filter_by(id=br.document_id).first()
+            for br in branches_by_workspace.get(workspace.id, []):
+                documentModel: Optional[DocumentModel] = documents.get(br.document_id)
                 document = None
 
                 if documentModel is not None:
-                    document = Document(
-                        name=documentModel.name,
-                        task_id=documentModel.task_id,
-                        file=documentModel.file_id,
-                        time=documentModel.modification_time,
-                        _id=documentModel.id,
-                    )
+                    document = DataStoreStorageRepository._to_document(documentModel)
 
                 all_branches.append(
                     Branch(
@@ -398,33 +397,10 @@ class DataStoreStorageRepository:
                     )
                 )
 
-                requests: list[RequestModel] = RequestModel.query.filter_by(source_branch_id=br.id).all()
-                requests2: list[RequestModel] = RequestModel.query.filter_by(target_branch_id=br.id).all()
-
-                for req in requests:
-                    req_ = Request(
-                        title=req.title,
-                        description=req.description,
-                        status=req.status,
-                        source_branch_id=req.source_branch_id,
-                        target_branch_id=req.target_branch_id,
-                        _id=req.id,
-                    )
-                    if req.id not in indexes:
-                        all_requests.append(req_)
-                        indexes.append(req.id)
-                for req in requests2:
-                    req_ = Request(
-                        title=req.title,
-                        description=req.description,
-                        status=req.status,
-                        source_branch_id=req.source_branch_id,
-                        target_branch_id=req.target_branch_id,
-                        _id=req.id,
-                    )
+                for req in requests_by_source.get(br.id, []) + requests_by_target.get(br.id, []):
                     if req.id not in indexes:
-                        all_requests.append(req_)
-                        indexes.append(req.id)
+                        all_requests.append(DataStoreStorageRepository._to_request(req))
+                        indexes.add(req.id)
 
             workspaces_final.append(
                 WorkSpace(
@@ -432,7 +408,11 @@ class DataStoreStorageRepository:
                     description=workspace.description,
                     branches=all_branches,
                     requests=all_requests,
-                    accesses=[],
+                    accesses=[
+                        access for access in map(DataStoreStorageRepository._to_access,
+                                                 accesses_by_workspace.get(workspace.id, []))
+                        if access is not None
+                    ],
                     main_branch=workspace.main_branch,
                     status=workspace.status,
                     _id=workspace.id,
@@ -441,14 +421,79 @@ class DataStoreStorageRepository:
 
         return workspaces_final
 
+    @staticmethod
+    def load_cached_workspaces(workspaces: list[WorkspaceModel]) -> list[WorkSpace]:
+        """
+        Same as load_workspaces, aggregates are reused while the revision of their workspace does not change
+        :param workspaces: workspace rows to build
+        :return: workspaces in the same order
+        """
+        cached: list[Optional[WorkSpace]] = workspace_cache.get_workspaces(
+            [(workspace.id, workspace.revision) for workspace in workspaces]
+        ) if workspaces else []
+        missing = [workspace for workspace, space in zip(workspaces, cached) if space is None]
+
+        loaded = DataStoreStorageRepository.load_workspaces(missing)
+        workspace_cache.set_workspaces([
+            (workspace.id, workspace.revision, space) for workspace, space in zip(missing, loaded)
+        ])
+        built = [copy.deepcopy(space) for space in loaded]
+
+        built = iter(built)
+        return [space if space is not None else next(built) for space in cached]
+
+    @staticmethod
+    def _query_in(query, column, values: list, batch_size: int = 500) -> list:
+        """
+        Run `query` filtered by `column IN (values)`, split into batches to stay below the bound parameters limit
+        """
+        values = list(dict.fromkeys(str(value) for value in values))
+        result = []
+        for start in range(0, len(values), batch_size):
+            result += query.filter(column.in_(values[start:start + batch_size])).all()
+        return result
+
+    @staticmethod
+    def _to_document(documentModel: DocumentModel) -> Document:
+        return Document(
+            name=documentModel.name,
+            task_id=documentModel.task_id,
+            file=documentModel.file_id,
+            time=documentModel.modification_time,
+            _id=documentModel.id,
+        )
+
+    @staticmethod
+    def _to_request(req: RequestModel) -> Request:
+        return Request(
+            title=req.title,
+            description=req.description,
+            status=req.status,
+            source_branch_id=req.source_branch_id,
+            target_branch_id=req.target_branch_id,
+            _id=req.id,
+        )
+
+    @staticmethod
+    def _to_access(access: BaseAccessModel) -> Optional[BaseAccess]:
+        if access.access_type == AccessType.User:
+            return UserAccess(email=access.value, access_type=access.access_level)
+        if access.access_type == AccessType.Url:
+            return UrlAccess(url=access.value, access_type=access.access_level)
+        if access.access_type == AccessType.Department:
+            return DepartmentAccess(department_name=access.value, access_type=access.access_level)
+        return None
+
     @staticmethod
     def get_all_workspaces(deleted: bool = False) -> list[(str, WorkSpace)]:
         workspaces: list[WorkspaceModel] = WorkspaceModel.query.filter(
             WorkspaceModel.status != WorkSpaceStatus.Deleted.value
         ).all() if not deleted else WorkspaceModel.query.all()
+        owners: list[Optional[UserModel]] = request_loader.load_many(
+            UserModel.id, [workspace.user_id for workspace in workspaces]
+        )
         workspaces_list = [
-            (UserModel.query.filter_by(id=workspace.user_id).first().username if
-                UserModel.query.filter_by(id=workspace.user_id).first() is not None else "Deleted user!",
+            (owner.username if owner is not None else "Deleted user!",
              workspace.user_id,
              WorkSpace(
                 title=workspace.title,
@@ -459,15 +504,15 @@ class DataStoreStorageRepository:
                 main_branch=None,
                 status=workspace.status,
                 _id=workspace.id,
-            )) for workspace in workspaces]
+            )) for workspace, owner in zip(workspaces, owners)]
         return workspaces_list
 
     @staticmethod
     def get_workspace_by_id_admin(space_id: uuid.UUID) -> (str, WorkSpace):
-        workspace: WorkspaceModel = WorkspaceModel.query.filter_by(id=str(space_id)).first()
+        workspace: WorkspaceModel = request_loader.load(WorkspaceModel.id, space_id)
         if workspace is None:
             raise SpaceNotFoundError
-        user = UserModel.query.filter_by(id=workspace.user_id).first()
+        user = request_loader.load(UserModel.id, workspace.user_id)
         username = user.username if user is not None else "Deleted user!"
         return (username, workspace.user_id, WorkSpace(
             title=workspace.title,
@@ -481,12 +526,41 @@ class DataStoreStorageRepository:
         ))
     
     def delete_user_workspace(self, space_id: uuid.UUID):
-        workspace: WorkspaceModel = WorkspaceModel.query.filter_by(id=str(space_id)).first()
+        workspace: WorkspaceModel = request_loader.load(WorkspaceModel.id, space_id)
         workspace.user_id = None
+        self._bump_revision(space_id)
         self.db.session.commit()
+        access_cache.invalidate_workspace(space_id)
+
+    def create_workspace(self, user_mail: str, workspace: WorkSpace, document_name: str,
+                         document_data: str | BinaryIO, task: str, document_length: int = -1):
+        # The file goes first, a failed upload leaves no workspace without content behind
+        blob_id, size = self.save_blob_to_cloud(document_data, document_length)
+
+        return self._create_workspace(user_mail, workspace, document_name, task, blob_id)
 
-    def create_workspace(self, user_mail: str, workspace: WorkSpace, document_name: str, document_data: str, task: str):
-        user: UserModel = UserModel.query.filter_by(email=user_mail).first()
+    def copy_workspace(self, user_mail: str, workspace: WorkSpace, document_name: str,
+                       source_document_id: uuid.UUID, task: str):
+        """
+        Create a workspace whose document shares the content of an existing document, nothing is copied
+        :raise FileNotFoundError: unknown source document
+        :raise NotAllowedError: no access to the source document
+        """
+        self.get_document_by_id(user_mail, source_document_id)
+        source: DocumentModel = request_loader.load(DocumentModel.id, source_document_id)
+
+        legacy_object_name = self._object_name(source) if source.blob_id is None else None
+        if legacy_object_name is not None:
+            self._migrate_legacy_object(source)
+
+        workspace_id = self._create_workspace(user_mail, workspace, document_name, task, source.blob_id)
+
+        if legacy_object_name is not None:
+            self.minio_client.remove_object("sud", legacy_object_name)
+        return workspace_id
+
+    def _create_workspace(self, user_mail: str, workspace: WorkSpace, document_name: str, task: str, blob_id: str):
+        user: UserModel = request_loader.load(UserModel.email, user_mail)
 
         workspace_id = str(uuid.uuid4())
 
@@ -512,7 +586,6 @@ class DataStoreStorageRepository:
             user_id=user.id,
         )
         self.db.session.add(_workspace)
-        self.db.session.commit()
 
         try:
             task = uuid.UUID(task)
@@ -521,7 +594,7 @@ class DataStoreStorageRepository:
 
         document = Document(name=document_name, file=file_id, task_id=task,
                             time=datetime.datetime.now(), _id=file_id)
-        self.add_new_document(document, document_data, _branch)
+        self._add_document(document, blob_id, _branch.id)
 
         self.db.session.add(_branch)
         self.db.session.commit()
@@ -530,125 +603,81 @@ class DataStoreStorageRepository:
 
     def get_workspace_by_id(self, user_mail: str, space_id: uuid.UUID, archived: bool = False) -> Optional[
         tuple[str, str, WorkSpace]]:
-        user: UserModel = UserModel.query.filter_by(email=user_mail).first()
-
-        spaces: list[WorkSpace] = self.get_workspaces(user_mail, archived)
-        for space in spaces:
-            if str(space.get_id()) == str(space_id):
-                return UserModel.query.filter_by(id=user.id).first().username, user.id, space
-
-        space: WorkspaceModel = WorkspaceModel.query.filter_by(id=str(space_id)).first()
-        if space is not None and str(space.status) == str(WorkSpaceStatus.Active.value):
-            branches: list[BranchModel] = BranchModel.query.filter_by(workspace_id=space.id).all()
-
-            all_branches = []
-            all_requests = []
-            all_accesses = []
-            indexes = []
-
-            accesses: list[BaseAccessModel] = BaseAccessModel.query.filter_by(workspace_id=space.id).all()
-
-            for access in accesses:
-
-                if access.access_type == AccessType.User:
-                    all_accesses.append(
-                        UserAccess(
-                            email=access.value,
-                            access_type=access.access_level,
-                        )
-                    )
-
-                if access.access_type == AccessType.Url:
-                    all_accesses.append(
-                        UrlAccess(
-                            url=access.value,
-                            access_type=access.access_level,
-                        )
-                    )
-
-                if access.access_type == AccessType.Department:
-                    all_accesses.append(
-                        DepartmentAccess(
-                            department_name=access.value,
-                            access_type=access.access_level,
-                        )
-                    )
-
-            for br in branches:
-                documentModel: DocumentModel = DocumentModel.query.filter_by(id=br.document_id).first()
-                document = None
+        user, space = self._get_visible_workspace(user_mail, space_id, archived)
+
+        if str(space.user_id) == str(user.id):
+            return user.username, user.id, self._load_workspace(space)
+
+        owner: Optional[UserModel] = request_loader.load(UserModel.id, space.user_id)
+        username = owner.username if owner is not None else "Deleted user!"
+        return username, space.user_id, self._load_workspace(space)
+
+    def get_workspace_revision(self, user_mail: str, space_id: uuid.UUID, archived: bool = False) -> int:
+        """
+        Revision of a workspace, read with its row only; access is checked as in get_workspace_by_id
+        """
+        return self._get_visible_workspace(user_mail, space_id, archived)[1].revision
+
+    def _get_visible_workspace(self, user_mail: str, space_id: uuid.UUID,
+                               archived: bool) -> tuple[UserModel, WorkspaceModel]:
+        """
+        :raise SpaceNotFoundError: no such workspace, or it is not active (nor archived for its owner if archived)
+        :raise NotAllowedError: no access to the workspace
+        """
+        user: UserModel = request_loader.load(UserModel.email, user_mail)
+        space: WorkspaceModel = request_loader.load(WorkspaceModel.id, space_id)
+
+        if space is None:
+            raise SpaceNotFoundError()
+
+        if str(space.user_id) == str(user.id):
+            statuses = [WorkSpaceStatus.Active.value, WorkSpaceStatus.Archived.value] if archived else \
+                [WorkSpaceStatus.Active.value]
+            if space.status not in statuses:
+                raise SpaceNotFoundError()
+            return user, space
+
+        if str(space.status) != str(WorkSpaceStatus.Active.value):
+            raise SpaceNotFoundError()
+
+        if self.get_access_level_to_workspace(space.id, user) is None:
+            raise NotAllowedError()
 
-                if documentModel is not None:
-                    document = Document(
-                        name=documentModel.name,
-                        task_id=documentModel.task_id,
-                        file=documentModel.file_id,
-                        time=documentModel.modification_time,
-                        _id=documentModel.id,
-                    )
+        return user, space
 
-                all_branches.append(
-                    Branch(
-                        name=br.name,
-                        author=br.author,
-                        parent=br.parent_branch_id,
-                        status=br.status,
-                        document=document,
-                        _id=br.id,
-                    )
-                )
+    def _bump_revision(self, space_id: uuid.UUID | str) -> None:
+        """
+        Mark the workspace as changed, within the transaction of the change
+        """
+        self.db.session.execute(update(WorkspaceModel).where(WorkspaceModel.id == str(space_id)).values(
+            revision=WorkspaceModel.revision + 1
+        ))
 
-                requests: list[RequestModel] = RequestModel.query.filter_by(source_branch_id=br.id).all()
-                requests2: list[RequestModel] = RequestModel.query.filter_by(target_branch_id=br.id).all()
-
-                for req in requests:
-                    req_ = Request(
-                        title=req.title,
-                        description=req.description,
-                        status=req.status,
-                        source_branch_id=req.source_branch_id,
-                        target_branch_id=req.target_branch_id,
-                        _id=req.id,
-                    )
-                    if req.id not in indexes:
-                        all_requests.append(req_)
-                        indexes.append(req.id)
-                for req in requests2:
-                    req_ = Request(
-                        title=req.title,
-                        description=req.description,
-                        status=req.status,
-                        source_branch_id=req.source_branch_id,
-                        target_branch_id=req.target_branch_id,
-                        _id=req.id,
-                    )
-                    if req.id not in indexes:
-                        all_requests.append(req_)
-                        indexes.append(req.id)
-
-            workspace: WorkSpace = WorkSpace(
-                title=space.title,
-                description=space.description,
-                main_branch=space.main_branch,
-                status=space.status,
-                _id=space.id,
-                branches=all_branches,
-                requests=all_requests,
-                accesses=all_accesses,
-            )
-            if self.has_access_to_workspace(workspace, user):
-                return UserModel.query.filter_by(id=space.user_id).first().username, space.user_id, workspace
-            else:
-                raise NotAllowedError()
+    def _bump_revision_of_branch(self, branch_column, value: uuid.UUID | str) -> None:
+        """
+        Mark the workspace of the branch with `branch_column == value` as changed
+        """
+        branch_workspace = select(BranchModel.workspace_id).where(branch_column == str(value)).scalar_subquery()
+        self.db.session.execute(update(WorkspaceModel).where(WorkspaceModel.id == branch_workspace).values(
+            revision=WorkspaceModel.revision + 1
+        ))
 
-        raise SpaceNotFoundError()
+    def _load_workspace(self, space: WorkspaceModel) -> WorkSpace:
+        """
+        Aggregate of one workspace, concurrent requests for the same revision of a workspace share one load
+        """
+        workspace, shared = _workspace_loads.do((str(space.id), space.revision),
+                                                lambda: self.load_cached_workspaces([space])[0])
+        return copy.deepcopy(workspace) if shared else workspace
 
     def change_workspace_status(self, space_id: uuid.UUID, status: str, user_mail: str | None = None, admin=False):
         if admin or self.is_author_of_workspace(user_mail, space_id):
             self.db.session.execute(update(WorkspaceModel).where(WorkspaceModel.id == str(space_id)).values(
-                status=status
+                status=status,
+                revision=WorkspaceModel.revision + 1,
             ))
             self.db.session.commit()
+            access_cache.invalidate_workspace(space_id)
             return None
         else:
             raise NotAllowedError()
@@ -659,9 +688,11 @@ class DataStoreStorageRepository:
         if user is None:
             raise UserNotFoundError
         self.db.session.execute(update(WorkspaceModel).where(WorkspaceModel.id == str(space_id)).values(
-            user_id=str(user.id)
+            user_id=str(user.id),
+            revision=WorkspaceModel.revision + 1,
         ))
         self.db.session.commit()
+        access_cache.invalidate_workspace(space_id)
         return None
 
     #############
@@ -671,17 +702,17 @@ class DataStoreStorageRepository:
     def get_branch_in_workspace_by_id(
             self, user_mail: str, space_id: uuid.UUID, branch_id: uuid.UUID
     ) -> tuple[Optional[Branch], str, str, list[Request]]:
-        user: UserModel = UserModel.query.filter_by(email=user_mail).first()
+        user: UserModel = request_loader.load(UserModel.email, user_mail)
         username, user_id, workspace = self.get_workspace_by_id(user_mail, space_id)
 
         if self.has_access_to_workspace(workspace, user):
             for branch in workspace.branches:
                 if str(branch.get_id()) == str(branch_id):
-                    user: UserModel = UserModel.query.filter_by(id=branch.author).first()
+                    user: UserModel = request_loader.load(UserModel.id, branch.author)
 
                     original_branch_name: str = "" if str(
-                        branch.get_parent_id()) == "-1" else BranchModel.query.filter_by(
-                        id=branch.get_parent_id()).first().name
+                        branch.get_parent_id()) == "-1" else request_loader.load(
+                        BranchModel.id, branch.get_parent_id()).name
 
                     all_requests = []
                     requests: list[RequestModel] = RequestModel.query.filter_by(source_branch_id=branch.get_id()).all()
@@ -705,7 +736,7 @@ class DataStoreStorageRepository:
     def get_branches_in_workspace(
             self, user_mail: str, space_id: uuid.UUID
     ) -> list[Branch]:
-        user: UserModel = UserModel.query.filter_by(email=user_mail).first()
+        user: UserModel = request_loader.load(UserModel.email, user_mail)
         username, user_id, workspace = self.get_workspace_by_id(user_mail, space_id)
         list_of_branches = []
 
@@ -720,7 +751,7 @@ class DataStoreStorageRepository:
     def get_master_branch_in_workspace(
             self, user_mail: str, space_id: uuid.UUID
     ) -> Branch:
-        user: UserModel = UserModel.query.filter_by(email=user_mail).first()
+        user: UserModel = request_loader.load(UserModel.email, user_mail)
         username, user_id, workspace = self.get_workspace_by_id(user_mail, space_id)
 
         if self.has_access_to_workspace(workspace, user):
@@ -730,17 +761,19 @@ class DataStoreStorageRepository:
         raise SpaceNotFoundError()
 
     def delete_branch_from_workspace_by_id(self, user_mail: str, space_id: uuid.UUID, branch_id: uuid.UUID):
-        branch: BranchModel = BranchModel.query.filter_by(id=branch_id).first()
-        user: UserModel = UserModel.query.filter_by(email=user_mail).first()
+        branch: BranchModel = request_loader.load(BranchModel.id, branch_id)
+        user: UserModel = request_loader.load(UserModel.email, user_mail)
 
         if self.is_author_of_workspace(user_mail, space_id) or branch.author == user.id:
+            self._bump_revision_of_branch(BranchModel.id, branch_id)
+            self._release_blob(self._branch_blob_id(branch_id))
             self.db.session.execute(delete(BranchModel).where(BranchModel.id == branch_id))
             self.db.session.commit()
         else:
             raise NotAllowedError()
 
     def create_branch_for_workspace(self, user_mail: str, workspace_id: uuid.UUID, branch: Branch):
-        user: UserModel = UserModel.query.filter_by(email=user_mail).first()
+        user: UserModel = request_loader.load(UserModel.email, user_mail)
         username, user_id, workspace = self.get_workspace_by_id(user_mail, workspace_id)
 
         document_id = uuid.uuid4()
@@ -756,20 +789,25 @@ class DataStoreStorageRepository:
                 parent_branch_id=str(branch.get_parent_id()),
             )
 
-            old_document: DocumentModel = DocumentModel.query.filter_by(id=branch.document).first()
-
-            document_data = BytesIO(self.get_file_from_cloud(old_document.id + "_" + old_document.name)).read()
+            old_document: DocumentModel = request_loader.load(DocumentModel.id, branch.document)
 
             document = Document(name=old_document.name, file=old_document.file_id, task_id=uuid.uuid4(),
                                 time=datetime.datetime.now(), _id=document_id)
 
-            base64_bytes = base64.b64encode(document_data).decode('ascii')
+            legacy_object_name = self._object_name(old_document) if old_document.blob_id is None else None
+            if legacy_object_name is not None:
+                self._migrate_legacy_object(old_document)
 
-            self.add_new_document(document, base64_bytes, _branch)
+            # Same content, the new document only references the blob
+            self._add_document(document, old_document.blob_id, _branch.id)
 
             self.db.session.add(_branch)
             workspace.branches.append(_branch)
+            self._bump_revision(workspace_id)
             self.db.session.commit()
+
+            if legacy_object_name is not None:
+                self.minio_client.remove_object("sud", legacy_object_name)
             return _branch.id
         else:
             raise NotAllowedError()
@@ -781,7 +819,7 @@ class DataStoreStorageRepository:
     def get_request_in_workspace_by_id(
             self, user_mail: str, space_id: uuid.UUID, request_id: uuid.UUID
     ) -> Optional[Request]:
-        user: UserModel = UserModel.query.filter_by(email=user_mail).first()
+        user: UserModel = request_loader.load(UserModel.email, user_mail)
         username, user_id, workspace = self.get_workspace_by_id(user_mail, space_id)
 
         if self.has_access_to_workspace(workspace, user):
@@ -792,22 +830,23 @@ class DataStoreStorageRepository:
             raise NotAllowedError()
 
     def change_request_status(self, user_mail: str, workspace_id: uuid.UUID, request_id: uuid.UUID, status: str):
-        user: UserModel = UserModel.query.filter_by(email=user_mail).first()
+        user: UserModel = request_loader.load(UserModel.email, user_mail)
         username, user_id, workspace = self.get_workspace_by_id(user_mail, workspace_id)
-        request: RequestModel = RequestModel.query.filter_by(id=request_id).first()
-        branch: BranchModel = BranchModel.query.filter_by(id=request.source_branch_id).first()
+        request: RequestModel = request_loader.load(RequestModel.id, request_id)
+        branch: BranchModel = request_loader.load(BranchModel.id, request.source_branch_id)
 
         if self.has_access_to_workspace(workspace, user) or branch.author == user.id:
             self.db.session.execute(update(RequestModel).where(RequestModel.id == str(request_id)).values(
                 status=status
             ))
+            self._bump_revision(workspace_id)
 
             self.db.session.commit()
         else:
             raise NotAllowedError()
 
     def create_request_for_branch(self, user_mail: str, workspace_id: uuid.UUID, request: Request):
-        user: UserModel = UserModel.query.filter_by(email=user_mail).first()
+        user: UserModel = request_loader.load(UserModel.email, user_mail)
         username, user_id, workspace = self.get_workspace_by_id(user_mail, workspace_id)
 
         if self.has_access_to_workspace(workspace, user):
@@ -822,6 +861,7 @@ class DataStoreStorageRepository:
 
             self.db.session.add(_request)
             workspace.requests.append(_request)
+            self._bump_revision(workspace_id)
 
             self.db.session.commit()
 
@@ -846,6 +886,9 @@ class DataStoreStorageRepository:
 
             branch = self.get_branch_in_workspace_by_id(user_mail, workspace_id, current_request.get_source_branch_id())[0]
 
+            # The target branch gets the document of the source branch
+            self._release_blob(self._branch_blob_id(current_request.get_target_branch_id()))
+            self._reference_blob(self._branch_blob_id(current_request.get_source_branch_id()))
             self.db.session.execute(
                 update(BranchModel).where(BranchModel.id == str(current_request.get_target_branch_id())).values(
                     document_id=branch.document.get_id()
@@ -856,146 +899,472 @@ class DataStoreStorageRepository:
                     status=BranchStatus.Merged.value
                 ))
             #self.delete_branch_from_workspace_by_id(user_mail, workspace_id, branch.get_id())
+            # Commits the merge and bumps the revision
             self.change_request_status(user_mail, workspace_id, request_id, RequestStatus.Merged.value)
         else:
             raise NotAllowedError()
 
-    def add_new_document(self, new_document: Document, new_file_data: str, branch: BranchModel) -> uuid.UUID:
+    def add_new_document(self, new_document: Document, new_file_data: str | BinaryIO, branch_id: uuid.UUID,
+                         length: int = -1) -> uuid.UUID:
+        # The file goes first, a failed upload leaves no document without content behind
+        blob_id, size = self.save_blob_to_cloud(new_file_data, length)
+
+        return self._add_document(new_document, blob_id, branch_id)
+
+    def _add_document(self, new_document: Document, blob_id: str, branch_id: uuid.UUID) -> uuid.UUID:
         doc = DocumentModel(
             id=str(new_document.get_id()),
             name=new_document.name,
             task_id=str(new_document.task_id),
             modification_time=datetime.datetime.now(),
             file_id=str(new_document.file),
+            blob_id=blob_id,
         )
 
+        # None for the new branches of workspaces and copies
+        self._release_blob(self._branch_blob_id(branch_id))
         self.db.session.add(doc)
+        self._reference_blob(blob_id)
 
-        self.db.session.execute(update(BranchModel).where(BranchModel.id == str(branch.id)).values(
+        self.db.session.execute(update(BranchModel).where(BranchModel.id == str(branch_id)).values(
             document_id=doc.id
         ))
+        self._bump_revision_of_branch(BranchModel.id, branch_id)
 
         self.db.session.commit()
+        return new_document.get_id()
 
-        fn = str(new_document.get_id()) + "_" + new_document.name
-        with open(f'cache/{fn}', "wb") as fh:
-            fh.write(base64.decodebytes(str.encode(new_file_data)))
+    def save_file_to_cloud(self, file_name: str, data: str | bytes | BinaryIO, length: int = -1):
+        """
+        Stream file content straight into the bucket, nothing is staged on the local disk
+        :param file_name: object name
+        :param data: file content, base64 string, bytes or a readable binary stream
+        :param length: size of the stream, -1 if unknown (then it is uploaded with multipart)
+        """
+        if isinstance(data, str):
+            data = base64.decodebytes(str.encode(data))
+        if isinstance(data, bytes):
+            data, length = BytesIO(data), len(data)
+        self.minio_client.put_object(
+            "sud", file_name, data, length,
+            part_size=UPLOAD_PART_SIZE if length == -1 else 0,
+        )
 
-        self.save_file_to_cloud(fn)
-        return new_document.get_id()
+    #############
+    # BLOBS
+    #############
 
-    def save_file_to_cloud(self, file_name):
-        self.minio_client.fput_object("sud", file_name, f"cache/{file_name}")
-        print(f"'cache/{file_name}' is successfully uploaded as object 'test_file.py' to bucket 'cloud_storage'.")
-        os.remove(f"cache/{file_name}")
+    def save_blob_to_cloud(self, data: str | bytes | BinaryIO, length: int = -1) -> tuple[str, int]:
+        """
+        Store content under its SHA-256 and register the blob, content of a referenced blob is not written again.
+        A stream is hashed while it is uploaded under a temporary name, then copied within the storage.
+        The blob row stays locked until the caller commits, so the blob can't be collected before it is referenced.
+        :return: blob id and size of the content
+        """
+        if isinstance(data, str):
+            data = base64.decodebytes(str.encode(data))
+
+        if isinstance(data, bytes):
+            blob_id = hashlib.sha256(data).hexdigest()
+            if self._lock_blob(blob_id, len(data)) == 0:
+                self.save_file_to_cloud(BLOB_PREFIX + blob_id, data)
+            return blob_id, len(data)
+
+        reader = HashingReader(data)
+        upload_name = UPLOAD_PREFIX + str(uuid.uuid4())
+        self.save_file_to_cloud(upload_name, reader, length)
+        try:
+            blob_id = reader.hexdigest()
+            if self._lock_blob(blob_id, reader.size) == 0:
+                self._copy_object(upload_name, BLOB_PREFIX + blob_id, reader.size)
+        finally:
+            self.minio_client.remove_object("sud", upload_name)
+        return blob_id, reader.size
+
+    def _copy_object(self, source_name: str, target_name: str, size: int) -> None:
+        """
+        Copy an object within the storage. A single copy is limited to MAX_COPY_SIZE,
+        larger objects are composed from ranges of the source instead.
+        """
+        if size <= MAX_COPY_SIZE:
+            self.minio_client.copy_object("sud", target_name, CopySource("sud", source_name))
+            return
+        self.minio_client.compose_object("sud", target_name, [
+            ComposeSource("sud", source_name, offset=offset, length=min(MAX_COPY_SIZE, size - offset))
+            for offset in range(0, size, MAX_COPY_SIZE)
+        ])
+
+    def _register_blob(self, blob_id: str, size: int, released_at: Optional[datetime.datetime] = None) -> bool:
+        """
+        Add the blob row unless it exists, concurrent uploads of the same content may both get here
+        :param released_at: set for content nothing references yet, collected unless referenced in time
+        :return: whether the row was added
+        """
+        insert = postgresql.insert if self.db.engine.dialect.name == 'postgresql' else sqlite.insert
+        return self.db.session.execute(
+            insert(BlobModel).values(id=blob_id, size=size, ref_count=0, released_at=released_at)
+            .on_conflict_do_nothing(index_elements=['blob_id'])
+        ).rowcount == 1
+
+    def _lock_blob(self, blob_id: str, size: int) -> int:
+        """
+        Register the blob and lock its row until the transaction ends, see collect_unreferenced_blobs
+        :return: reference count; at 0 the content may be missing from the storage, written again by the caller
+        """
+        while True:
+            self._register_blob(blob_id, size)
+            ref_count = self.db.session.execute(
+                select(BlobModel.ref_count).where(BlobModel.id == blob_id).with_for_update()
+            ).scalar()
+            # None if a collection removed the row in between
+            if ref_count is not None:
+                return ref_count
+
+    def _reference_blob(self, blob_id: Optional[str], count: int = 1) -> None:
+        """
+        :param blob_id: None for documents still stored as "<document_id>_<name>" objects, nothing to count
+        :param count: number of new references
+        """
+        if blob_id is None or count == 0:
+            return
+        self.db.session.execute(update(BlobModel).where(BlobModel.id == blob_id).values(
+            ref_count=BlobModel.ref_count + count,
+            released_at=None,
+        ))
 
-    def get_binary_file_from_cloud_by_id(self, file_name: str) -> BinaryIO:
-        return BytesIO(self.get_file_from_cloud(f"{file_name}"))
+    def _release_blob(self, blob_id: Optional[str]) -> None:
+        if blob_id is None:
+            return
+        self.db.session.execute(update(BlobModel).where(BlobModel.id == blob_id).values(
+            ref_count=BlobModel.ref_count - 1,
+            released_at=case((BlobModel.ref_count <= 1, datetime.datetime.now()), else_=BlobModel.released_at),
+        ))
 
-    def get_base64_file_from_cloud_by_id(self, file_name: str) -> str:
-        document_data = BytesIO(self.get_file_from_cloud(f"{file_name}")).read()
-        return base64.b64encode(document_data).decode('ascii')
+    def _branch_blob_id(self, branch_id: uuid.UUID | str) -> Optional[str]:
+        """
+        Blob of the document of a branch, None for unknown branches and legacy documents
+        """
+        return self.db.session.execute(
+            select(DocumentModel.blob_id)
+            .join(BranchModel, BranchModel.document_id == DocumentModel.id)
+            .where(BranchModel.id == str(branch_id))
+        ).scalar()
+
+    def collect_unreferenced_blobs(self, batch_size: int = 100) -> int:
+        """
+        Remove blobs no branch has referenced for storage_grace_period, with their content.
+        Rows locked by uploads of the same content are skipped, the next sweep looks at them again.
+        :return: number of blobs removed
+        """
+        released_before = datetime.datetime.now() - datetime.timedelta(seconds=storage_grace_period)
+        blob_ids = self.db.session.execute(
+            select(BlobModel.id)
+            .where(BlobModel.ref_count <= 0, BlobModel.released_at < released_before)
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+        ).scalars().all()
+
+        # Content first: an interrupted collection leaves rows at 0, whose content is written again when reused
+        for blob_id in blob_ids:
+            self.minio_client.remove_object("sud", BLOB_PREFIX + blob_id)
+        self.db.session.execute(delete(BlobModel).where(BlobModel.id.in_(blob_ids)))
+        self.db.session.commit()
+        return len(blob_ids)
+
+    def collect_abandoned_uploads(self) -> int:
+        """
+        Remove staging objects under uploads/ older than storage_grace_period: presigned uploads never finalized,
+        and streams left behind by a process that stopped while hashing them
+        :return: number of objects removed
+        """
+        modified_before = datetime.datetime.now(datetime.timezone.utc) - datetime.timedelta(
+            seconds=storage_grace_period)
+        removed = 0
+        for item in self.minio_client.list_objects("sud", prefix=UPLOAD_PREFIX, recursive=True):
+            if item.last_modified is not None and item.last_modified < modified_before:
+                self.minio_client.remove_object("sud", item.object_name)
+                removed += 1
+        return removed
+
+    def _migrate_legacy_object(self, document: DocumentModel) -> str:
+        """
+        Copy the "<document_id>_<name>" object of a document created before blobs to a blob within the storage
+        and point the document to it. Changes are left in the session, the caller commits and then removes
+        the old object. The document row stays locked until the caller commits: a concurrent request finds
+        the document already moved, and neither copies the object nor counts its branches again.
+        :return: blob id
+        :raise FileNotFoundError: no object for the document
+        """
+        self.db.session.refresh(document, with_for_update=True)
+        if document.blob_id is not None:
+            return document.blob_id
+
+        blob_id = str(document.id)
+        object_name = self._object_name(document)
+        size = self.get_file_size_from_cloud(object_name)
+        self._copy_object(object_name, BLOB_PREFIX + blob_id, size)
+
+        self._register_blob(blob_id, size)
+        self._reference_blob(blob_id, self.db.session.execute(
+            select(func.count()).select_from(BranchModel).where(BranchModel.document_id == str(document.id))
+        ).scalar())
+        document.blob_id = blob_id
+        return blob_id
+
+    @staticmethod
+    def _object_name(document: DocumentModel) -> str:
+        if document.blob_id is not None:
+            return BLOB_PREFIX + document.blob_id
+        return f"{document.id}_{document.name}"
+
+    def get_document_object_name(self, document_id: uuid.UUID) -> str:
+        """
+        Name of the storage object holding the content of the document
+        :raise FileNotFoundError: unknown document
+        """
+        doc: Optional[DocumentModel] = request_loader.load(DocumentModel.id, document_id)
+        if doc is None:
+            raise FileNotFoundError
+        return self._object_name(doc)
+
+    def get_binary_file_from_cloud_by_id(self, file_name: str, offset: int = 0,
+                                         length: int = 0) -> CloudFileStream | CachedBlobStream:
+        """
+        Open a file for streaming, its content is read from the storage only while the stream is consumed.
+        Content-addressed blobs are served from the local blob cache. On a miss:
+        - a ranged read is served from the storage, the blob is not cached;
+        - a blob small enough for the memory tier is read into the cache once, concurrent requests for it
+          wait for that read instead of reading it from the storage too;
+        - a larger blob is streamed from the storage and added to the cache as the stream is read to the end.
+        :param offset: first byte to read
+        :param length: number of bytes to read, 0 to read up to the end
+        :raise FileNotFoundError: no such object
+        """
+        if _CACHEABLE_OBJECT_NAME.fullmatch(file_name) is not None:
+            cached = blob_cache.open_blob(file_name, offset, length)
+            if cached is not None:
+                return cached
+
+            if not offset and not length:
+                blob: Optional[BlobModel] = request_loader.load(BlobModel.id, file_name[len(BLOB_PREFIX):])
+                if blob is not None and blob.size is not None and blob_cache.fits_memory(blob.size):
+                    _blob_fetches.do(file_name, lambda: self._fetch_blob_into_cache(file_name))
+                    cached = blob_cache.open_blob(file_name)
+                    if cached is not None:
+                        return cached
+
+                stream = self._open_object(file_name)
+                return blob_cache.read_through(file_name, stream, stream.size)
+
+        return self._open_object(file_name, offset, length)
+
+    def _open_object(self, file_name: str, offset: int = 0, length: int = 0) -> CloudFileStream:
+        """
+        :raise FileNotFoundError: no such object
+        """
+        try:
+            response = self.minio_client.get_object("sud", file_name, offset=offset, length=length)
+        except Exception:
+            raise FileNotFoundError
+        size = response.headers.get('Content-Length')
+        return CloudFileStream(response, int(size) if size is not None else None)
+
+    def _fetch_blob_into_cache(self, file_name: str) -> None:
+        """
+        Read a whole blob into the blob cache
+        :raise FileNotFoundError: no such object
+        """
+        with self._open_object(file_name) as stream:
+            with blob_cache.read_through(file_name, stream, stream.size) as reader:
+                while reader.read(CACHE_FILL_CHUNK_SIZE):
+                    pass
+
+    def get_file_size_from_cloud(self, file_name: str) -> int:
+        if _CACHEABLE_OBJECT_NAME.fullmatch(file_name) is not None:
+            size = blob_cache.get_size(file_name)
+            if size is not None:
+                return size
+            blob: Optional[BlobModel] = request_loader.load(BlobModel.id, file_name[len(BLOB_PREFIX):])
+            if blob is not None and blob.size is not None:
+                return blob.size
+        try:
+            return self.minio_client.stat_object("sud", file_name).size
+        except Exception:
+            raise FileNotFoundError
 
     def rename_file(self, user_mail, document_id, new_name):
-        branch: BranchModel = BranchModel.query.filter_by(document_id=str(document_id)).first()
+        branch: BranchModel = request_loader.load(BranchModel.document_id, document_id)
 
-        user: UserModel = UserModel.query.filter_by(email=user_mail).first()
+        user: UserModel = request_loader.load(UserModel.email, user_mail)
         username, user_id, workspace = self.get_workspace_by_id(user_mail, branch.workspace_id)
 
         if self.has_edit_access_to_workspace(workspace, user):
-            doc: DocumentModel = DocumentModel.query.filter_by(id=str(document_id)).first()
-
-            document_data = BytesIO(self.get_file_from_cloud(doc.id + "_" + doc.name)).read()
-
-            new_file_data = base64.b64encode(document_data).decode('ascii')
+            doc: DocumentModel = request_loader.load(DocumentModel.id, document_id)
 
-            fn = str(document_id) + "_" + new_name
+            # The object is named after the document, it is moved to a blob once and for all
+            legacy_object_name = self._object_name(doc) if doc.blob_id is None else None
+            if legacy_object_name is not None:
+                self._migrate_legacy_object(doc)
 
             self.db.session.execute(update(DocumentModel).where(DocumentModel.id == str(document_id)).values(
                 name=new_name
             ))
+            self._bump_revision(branch.workspace_id)
             self.db.session.commit()
 
-            with open(f'cache/{fn}', "wb") as fh:
-                fh.write(base64.decodebytes(str.encode(new_file_data)))
-
-            self.save_file_to_cloud(fn)
+            if legacy_object_name is not None:
+                self.minio_client.remove_object("sud", legacy_object_name)
         else:
             raise AccessError()
 
-    def update_document(self, user_mail: str, document_id: uuid.UUID, document_name: str, new_file_data: str) -> uuid.UUID:
-        branch: BranchModel = BranchModel.query.filter_by(document_id=str(document_id)).first()
+    def update_document(self, user_mail: str, document_id: uuid.UUID, document_name: str,
+                        new_file_data: str | BinaryIO, length: int = -1) -> uuid.UUID:
+        branch, old_document = self._get_editable_document(user_mail, document_id)
 
-        user: UserModel = UserModel.query.filter_by(email=user_mail).first()
-        username, user_id, workspace = self.get_workspace_by_id(user_mail, branch.workspace_id)
+        blob_id, size = self.save_blob_to_cloud(new_file_data, length)
 
-        if self.has_edit_access_to_workspace(workspace, user):
-            new_document_id = uuid.uuid4()
+        return self._add_document_version(branch, old_document, uuid.uuid4(), document_name, blob_id).id
 
-            new_document: DocumentModel = DocumentModel.query.filter_by(id=str(document_id)).first()
+    def _get_editable_document(self, user_mail: str, document_id: uuid.UUID) -> tuple[BranchModel, DocumentModel]:
+        """
+        :return: branch holding the document and the document itself
+        :raise FileNotFoundError: unknown document
+        :raise AccessError: user can not edit the workspace of the document
+        """
+        branch: BranchModel = request_loader.load(BranchModel.document_id, document_id)
+        if branch is None:
+            raise FileNotFoundError
 
-            doc = DocumentModel(
-                id=str(new_document_id),
-                name=document_name,
-                task_id=str(new_document.task_id),
-                modification_time=datetime.datetime.now(),
-                file_id=str(new_document.file_id),
-            )
+        user: UserModel = request_loader.load(UserModel.email, user_mail)
+        username, user_id, workspace = self.get_workspace_by_id(user_mail, branch.workspace_id)
 
-            self.db.session.add(doc)
+        if not self.has_edit_access_to_workspace(workspace, user):
+            raise AccessError()
 
-            self.db.session.execute(update(BranchModel).where(BranchModel.id == str(branch.id)).values(
-                document_id=str(new_document_id)
-            ))
+        return branch, request_loader.load(DocumentModel.id, document_id)
 
-            self.db.session.commit()
+    def _add_document_version(self, branch: BranchModel, old_document: DocumentModel, new_document_id: uuid.UUID,
+                              document_name: str, blob_id: str) -> DocumentModel:
+        """
+        Make a new version the document of the branch, unless another version replaced the old document first
+        :raise VersionConflictError: the branch no longer holds the old document, the version is not added
+        """
+        doc = DocumentModel(
+            id=str(new_document_id),
+            name=document_name,
+            task_id=str(old_document.task_id),
+            modification_time=datetime.datetime.now(),
+            file_id=str(old_document.file_id),
+            blob_id=blob_id,
+        )
 
-            fn = str(doc.id) + "_" + doc.name
-            with open(f'cache/{fn}', "wb") as fh:
-                fh.write(base64.decodebytes(str.encode(new_file_data)))
+        self.db.session.add(doc)
 
-            self.save_file_to_cloud(fn)
-            return doc.id
-        else:
-            raise AccessError()
+        # The update locks the branch row, a concurrent version of the same document waits for it and changes
+        # no row: the old blob is released once, by the version that replaced the old document
+        moved = self.db.session.execute(update(BranchModel).where(
+            BranchModel.id == str(branch.id), BranchModel.document_id == str(old_document.id)
+        ).values(
+            document_id=str(new_document_id)
+        )).rowcount
+        if moved != 1:
+            size = self.db.session.execute(select(BlobModel.size).where(BlobModel.id == blob_id)).scalar()
+            self.db.session.rollback()
+            # Content stored for this version alone is left to the collection
+            if size is not None and self._register_blob(blob_id, size, released_at=datetime.datetime.now()):
+                self.db.session.commit()
+            raise VersionConflictError
+
+        self._release_blob(old_document.blob_id)
+        self._reference_blob(blob_id)
+        self._bump_revision(branch.workspace_id)
 
-    @staticmethod
-    def get_binary_io_file_from_cache(file_name: str) -> BinaryIO:
-        with open(file_name, 'rb') as binary_file:
-            file_contents = binary_file.read()
+        self.db.session.commit()
+        return doc
 
-            binary_file.seek(0)
+    #############
+    # PRESIGNED URLS
+    #############
 
-            return BytesIO(binary_file.read())
+    def get_presigned_download_url(self, user_mail: str, document_id: uuid.UUID) -> str:
+        """
+        Short-lived URL to read the document straight from the storage
+        """
+        document = self.get_document_by_id(user_mail, document_id)
+        return self.minio_client.presigned_get_object(
+            "sud", self.get_document_object_name(document_id),
+            expires=datetime.timedelta(seconds=presigned_url_expires),
+            response_headers={
+                "response-content-disposition": f"attachment; filename*=UTF-8''{quote(document.get_name())}"
+            },
+        )
 
-    def get_file_from_cloud(self, file_name):
-        print("file_name:" + file_name)
+    def get_presigned_upload_url(self, user_mail: str, document_id: uuid.UUID) -> tuple[uuid.UUID, str]:
+        """
+        Short-lived URL to upload a new version of the document straight to the storage.
+        The URL points to a staging object under uploads/, finalize_document_upload copies it to its blob.
+        :return: id of the upload and the URL
+        """
+        self._get_editable_document(user_mail, document_id)
+        upload_id = uuid.uuid4()
+        url = self.minio_client.presigned_put_object(
+            "sud", UPLOAD_PREFIX + str(upload_id),
+            expires=datetime.timedelta(seconds=presigned_url_expires),
+        )
+        return upload_id, url
+
+    def finalize_document_upload(self, user_mail: str, document_id: uuid.UUID, upload_id: uuid.UUID,
+                                 document_name: str) -> uuid.UUID:
+        """
+        Register a version uploaded with a presigned URL as the document of its branch.
+        The upload is copied to a blob no URL points to, so it can't be changed once registered.
+        The API never sees the content, so the blob is keyed by the upload id and is not deduplicated.
+        :return: id of the new version
+        :raise FileNotFoundError: nothing has been uploaded, or the upload is already registered
+        """
+        branch, old_document = self._get_editable_document(user_mail, document_id)
+
+        upload_name = UPLOAD_PREFIX + str(upload_id)
+        blob_id = str(upload_id)
         try:
-            cloud_file_request = self.minio_client.get_object("sud", file_name)
-            return cloud_file_request.data
-        except:
+            size = self.minio_client.stat_object("sud", upload_name).size
+        except Exception:
             raise FileNotFoundError
 
+        # The blob row claims the upload, a concurrent finalize of the same upload adds no row and stops here.
+        # It is committed as released before the copy: if the version is never added, the content is collected.
+        if not self._register_blob(blob_id, size, released_at=datetime.datetime.now()):
+            raise FileNotFoundError
+        self.db.session.commit()
+        self._copy_object(upload_name, BLOB_PREFIX + blob_id, size)
+        self.minio_client.remove_object("sud", upload_name)
+
+        return self._add_document_version(branch, old_document, uuid.uuid4(), document_name, blob_id).id
+
     def edit_item_name(self, item):
         if isinstance(item, Document):
             self.db.session.execute(update(DocumentModel).where(DocumentModel.id ==
                                                                 str(item.get_id())).values(name=item.get_name()))
+            self._bump_revision_of_branch(BranchModel.document_id, item.get_id())
         self.db.session.commit()
 
     def get_document_by_id(self, user_mail, document_id) -> Document:
-        branch: BranchModel = BranchModel.query.filter_by(document_id=str(document_id)).first()
+        branch: BranchModel = request_loader.load(BranchModel.document_id, document_id)
+        if branch is None:
+            raise FileNotFoundError
 
-        user: UserModel = UserModel.query.filter_by(email=user_mail).first()
+        user: UserModel = request_loader.load(UserModel.email, user_mail)
         username, user_id, workspace = self.get_workspace_by_id(user_mail, branch.workspace_id)
 
         if self.has_access_to_workspace(workspace, user):
-            doc: DocumentModel = DocumentModel.query.filter_by(id=str(document_id)).first()
+            doc: DocumentModel = request_loader.load(DocumentModel.id, document_id)
 
             return Document(
                 name=doc.name,
                 task_id=doc.task_id,
                 file=doc.file_id,
                 time=doc.modification_time,
+                _id=doc.id,
             )
         else:
             raise NotAllowedError()
@@ -1421,7 +1790,9 @@ class DataStoreStorageRepository:
             workspace_model.accesses.remove(access)
             self.db.session.execute(delete(BaseAccessModel).where(BaseAccessModel.id == access.id))
         workspace_model.accesses = accesses
+        self._bump_revision(workspace.get_id())
         self.db.session.commit()
+        access_cache.invalidate_workspace(workspace.get_id())
 
     # def delete_item_from_db(self, item):
     #     if isinstance(item, File):
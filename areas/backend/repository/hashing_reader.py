@@ -0,0 +1,26 @@
+import hashlib
+from typing import BinaryIO, Optional
+
+
+class HashingReader:
+    """
+    Binary stream wrapper computing the SHA-256 and the size of everything read through it,
+    so content can be hashed while it is being uploaded
+    """
+
+    def __init__(self, stream: BinaryIO):
+        self.__stream = stream
+        self.__hash = hashlib.sha256()
+        self.size = 0
+
+    def read(self, amt: Optional[int] = None) -> bytes:
+        data = self.__stream.read(amt)
+        self.__hash.update(data)
+        self.size += len(data)
+        return data
+
+    def readable(self) -> bool:
+        return True
+
+    def hexdigest(self) -> str:
+        return self.__hash.hexdigest()
@@ -0,0 +1,82 @@
+from typing import Any, Iterable, Optional
+
+from flask import g, has_app_context
+from sqlalchemy import event
+from sqlalchemy.orm import InstrumentedAttribute, Session
+
+from database.database import UUIDString, is_uuid
+
+# Identity map of the current request: (model, column name) -> {str(key): row or None}.
+# Lives on flask.g, so nothing is shared between requests; any commit or rollback drops it.
+_G_ATTRIBUTE = 'request_loader'
+
+_BATCH_SIZE = 500
+
+
+def _identity_map() -> dict[tuple[type, str], dict[str, Any]]:
+    if not has_app_context():
+        return {}
+    if _G_ATTRIBUTE not in g:
+        setattr(g, _G_ATTRIBUTE, {})
+    return getattr(g, _G_ATTRIBUTE)
+
+
+def _rows(column: InstrumentedAttribute) -> dict[str, Any]:
+    return _identity_map().setdefault((column.class_, column.key), {})
+
+
+def load(column: InstrumentedAttribute, key: Any) -> Optional[Any]:
+    """
+    Row with `column == key`, read from the database at most once per request
+    :param column: model column, e.g. UserModel.email
+    :param key: value of the column
+    :return: first matching row or None
+    """
+    if key is None:
+        return None
+    return load_many(column, [key])[0]
+
+
+def load_many(column: InstrumentedAttribute, keys: Iterable[Any]) -> list[Optional[Any]]:
+    """
+    Rows for several keys; keys not seen in this request yet are read with batched IN (...) queries
+    :return: rows (or None) in the order of keys
+    """
+    keys = list(keys)
+    rows = _rows(column)
+
+    pending = list(dict.fromkeys(str(key) for key in keys if key is not None and str(key) not in rows))
+    if column.type is UUIDString:
+        # Malformed ids match no row, they are not sent to the database, see is_uuid
+        for key in pending:
+            if not is_uuid(key):
+                rows[key] = None
+        pending = [key for key in pending if key not in rows]
+    for start in range(0, len(pending), _BATCH_SIZE):
+        batch = pending[start:start + _BATCH_SIZE]
+        for row in column.class_.query.filter(column.in_(batch)).all():
+            rows.setdefault(str(getattr(row, column.key)), row)
+        for key in batch:
+            rows.setdefault(key, None)
+
+    return [None if key is None else rows.get(str(key)) for key in keys]
+
+
+def prime(column: InstrumentedAttribute, loaded: Iterable[Any]) -> None:
+    """
+    Remember rows already read by another query, so later lookups by `column` skip the database
+    """
+    rows = _rows(column)
+    for row in loaded:
+        rows.setdefault(str(getattr(row, column.key)), row)
+
+
+def clear() -> None:
+    if has_app_context():
+        g.pop(_G_ATTRIBUTE, None)
+
+
+@event.listens_for(Session, 'after_commit')
+@event.listens_for(Session, 'after_rollback')
+def _clear_on_transaction_end(_session) -> None:
+    clear()
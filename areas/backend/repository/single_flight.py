@@ -0,0 +1,68 @@
+import threading
+from typing import Any, Callable, Hashable, Optional
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    Coalescing of concurrent identical loads: while a call for a key is running, other calls for the same key
+    wait for it and get its result (or its exception) instead of running the function again.
+    Nothing is kept once the call is done, a later call runs the function again.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+
+        self.__calls: dict[Hashable, _Call] = {}
+        self.__lock = threading.Lock()
+
+        self.calls = 0
+        self.shared = 0
+
+    def do(self, key: Hashable, function: Callable[[], Any]) -> tuple[Any, bool]:
+        """
+        :return: result of the function and whether it was handed to more than one caller;
+                 a shared result must not be modified, copy it first
+        """
+        with self.__lock:
+            call = self.__calls.get(key)
+            leader = call is None
+            if leader:
+                call = self.__calls[key] = _Call()
+                self.calls += 1
+            else:
+                call.waiters += 1
+                self.shared += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = function()
+        except BaseException as error:
+            call.error = error
+            raise
+        finally:
+            with self.__lock:
+                del self.__calls[key]
+            call.done.set()
+        return call.result, call.waiters > 0
+
+    def stats(self) -> dict:
+        with self.__lock:
+            return {
+                "name": self.name,
+                "in_flight": len(self.__calls),
+                "calls": self.calls,
+                "shared": self.shared,
+            }
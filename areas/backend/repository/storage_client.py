@@ -0,0 +1,51 @@
+import os
+import threading
+from typing import Optional
+
+import certifi
+import urllib3
+from minio import Minio
+
+from config import endpoint, access_key, secret_key, storage_pool_size, storage_connect_timeout, \
+    storage_read_timeout
+
+# Storage client of the process, see get_storage_client
+_client: Optional[Minio] = None
+_lock = threading.Lock()
+
+
+def create_http_client() -> urllib3.PoolManager:
+    """
+    Keep-alive connection pool for the storage client, connections are reused across requests
+    """
+    return urllib3.PoolManager(
+        maxsize=storage_pool_size,
+        timeout=urllib3.Timeout(connect=storage_connect_timeout, read=storage_read_timeout),
+        cert_reqs='CERT_REQUIRED',
+        ca_certs=os.environ.get('SSL_CERT_FILE') or certifi.where(),
+        retries=urllib3.Retry(
+            total=3,
+            backoff_factor=0.2,
+            status_forcelist=[500, 502, 503, 504]
+        ),
+    )
+
+
+def get_storage_client() -> Minio:
+    """
+    Storage client shared by the whole process, created and the bucket checked on first use
+    """
+    global _client
+    if _client is None:
+        with _lock:
+            if _client is None:
+                client = Minio(
+                    endpoint=endpoint,
+                    access_key=access_key,
+                    secret_key=secret_key,
+                    http_client=create_http_client(),
+                )
+                if not client.bucket_exists("sud"):  # pragma: no cover
+                    client.make_bucket("sud")  # pragma: no cover
+                _client = client
+    return _client
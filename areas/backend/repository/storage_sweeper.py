@@ -0,0 +1,50 @@
+import threading
+import time
+from typing import Optional
+
+from flask import Flask
+
+from config import storage_sweep_interval
+
+# Sweeper thread of the process, see start_storage_sweeper
+_thread: Optional[threading.Thread] = None
+_lock = threading.Lock()
+
+
+def sweep_storage(app: Flask) -> int:
+    """
+    Remove every blob left unreferenced and every upload left unfinalized for the grace period
+    :return: number of objects removed
+    """
+    from repository.data_store_storage_repository import DataStoreStorageRepository
+
+    with app.app_context():
+        repository = DataStoreStorageRepository()
+        removed = repository.collect_abandoned_uploads()
+        while True:
+            collected = repository.collect_unreferenced_blobs()
+            removed += collected
+            if collected == 0:
+                return removed
+
+
+def start_storage_sweeper(app: Flask) -> None:
+    """
+    Sweep the storage every storage_sweep_interval seconds in a daemon thread, started once per process.
+    Sweeps of several processes don't collide, each skips the rows another one holds.
+    """
+    global _thread
+    with _lock:
+        if _thread is not None:
+            return
+        _thread = threading.Thread(target=_run, args=(app,), name='storage-sweeper', daemon=True)
+        _thread.start()
+
+
+def _run(app: Flask) -> None:  # pragma: no cover
+    while True:
+        time.sleep(storage_sweep_interval)
+        try:
+            sweep_storage(app)
+        except Exception as error:
+            app.logger.warning('Storage sweep failed: %s', error)
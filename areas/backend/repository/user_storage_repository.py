@@ -1,7 +1,7 @@
 from typing import List
 from uuid import UUID
 
-from sqlalchemy import update
+from sqlalchemy import or_, select, update
 
 from core.accesses import AccessType
 from core.department_manager import DepartmentManager, DepartmentNotFoundError
@@ -10,7 +10,9 @@ from core.department import Department
 from flask import current_app
 from core.user_manager import UserNotFoundError
 from app_db import get_current_db
-from database.database import UserModel, DepartmentModel
+from cache.decorators import cached
+from database.database import UserModel, DepartmentModel, WorkspaceModel, BranchModel
+from repository.cache import access_cache, principal_cache
 from repository.data_store_storage_repository import DataStoreStorageRepository
 
 db = get_current_db(current_app)
@@ -37,16 +39,19 @@ class UserRepository:
             role=user.role
         )
 
+    @cached(principal_cache.backend, key=lambda self, _id: principal_cache.key(_id))
     def get_user_from_db_by_id(self, _id: UUID):
         from database.database import UserModel, DepartmentModel
         user: UserModel = UserModel.query.filter_by(id=str(_id)).first()
         if user is None:
             raise UserNotFoundError
+        # Principals may be shared through the cache backend, the password hash is left out: login reads it
+        # with get_user_from_db_by_email
         current_user = User(
             _id=UUID(hex=user.id),
             email=user.email,
             username=user.username,
-            password=user.passwordHash,
+            password=None,
             role=user.role,
             _department_manager=DepartmentManager([])
         )
@@ -187,6 +192,8 @@ class UserRepository:
 
         db.session.delete(department)
         db.session.commit()
+        access_cache.invalidate_users([user.id for user in users])
+        principal_cache.invalidate_users([user.id for user in users])
 
     def add_users_to_department(self, department_name: str, users: List[str]) -> Department:
         from database.database import DepartmentModel, UserModel
@@ -201,6 +208,8 @@ class UserRepository:
             ))
 
             db.session.commit()
+        access_cache.invalidate_users(users)
+        principal_cache.invalidate_users(users)
 
     def delete_users_from_department(self, department_name: str, users: List[str]) -> Department:
         from database.database import DepartmentModel, UserModel
@@ -214,16 +223,21 @@ class UserRepository:
             ))
 
             db.session.commit()
+        access_cache.invalidate_users(users)
+        principal_cache.invalidate_users(users)
 
     def update_department_users(self, department: Department) -> Department:
         from database.database import DepartmentModel, UserModel
         department_model: DepartmentModel = DepartmentModel.query.filter_by(name=department.department_name).first()
+        previous_users: List[UserModel] = UserModel.query.filter_by(department_id=department_model.id).all()
         users = []
         for user in department.users:
             user_model: UserModel = UserModel.query.filter_by(id=str(user.get_id())).first()
             users.append(user_model)
         department_model.users = users
         db.session.commit()
+        access_cache.invalidate_users([user.id for user in previous_users] + [user.id for user in users])
+        principal_cache.invalidate_users([user.id for user in previous_users] + [user.id for user in users])
         return self.get_department_by_name(department.department_name)
 
     def get_root_user_space_content(self, user_email: str):
@@ -237,4 +251,12 @@ class UserRepository:
         if user is None:
             raise UserNotFoundError
         UserModel.query.filter_by(id=str(user_id)).delete()
+
+        # Workspaces show the names of their owner and branch authors
+        authored_workspaces = select(BranchModel.workspace_id).where(BranchModel.author == str(user_id))
+        db.session.execute(update(WorkspaceModel).where(or_(
+            WorkspaceModel.user_id == str(user_id), WorkspaceModel.id.in_(authored_workspaces)
+        )).values(revision=WorkspaceModel.revision + 1))
         db.session.commit()
+        access_cache.invalidate_users([user_id])
+        principal_cache.invalidate_users([user_id])
@@ -0,0 +1,16 @@
+from werkzeug.routing import UUIDConverter
+
+
+class UUIDStringConverter(UUIDConverter):
+    """
+    Path segment holding a UUID, passed to the view as a string like the ids everywhere else.
+    Any other segment does not match the route, so malformed ids get a 404 before any query.
+
+        @USER_REQUEST_API.route('/download/<uuid_string:item_id>')
+    """
+
+    def to_python(self, value: str) -> str:
+        return value
+
+    def to_url(self, value) -> str:
+        return str(value)
@@ -0,0 +1,243 @@
+import binascii
+import json
+import re
+from typing import BinaryIO, Optional
+
+CHUNK_SIZE = 64 * 1024
+
+# Data URL prefixes ("data:text/plain;base64,") are looked for in this many first characters of the file field
+_MAX_PREFIX_SIZE = 1024
+
+_WHITESPACE = b' \t\r\n'
+_NOT_BASE64 = re.compile(rb'[^A-Za-z0-9+/=]')
+_ESCAPES = {
+    ord('"'): b'"', ord('\\'): b'\\', ord('/'): b'/',
+    ord('b'): b'\b', ord('f'): b'\f', ord('n'): b'\n', ord('r'): b'\r', ord('t'): b'\t',
+}
+
+
+class Base64JsonUpload:
+    """
+    Incremental reader of a JSON object carrying a file as a base64 string field.
+    The other fields are parsed as they come, the file is decoded chunk by chunk while it is read,
+    so memory use does not depend on the size of the file.
+
+        upload = Base64JsonUpload(request.stream, 'document_data')
+        fields = upload.read_fields()   # fields placed before the file
+        upload.read(1024)               # decoded file content
+        upload.fields                   # all fields, once the file has been read
+    """
+
+    def __init__(self, stream: BinaryIO, data_field: str, chunk_size: int = CHUNK_SIZE):
+        self.__stream = stream
+        self.__data_field = data_field
+        self.__chunk_size = chunk_size
+
+        self.__buffer = b''
+        self.__position = 0
+
+        self.__in_data = False
+        self.__data_done = False
+        self.__head: Optional[bytearray] = bytearray()
+        self.__encoded = bytearray()
+        self.__decoded = bytearray()
+
+        self.fields: dict = {}
+
+    #############
+    # PUBLIC
+    #############
+
+    def read_fields(self) -> dict:
+        """
+        Parse the object up to the file field
+        :return: fields placed before the file
+        :raise KeyError: no file field
+        :raise ValueError: invalid JSON
+        """
+        if self.__skip_whitespace() != ord('{'):
+            raise ValueError('JSON object expected')
+        self.__read_members()
+        if not self.__in_data:
+            raise KeyError(self.__data_field)
+        return self.fields
+
+    def read(self, amt: Optional[int] = None) -> bytes:
+        """
+        Decoded file content, the rest of the object is parsed once the file is read to the end
+        :raise ValueError: invalid JSON or base64
+        """
+        while self.__in_data and (amt is None or amt < 0 or len(self.__decoded) < amt):
+            self.__decode_chunk()
+
+        if amt is None or amt < 0:
+            amt = len(self.__decoded)
+        result = bytes(self.__decoded[:amt])
+        del self.__decoded[:amt]
+        return result
+
+    def readable(self) -> bool:
+        return True
+
+    #############
+    # JSON
+    #############
+
+    def __fill(self) -> bool:
+        if self.__position >= len(self.__buffer):
+            self.__buffer = self.__stream.read(self.__chunk_size)
+            self.__position = 0
+        return len(self.__buffer) > 0
+
+    def __next_byte(self) -> int:
+        if not self.__fill():
+            raise ValueError('Unexpected end of JSON')
+        byte = self.__buffer[self.__position]
+        self.__position += 1
+        return byte
+
+    def __skip_whitespace(self) -> int:
+        while True:
+            byte = self.__next_byte()
+            if byte not in _WHITESPACE:
+                return byte
+
+    def __read_string(self) -> bytes:
+        """
+        Raw string token, the opening quote is already consumed
+        """
+        raw = bytearray(b'"')
+        while True:
+            byte = self.__next_byte()
+            raw.append(byte)
+            if byte == ord('\\'):
+                raw.append(self.__next_byte())
+            elif byte == ord('"'):
+                return bytes(raw)
+
+    def __read_value(self, first: int):
+        if first == ord('"'):
+            return json.loads(self.__read_string())
+
+        raw = bytearray([first])
+        if first in b'{[':
+            depth = 1
+            while depth:
+                byte = self.__next_byte()
+                if byte == ord('"'):
+                    raw += self.__read_string()
+                    continue
+                raw.append(byte)
+                if byte in b'{[':
+                    depth += 1
+                elif byte in b'}]':
+                    depth -= 1
+            return json.loads(raw)
+
+        while self.__fill() and self.__buffer[self.__position] not in b',}' + _WHITESPACE:
+            raw.append(self.__next_byte())
+        return json.loads(raw)
+
+    def __read_members(self) -> None:
+        """
+        Parse members up to the value of the file field or the end of the object
+        """
+        while True:
+            byte = self.__skip_whitespace()
+            if byte == ord('}'):
+                return
+            if byte != ord('"'):
+                raise ValueError('Invalid JSON object')
+
+            key = json.loads(self.__read_string())
+            if self.__skip_whitespace() != ord(':'):
+                raise ValueError('Invalid JSON object')
+
+            byte = self.__skip_whitespace()
+            if key == self.__data_field and not self.__data_done:
+                if byte != ord('"'):
+                    raise ValueError(f'{key} must be a string')
+                self.__in_data = True
+                return
+
+            self.fields[key] = self.__read_value(byte)
+            if not self.__read_separator():
+                return
+
+    def __read_separator(self) -> bool:
+        """
+        :return: True if another member follows
+        """
+        byte = self.__skip_whitespace()
+        if byte == ord('}'):
+            return False
+        if byte != ord(','):
+            raise ValueError('Invalid JSON object')
+        return True
+
+    #############
+    # BASE64
+    #############
+
+    def __decode_chunk(self) -> None:
+        if not self.__fill():
+            raise ValueError('Unexpected end of JSON')
+
+        quote = self.__buffer.find(b'"', self.__position)
+        backslash = self.__buffer.find(b'\\', self.__position)
+        stop = min(index for index in (quote, backslash, len(self.__buffer)) if index >= 0)
+
+        text = self.__buffer[self.__position:stop]
+        self.__position = stop
+
+        if stop == backslash:
+            self.__position += 1
+            code = self.__next_byte()
+            if code == ord('u'):
+                char = chr(int(bytes(self.__next_byte() for _ in range(4)), 16))
+                text += char.encode('ascii', 'ignore')
+            else:
+                text += _ESCAPES.get(code, b'')
+            self.__add_encoded(text)
+        elif stop == quote:
+            self.__position += 1
+            self.__add_encoded(text)
+            self.__finish_data()
+        else:
+            self.__add_encoded(text)
+
+    def __add_encoded(self, text: bytes) -> None:
+        if self.__head is not None:
+            # Strip a data URL prefix, it can be split between chunks
+            self.__head += text
+            if self.__head.startswith(b'data:') or b'data:'.startswith(bytes(self.__head)):
+                marker = self.__head.find(b'base64,')
+                if marker < 0 and len(self.__head) < _MAX_PREFIX_SIZE and self.__in_data_string_open():
+                    return
+                text = self.__head[marker + len(b'base64,'):] if marker >= 0 else self.__head
+            else:
+                text = self.__head
+            self.__head = None
+
+        self.__encoded += _NOT_BASE64.sub(b'', text)
+        size = len(self.__encoded) // 4 * 4
+        if size:
+            try:
+                self.__decoded += binascii.a2b_base64(self.__encoded[:size])
+            except binascii.Error as error:
+                raise ValueError(str(error))
+            del self.__encoded[:size]
+
+    def __in_data_string_open(self) -> bool:
+        return self.__in_data and not self.__data_done
+
+    def __finish_data(self) -> None:
+        self.__data_done = True
+        if self.__head is not None:
+            self.__add_encoded(b'')
+        if self.__encoded:
+            raise ValueError('Incorrect base64 padding')
+        self.__in_data = False
+
+        if self.__read_separator():
+            self.__read_members()
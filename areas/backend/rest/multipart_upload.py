@@ -0,0 +1,113 @@
+from typing import BinaryIO, Optional
+
+from werkzeug.sansio.multipart import Data, Epilogue, Field, File, MultipartDecoder, NeedData
+
+CHUNK_SIZE = 64 * 1024
+
+# Form fields are kept in memory, each up to this size; bigger ones are answered with 413
+_MAX_FIELD_SIZE = 1024 * 1024
+
+
+class MultipartUpload:
+    """
+    Incremental reader of a multipart/form-data body carrying a file part.
+    The form fields are parsed as they come, the file part is handed over chunk by chunk while it is read,
+    so it is neither spooled to memory nor to a temporary file whatever its size.
+
+        upload = MultipartUpload(request.stream, boundary, 'document_data')
+        fields = upload.read_fields()   # fields placed before the file
+        upload.read(1024)               # file content
+        upload.fields                   # all fields, once the file has been read
+    """
+
+    def __init__(self, stream: BinaryIO, boundary: bytes, data_field: str, chunk_size: int = CHUNK_SIZE):
+        self.__stream = stream
+        self.__data_field = data_field
+        self.__chunk_size = chunk_size
+        self.__decoder = MultipartDecoder(boundary, max_form_memory_size=_MAX_FIELD_SIZE)
+
+        self.__received_all = False
+        self.__done = False
+
+        self.__in_data = False
+        self.__data_seen = False
+        self.__field: Optional[str] = None
+        self.__value = bytearray()
+        self.__data = bytearray()
+
+        self.fields: dict = {}
+
+    #############
+    # PUBLIC
+    #############
+
+    def read_fields(self) -> dict:
+        """
+        Parse the body up to the file part
+        :return: fields placed before the file
+        :raise KeyError: no file part
+        :raise ValueError: invalid body
+        """
+        while not self.__in_data and not self.__done:
+            self.__next_event()
+        if not self.__in_data:
+            raise KeyError(self.__data_field)
+        return self.fields
+
+    def read(self, amt: Optional[int] = None) -> bytes:
+        """
+        File content, the rest of the body is parsed once the file is read to the end
+        :raise ValueError: invalid body
+        """
+        while self.__in_data and (amt is None or amt < 0 or len(self.__data) < amt):
+            self.__next_event()
+        while not self.__in_data and not self.__done:
+            self.__next_event()
+
+        if amt is None or amt < 0:
+            amt = len(self.__data)
+        result = bytes(self.__data[:amt])
+        del self.__data[:amt]
+        return result
+
+    def readable(self) -> bool:
+        return True
+
+    #############
+    # PARSING
+    #############
+
+    def __next_event(self) -> None:
+        event = self.__decoder.next_event()
+        if isinstance(event, NeedData):
+            if self.__received_all:
+                raise ValueError('Unexpected end of multipart body')
+            chunk = self.__stream.read(self.__chunk_size)
+            if not chunk:
+                self.__received_all = True
+            self.__decoder.receive_data(chunk or None)
+        elif isinstance(event, File):
+            # Only the first file part with the expected name is read, other files are skipped
+            self.__in_data = event.name == self.__data_field and not self.__data_seen
+            self.__data_seen = self.__data_seen or self.__in_data
+            self.__field = None
+        elif isinstance(event, Field):
+            self.__field = event.name
+            self.__value = bytearray()
+        elif isinstance(event, Data):
+            self.__receive(event)
+        elif isinstance(event, Epilogue):
+            self.__done = True
+
+    def __receive(self, event: Data) -> None:
+        if self.__in_data:
+            self.__data += event.data
+            self.__in_data = event.more_data
+        elif self.__field is not None:
+            self.__value += event.data
+            if not event.more_data:
+                try:
+                    self.fields[self.__field] = self.__value.decode()
+                except UnicodeDecodeError as error:
+                    raise ValueError(f'Field {self.__field} is not UTF-8') from error
+                self.__field = None
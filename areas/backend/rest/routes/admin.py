@@ -67,7 +67,7 @@ def get_workspaces_list():
     ), 200
 
 
-@ADMIN_REQUEST_API.route('/workspace/<space_id>', methods=['PUT'])
+@ADMIN_REQUEST_API.route('/workspace/<uuid_string:space_id>', methods=['PUT'])
 @admin_access
 def update_workspace(space_id):
     """
@@ -118,7 +118,7 @@ def update_workspace(space_id):
                                   }}), 200
 
 
-@ADMIN_REQUEST_API.route('/workspace/<space_id>', methods=['DELETE'])
+@ADMIN_REQUEST_API.route('/workspace/<uuid_string:space_id>', methods=['DELETE'])
 @admin_access
 def delete_workspace(space_id):
     """
@@ -356,7 +356,7 @@ def get_user_list():
     ), 200
 
 
-@ADMIN_REQUEST_API.route('/user/<user_id>', methods=['DELETE'])
+@ADMIN_REQUEST_API.route('/user/<uuid_string:user_id>', methods=['DELETE'])
 @admin_access
 def delete_user(user_id):
     """
@@ -390,3 +390,35 @@ def delete_user(user_id):
     except UserNotFoundError:
         return jsonify({'error': 'Incorrect user ID'}), 404
     return jsonify({"status": "ok"}), 200
+
+
+"""
+    ===================
+    Block with Caches
+    ===================
+"""
+
+
+@ADMIN_REQUEST_API.route('/cache_stats', methods=['GET'])
+@admin_access
+def get_cache_stats():
+    """
+    Result:
+        {
+            caches: [{
+              name: string,
+              size: int,
+              max_size: int,
+              ttl: float,
+              hits: int,
+              misses: int,
+              evictions: int,
+              hit_ratio: float
+            }]
+        }
+    """
+    return jsonify(
+        {
+            "caches": dataStoreController.get_cache_stats()
+        }
+    ), 200
@@ -1,9 +1,14 @@
 """The Endpoints to manage the USER_REQUESTS"""
+import hashlib
+import shutil
+import tempfile
 import uuid
-from typing import Optional
+from typing import BinaryIO, Optional
 
-from flask import jsonify, Blueprint, make_response, request, send_file
+from flask import jsonify, Blueprint, make_response, request, send_file, after_this_request
+from werkzeug.datastructures import ContentRange
 
+from config import presigned_url_expires
 from controller.data_store_controller import DataStoreController, AccessEditTypeEnum, AccessClassEnum
 from controller.user_controller import UserController
 from core.accesses import BaseAccess, UrlAccess, UserAccess, DepartmentAccess, AccessType
@@ -17,19 +22,133 @@ from core.workspace import WorkSpace
 from core.workspace_status import WorkSpaceStatus
 from decorators.token_required import token_required, get_user_by_token
 from exceptions.exceptions import AlreadyExistsError, InvalidCredentialsError, ItemNotFoundError, \
-    NotAllowedError, UserNotFoundError, DepartmentNotFoundError, AccessError, SpaceNotFoundError
+    NotAllowedError, UserNotFoundError, DepartmentNotFoundError, AccessError, SpaceNotFoundError, \
+    VersionConflictError
+from rest.json_upload import Base64JsonUpload
+from rest.multipart_upload import MultipartUpload
 
 USER_REQUEST_API = Blueprint('request_user_api', __name__)
 
+# Files sent before some of their fields are spooled until the fields are read, to disk beyond this size; bytes
+UPLOAD_SPOOL_MEMORY_SIZE = 1024 * 1024
+
 dataStoreController = DataStoreController()
 userController = UserController()
 
-
 def get_blueprint():
     """Return the blueprint for the main app module"""
     return USER_REQUEST_API
 
 
+def cache_revalidated(response, etag: str):
+    """
+    Let the client keep the response, checking with If-None-Match that it is still current before each use
+    """
+    response.set_etag(etag)
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    return response
+
+
+def document_etag(document: Document) -> str:
+    """
+    ETag of the content of a document served under its name. The content behind a document id never changes,
+    but a rename keeps the id and changes the file name and type of the response.
+    """
+    return f"{document.get_id()}-{hashlib.sha1(document.get_name().encode()).hexdigest()}"
+
+
+def workspace_etag(space_id, archived: bool = False) -> str:
+    """
+    ETag of the JSON views of a workspace, it changes with every write to the workspace
+    :raise SpaceNotFoundError: no such workspace
+    :raise NotAllowedError: no access to the workspace
+    """
+    user = get_user_by_token()
+    return f"{space_id}.{dataStoreController.get_workspace_revision(user.email, space_id, archived)}"
+
+
+def send_cloud_file(file_name: str, mimetype: Optional[str] = None, download_name: Optional[str] = None,
+                    as_attachment: bool = False, etag: Optional[str] = None):
+    """
+    Stream a file from the cloud to the client block by block, the storage connection is released at the end.
+    A single byte range (Range header) is answered with 206 Partial Content, only that part is read from the cloud.
+    Given an etag (see document_etag), the client may keep the response and revalidate it:
+    a matching If-None-Match is answered with 304 Not Modified without reading the cloud.
+    :raise FileNotFoundError: no such file in the cloud
+    """
+    if etag is not None and request.if_none_match.contains(etag):
+        return cache_revalidated(make_response('', 304), etag)
+
+    # A range is only valid for the content the client already has (If-Range)
+    range_matches = 'If-Range' not in request.headers or (etag is not None and request.if_range.etag == etag)
+
+    offset, length, content_range = 0, 0, None
+    if request.range is not None and len(request.range.ranges) == 1 and range_matches:
+        size = dataStoreController.get_file_size_from_cloud(file_name)
+        bounds = request.range.range_for_length(size)
+        if bounds is None:
+            response = make_response(jsonify({'error': 'Range not satisfiable'}), 416)
+            response.content_range = ContentRange('bytes', None, None, size)
+            return response
+        offset, length = bounds[0], bounds[1] - bounds[0]
+        content_range = ContentRange('bytes', bounds[0], bounds[1], size)
+
+    stream = dataStoreController.get_binary_file_from_cloud_by_id(file_name, offset, length)
+    response = send_file(stream, mimetype=mimetype, download_name=download_name, as_attachment=as_attachment,
+                         conditional=False)
+    if stream.size is not None:
+        response.content_length = stream.size
+    response.accept_ranges = 'bytes'
+    if content_range is not None:
+        response.status_code = 206
+        response.content_range = content_range
+    if etag is not None:
+        cache_revalidated(response, etag)
+    return response
+
+
+def read_upload(fields: list[str], data_field: str) -> tuple[dict, str | BinaryIO, int]:
+    """
+    Fields and file content of an upload request, in one of the supported encodings:
+        - application/json: fields and the base64 encoded file in `data_field` (data URL prefix is optional),
+          decoded while it is uploaded
+        - multipart/form-data: form fields and the file part named `data_field`, parsed while it is uploaded
+        - application/octet-stream: fields in the query string, raw file in the body
+    Fields placed after the file (JSON or multipart) are only known once the file is read, the file is then
+    spooled to a temporary file, so clients should send them first.
+    :return: fields, file content as a binary stream, its length or -1 if unknown
+    :raise KeyError: a field or the file is missing
+    :raise ValueError: malformed body
+    """
+    if request.mimetype == 'application/octet-stream':
+        length = request.content_length if request.content_length is not None else -1
+        return {field: request.args[field] for field in fields}, request.stream, length
+
+    if request.mimetype == 'multipart/form-data':
+        boundary = request.mimetype_params.get('boundary')
+        if not boundary:
+            raise ValueError('Multipart boundary expected')
+        upload = MultipartUpload(request.stream, boundary.encode(), data_field)
+    else:
+        upload = Base64JsonUpload(request.stream, data_field)
+    request_data = upload.read_fields()
+    if any(field not in request_data for field in fields):
+        # Some fields come after the file, so it is spooled until they are read
+        content = tempfile.SpooledTemporaryFile(max_size=UPLOAD_SPOOL_MEMORY_SIZE)
+
+        @after_this_request
+        def close_content(response):
+            content.close()
+            return response
+
+        shutil.copyfileobj(upload, content)
+        length = content.tell()
+        content.seek(0)
+        return {field: upload.fields[field] for field in fields}, content, length
+    return {field: request_data[field] for field in fields}, upload, -1
+
+
 @USER_REQUEST_API.route('/registration', methods=['POST'])
 def registration():
     request_data = request.get_json()
@@ -151,13 +270,13 @@ def get_workspaces():
     user = get_user_by_token()
     archived = request.args.get('archived', default=False, type=bool)
 
-    items: list[WorkSpace] = dataStoreController.get_workspaces(user.email, archived)
+    items: list[tuple[WorkSpace, int]] = dataStoreController.get_workspaces_summary(user.email, archived)
 
     workspaces_content = []
-    for item in items:
+    for (item, branches_num) in items:
         workspaces_content.append(
             {
-                "branches_num": len(item.branches),
+                "branches_num": branches_num,
                 "title": item.title,
                 "description": item.description,
                 "status": item.status,
@@ -189,13 +308,13 @@ def get_workspaces_access():
     # query date
     user = get_user_by_token()
 
-    items: list[tuple[WorkSpace, AccessType]] = dataStoreController.get_workspaces_access(user.email)
+    items: list[tuple[WorkSpace, AccessType, int]] = dataStoreController.get_workspaces_access_summary(user.email)
 
     workspaces_content = []
-    for (item, access_type) in items:
+    for (item, access_type, branches_num) in items:
         workspaces_content.append(
             {
-                "branches_num": len(item.branches),
+                "branches_num": branches_num,
                 "title": item.title,
                 "description": item.description,
                 "status": item.status,
@@ -228,13 +347,13 @@ def get_workspaces_open():
     # query date
     user = get_user_by_token()
 
-    items: list[WorkSpace] = dataStoreController.get_workspaces_open()
+    items: list[tuple[WorkSpace, int]] = dataStoreController.get_workspaces_open_summary()
 
     workspaces_content = []
-    for item in items:
+    for (item, branches_num) in items:
         workspaces_content.append(
             {
-                "branches_num": len(item.branches),
+                "branches_num": branches_num,
                 "title": item.title,
                 "description": item.description,
                 "status": item.status,
@@ -250,7 +369,7 @@ def get_workspaces_open():
     ), 200
 
 
-@USER_REQUEST_API.route('/get_workspace/<space_id>', methods=['GET'])
+@USER_REQUEST_API.route('/get_workspace/<uuid_string:space_id>', methods=['GET'])
 @token_required
 def get_workspace_content(space_id):
     """
@@ -270,6 +389,10 @@ def get_workspace_content(space_id):
     archived = request.args.get('archived', default=False, type=bool)
 
     try:
+        etag = workspace_etag(uuid.UUID(space_id), archived)
+        if request.if_none_match.contains(etag):
+            return cache_revalidated(make_response('', 304), etag)
+
         username, user_id, item = dataStoreController.get_workspace_by_id(user.email, uuid.UUID(space_id), archived)
 
         requests = []
@@ -290,12 +413,12 @@ def get_workspace_content(space_id):
             branches.append(
                 {
                     "name": branch.name,
-                    "status": branch.status,
+                    "status": str(branch.status),
                     "id": branch.get_id(),
                 }
             )
 
-        return jsonify(
+        return cache_revalidated(jsonify(
             {
                 "branches_num": len(item.branches),
                 "title": item.title,
@@ -308,7 +431,7 @@ def get_workspace_content(space_id):
                 "user_id": user_id,
                 "id": str(item.get_id()),
             }
-        ), 200
+        ), etag), 200
     except SpaceNotFoundError:
         return jsonify("Can't find space with ID"), 404
     except NotAllowedError:
@@ -317,15 +440,16 @@ def get_workspace_content(space_id):
 
 @USER_REQUEST_API.route('/workspace/add', methods=['POST'])
 def add_workspace():
-    request_data = request.get_json()
     try:
+        request_data, document_data, document_length = read_upload(
+            ['title', 'document_name', 'task', 'description'], 'document_data'
+        )
         title = request_data['title']
         document_name = request_data['document_name']
         task = request_data['task']
-        document_data = request_data['document_data'].split("base64,")[1]
 
         description = request_data['description']
-    except KeyError:
+    except (KeyError, ValueError):
         return jsonify({'error': 'Invalid request body'}), 400
 
     try:
@@ -341,15 +465,18 @@ def add_workspace():
             status=WorkSpaceStatus.Active.value,
         )
 
-        new_file_id = dataStoreController.create_workspace(user.email, workspace, document_name, document_data, task)
+        new_file_id = dataStoreController.create_workspace(user.email, workspace, document_name, document_data, task,
+                                                           document_length)
     except ItemNotFoundError:
         return jsonify({'error': 'Incorrect directory'}), 404
     except NotAllowedError:
         return jsonify("No access to this space"), 401
+    except ValueError:
+        return jsonify({'error': 'Invalid file data'}), 400
     return jsonify({'id': new_file_id}), 200
 
 
-@USER_REQUEST_API.route('/workspace/<space_id>/archive', methods=['POST'])
+@USER_REQUEST_API.route('/workspace/<uuid_string:space_id>/archive', methods=['POST'])
 def archive_workspace(space_id):
     try:
         user = get_user_by_token()
@@ -369,7 +496,7 @@ def archive_workspace(space_id):
 """
 
 
-@USER_REQUEST_API.route('/workspace/<space_id>/view/<branch_id>', methods=['GET'])
+@USER_REQUEST_API.route('/workspace/<uuid_string:space_id>/view/<uuid_string:branch_id>', methods=['GET'])
 @token_required
 def get_branch_in_workspace_by_id(space_id, branch_id):
     """
@@ -388,6 +515,10 @@ def get_branch_in_workspace_by_id(space_id, branch_id):
     user = get_user_by_token()
 
     try:
+        etag = workspace_etag(uuid.UUID(space_id))
+        if request.if_none_match.contains(etag):
+            return cache_revalidated(make_response('', 304), etag)
+
         (item, userName, parentName, merge_requests) = dataStoreController.get_branch_in_workspace_by_id(
             user.email, uuid.UUID(space_id),
             uuid.UUID(branch_id)
@@ -403,7 +534,7 @@ def get_branch_in_workspace_by_id(space_id, branch_id):
                 }
             )
 
-        return jsonify(
+        return cache_revalidated(jsonify(
             {
                 "id": item.get_id(),
                 "name": item.name,
@@ -417,21 +548,21 @@ def get_branch_in_workspace_by_id(space_id, branch_id):
                 "task_id": item.document.task_id if item.document is not None else "",
                 "file": item.document.file if item.document is not None else "",
             }
-        ), 200
+        ), etag), 200
     except SpaceNotFoundError:
         return jsonify("Can't find space with ID"), 404
     except NotAllowedError:
         return jsonify("No access to this space"), 401
 
 
-@USER_REQUEST_API.route('/workspace/<space_id>/add_branch', methods=['POST'])
+@USER_REQUEST_API.route('/workspace/<uuid_string:space_id>/add_branch', methods=['POST'])
 def add_branch(space_id):
     request_data = request.get_json()
     try:
         name = request_data['name']
-        document_id = request_data['document_id']
-        parent_branch_id = request_data['parent_branch_id']
-    except KeyError:
+        document_id = str(uuid.UUID(str(request_data['document_id'])))
+        parent_branch_id = str(uuid.UUID(str(request_data['parent_branch_id'])))
+    except (KeyError, ValueError):
         return jsonify({'error': 'Invalid request body'}), 400
 
     try:
@@ -455,7 +586,7 @@ def add_branch(space_id):
     return jsonify({'id': new_file_id}), 200
 
 
-@USER_REQUEST_API.route('/workspace/<space_id>/branch/<branch_id>', methods=['DELETE'])
+@USER_REQUEST_API.route('/workspace/<uuid_string:space_id>/branch/<uuid_string:branch_id>', methods=['DELETE'])
 def delete_branch(space_id, branch_id):
     try:
         user = get_user_by_token()
@@ -467,15 +598,15 @@ def delete_branch(space_id, branch_id):
     return jsonify({'removed': removed}), 200
 
 
-@USER_REQUEST_API.route('/workspace/<space_id>/request', methods=['POST'])
+@USER_REQUEST_API.route('/workspace/<uuid_string:space_id>/request', methods=['POST'])
 def add_request_for_branch(space_id):
     request_data = request.get_json()
     try:
         title = request_data['title']
         description = request_data['description']
-        source_branch_id = request_data['source_branch_id']
-        target_branch_id = request_data['target_branch_id']
-    except KeyError:
+        source_branch_id = str(uuid.UUID(str(request_data['source_branch_id'])))
+        target_branch_id = str(uuid.UUID(str(request_data['target_branch_id'])))
+    except (KeyError, ValueError):
         return jsonify({'error': 'Invalid request body'}), 400
 
     try:
@@ -497,7 +628,7 @@ def add_request_for_branch(space_id):
     return jsonify({'id': new_file_id}), 200
 
 
-@USER_REQUEST_API.route('/workspace/<space_id>/copy/<branch_id>', methods=['POST'])
+@USER_REQUEST_API.route('/workspace/<uuid_string:space_id>/copy/<uuid_string:branch_id>', methods=['POST'])
 def copy_document(space_id, branch_id):
     # Getting information about old branch
     user = get_user_by_token()
@@ -512,20 +643,8 @@ def copy_document(space_id, branch_id):
         copy_name[-2] += '_copy'
         copy_name = '.'.join(copy_name)
 
-        doc_id = str(item.document.get_id())
-        doc_name = item.document.name
-        doc_full_name = doc_id + '_' + doc_name
-        print(doc_full_name)
-        try:
-            file: Optional[Document] = dataStoreController.get_base64_file_from_cloud_by_id(doc_full_name)
-        except FileNotFoundError:
-            return jsonify({'error': 'File not found'}), 404
-
+        document_id = item.document.get_id()
         task_id = str(item.document.get_task_id())
-        item = {
-            "document": copy_name,
-            "file": file if item.document is not None else "",
-        }
     except SpaceNotFoundError:
         return jsonify("Can't find space with ID"), 404
     except NotAllowedError:
@@ -550,7 +669,9 @@ def copy_document(space_id, branch_id):
             main_branch=None,
             status=WorkSpaceStatus.Active.value,
         )
-        new_workspace = dataStoreController.create_workspace(user.email, workspace, item['document'], item["file"], task_id)
+        new_workspace = dataStoreController.copy_workspace(user.email, workspace, copy_name, document_id, task_id)
+    except FileNotFoundError:
+        return jsonify({'error': 'File not found'}), 404
     except ItemNotFoundError:
         return jsonify({'error': 'Incorrect directory'}), 404
     except NotAllowedError:
@@ -565,7 +686,7 @@ def copy_document(space_id, branch_id):
 """
 
 
-@USER_REQUEST_API.route('/workspace/<space_id>/request/<request_id>', methods=['GET'])
+@USER_REQUEST_API.route('/workspace/<uuid_string:space_id>/request/<uuid_string:request_id>', methods=['GET'])
 @token_required
 def get_request_in_workspace_by_id(space_id, request_id):
     """
@@ -602,7 +723,8 @@ def get_request_in_workspace_by_id(space_id, request_id):
         return jsonify("No access to this space"), 401
 
 
-@USER_REQUEST_API.route('/workspace/<space_id>/request/<request_id>/change_status', methods=['POST'])
+@USER_REQUEST_API.route('/workspace/<uuid_string:space_id>/request/<uuid_string:request_id>/change_status',
+                         methods=['POST'])
 def change_request_status(space_id, request_id):
     user = get_user_by_token()
     request_data = request.get_json()
@@ -620,7 +742,7 @@ def change_request_status(space_id, request_id):
     return jsonify({'id': new_file_id}), 200
 
 
-@USER_REQUEST_API.route('/workspace/<space_id>/request/<request_id>/close', methods=['POST'])
+@USER_REQUEST_API.route('/workspace/<uuid_string:space_id>/request/<uuid_string:request_id>/close', methods=['POST'])
 def close_request(space_id, request_id):
     user = get_user_by_token()
     try:
@@ -632,7 +754,8 @@ def close_request(space_id, request_id):
     return jsonify({'id': new_file_id}), 200
 
 
-@USER_REQUEST_API.route('/workspace/<space_id>/request/<request_id>/force_merge', methods=['POST'])
+@USER_REQUEST_API.route('/workspace/<uuid_string:space_id>/request/<uuid_string:request_id>/force_merge',
+                         methods=['POST'])
 def force_merge(space_id, request_id):
     user = get_user_by_token()
     try:
@@ -653,27 +776,30 @@ def force_merge(space_id, request_id):
 
 @USER_REQUEST_API.route('/document', methods=['POST'])
 def add_new_file():
-    request_data = request.get_json()
     try:
+        request_data, new_document_data, length = read_upload(
+            ['workspace_id', 'new_document_name', 'new_document_type'], 'new_document_data'
+        )
         workspace_id = request_data['workspace_id']
         new_document_name = request_data['new_document_name']
         new_document_type = request_data['new_document_type']
-        new_document_data = request_data['new_document_data']
-    except KeyError:
+    except (KeyError, ValueError):
         return jsonify({'error': 'Invalid request body'}), 400
     try:
         user = get_user_by_token()
         new_document_id = dataStoreController.add_new_document(user.email, uuid.UUID(workspace_id), new_document_name,
-                                                               new_document_type, new_document_data)
+                                                               new_document_type, new_document_data, length)
     except ItemNotFoundError:
         return jsonify({'error': 'Incorrect workspace'}), 404
     except AlreadyExistsError:
         return jsonify({'error': 'File name already exists'}), 409
+    except ValueError:
+        return jsonify({'error': 'Invalid file data'}), 400
     return jsonify({'id': new_document_id}), 200
 
 
 # TODO REFACTOR OLD
-@USER_REQUEST_API.route('/file/<file_id>/view', methods=['GET'])
+@USER_REQUEST_API.route('/file/<uuid_string:file_id>/view', methods=['GET'])
 @token_required
 def view_file_by_id(file_id):
     """
@@ -712,8 +838,8 @@ def view_file_by_id(file_id):
         return jsonify({'error': 'Cannot view such type of file'}), 403
 
     try:
-        binary_file = dataStoreController.get_binary_file_from_cloud_by_id(file_id + "_" + file.get_name())
-        return send_file(binary_file, mimetype_dict[file_type])
+        return send_cloud_file(dataStoreController.get_document_object_name(file_id), mimetype=mimetype_dict[file_type],
+                               etag=document_etag(file))
     except FileNotFoundError:
         return jsonify({'error': 'File is damaged'}), 404
 
@@ -725,7 +851,7 @@ def view_file_by_id(file_id):
 """
 
 
-@USER_REQUEST_API.route('/accesses/<workspace_id>', methods=['GET'])
+@USER_REQUEST_API.route('/accesses/<uuid_string:workspace_id>', methods=['GET'])
 @token_required
 def get_accesses_for_space(workspace_id):
     """
@@ -735,6 +861,10 @@ def get_accesses_for_space(workspace_id):
         information about all accesses
     """
     try:
+        etag = workspace_etag(workspace_id, archived=True)
+        if request.if_none_match.contains(etag):
+            return cache_revalidated(make_response('', 304), etag)
+
         accesses: Optional[list[BaseAccess]] = dataStoreController.get_accesses(workspace_id) or list()
 
         accesses_content = []
@@ -757,17 +887,17 @@ def get_accesses_for_space(workspace_id):
                 }
             )
 
-        return jsonify(
+        return cache_revalidated(jsonify(
             {
                 "accesses": accesses_content
             }
-        ), 200
+        ), etag), 200
 
-    except NotAllowedError:
+    except (NotAllowedError, SpaceNotFoundError):
         return jsonify({'error': 'Not allowed to do this action'}), 401
 
 
-@USER_REQUEST_API.route('/accesses/<space_id>/url', methods=['PUT'])
+@USER_REQUEST_API.route('/accesses/<uuid_string:space_id>/url', methods=['PUT'])
 @token_required
 def set_access_by_url(space_id):
     """
@@ -796,7 +926,7 @@ def set_access_by_url(space_id):
         return jsonify({'error': 'Not allowed to do this action'}), 401
 
 
-@USER_REQUEST_API.route('/accesses/<space_id>/url', methods=['DELETE'])
+@USER_REQUEST_API.route('/accesses/<uuid_string:space_id>/url', methods=['DELETE'])
 @token_required
 def reset_access_by_url(space_id):
     """
@@ -818,7 +948,7 @@ def reset_access_by_url(space_id):
         return jsonify({'error': 'Not allowed to do this action'}), 401
 
 
-@USER_REQUEST_API.route('/accesses/<space_id>/email/<email>', methods=['PUT'])
+@USER_REQUEST_API.route('/accesses/<uuid_string:space_id>/email/<email>', methods=['PUT'])
 @token_required
 def add_access_by_user(space_id, email):
     """
@@ -850,7 +980,7 @@ def add_access_by_user(space_id, email):
         return jsonify({'error': 'User not found'}), 404
 
 
-@USER_REQUEST_API.route('/accesses/<space_id>/email/<email>', methods=['DELETE'])
+@USER_REQUEST_API.route('/accesses/<uuid_string:space_id>/email/<email>', methods=['DELETE'])
 @token_required
 def remove_access_by_user(space_id, email):
     """
@@ -873,7 +1003,7 @@ def remove_access_by_user(space_id, email):
         return jsonify({'error': 'Not allowed to do this action'}), 401
 
 
-@USER_REQUEST_API.route('/accesses/<space_id>/department/<department>', methods=['PUT'])
+@USER_REQUEST_API.route('/accesses/<uuid_string:space_id>/department/<department>', methods=['PUT'])
 @token_required
 def add_access_by_department(space_id, department):
     """
@@ -905,7 +1035,7 @@ def add_access_by_department(space_id, department):
         return jsonify({'error': 'Department not found'}), 404
 
 
-@USER_REQUEST_API.route('/accesses/<space_id>/department/<department>', methods=['DELETE'])
+@USER_REQUEST_API.route('/accesses/<uuid_string:space_id>/department/<department>', methods=['DELETE'])
 @token_required
 def remove_access_by_department(space_id, department):
     """
@@ -930,7 +1060,7 @@ def remove_access_by_department(space_id, department):
 
 # FILE CONTROL
 
-@USER_REQUEST_API.route('/rename/<item_id>', methods=['PUT'])
+@USER_REQUEST_API.route('/rename/<uuid_string:item_id>', methods=['PUT'])
 @token_required
 def rename_item(item_id):
     """
@@ -957,27 +1087,31 @@ def rename_item(item_id):
         return jsonify({'error': 'Can\'t find item'}), 404
 
 
-@USER_REQUEST_API.route('/upload_file/<document_id>', methods=['POST'])
+@USER_REQUEST_API.route('/upload_file/<uuid_string:document_id>', methods=['POST'])
 def upload_file(document_id):
-    request_data = request.get_json()
     try:
+        request_data, document_data, length = read_upload(['document_name'], 'document_data')
         document_name = request_data['document_name']
-        document_data = request_data['document_data'].split("base64,")[1]
-    except KeyError:
+    except (KeyError, ValueError):
         return jsonify({'error': 'Invalid request body'}), 400
 
     try:
         user = get_user_by_token()
 
-        new_file_id = dataStoreController.update_document(user.email, uuid.UUID(document_id), document_name, document_data)
+        new_file_id = dataStoreController.update_document(user.email, uuid.UUID(document_id), document_name,
+                                                          document_data, length)
     except ItemNotFoundError:
         return jsonify({'error': 'Incorrect directory'}), 404
     except NotAllowedError:
         return jsonify("No access to this space"), 401
+    except ValueError:
+        return jsonify({'error': 'Invalid file data'}), 400
+    except VersionConflictError:
+        return jsonify({'error': 'Document was replaced by another version'}), 409
     return jsonify({'id': new_file_id}), 200
 
 
-@USER_REQUEST_API.route('/download/<item_id>', methods=['GET'])
+@USER_REQUEST_API.route('/download/<uuid_string:item_id>', methods=['GET'])
 @token_required
 def download_by_item_id(item_id):
     """
@@ -989,12 +1123,85 @@ def download_by_item_id(item_id):
     """
     user = get_user_by_token()
     try:
-        result = dataStoreController.download_item(user.email, item_id)
-        return send_file(result[0], download_name=result[1].get_name(), as_attachment=True), 200
+        item = dataStoreController.get_file_by_id(user.email, item_id)
+        return send_cloud_file(dataStoreController.get_document_object_name(item.get_id()),
+                               download_name=item.get_name(), as_attachment=True, etag=document_etag(item))
     except FileNotFoundError:
         return jsonify({'error': 'Item not found'}), 404
 
 
+@USER_REQUEST_API.route('/download/<uuid_string:item_id>/presigned', methods=['GET'])
+@token_required
+def get_presigned_download_url(item_id):
+    """
+    Path:
+        - item_id: id of item to download
+    Result:
+        {"url": short-lived URL to download the item straight from the storage, "expires_in": seconds}
+    """
+    user = get_user_by_token()
+    try:
+        url = dataStoreController.get_presigned_download_url(user.email, item_id)
+    except FileNotFoundError:
+        return jsonify({'error': 'Item not found'}), 404
+    except NotAllowedError:
+        return jsonify("No access to this space"), 401
+    return jsonify({'url': url, 'expires_in': presigned_url_expires}), 200
+
+
+@USER_REQUEST_API.route('/upload_file/<uuid_string:document_id>/presigned', methods=['POST'])
+@token_required
+def get_presigned_upload_url(document_id):
+    """
+    Path:
+        - document_id: id of document to replace
+    Result:
+        {"token": upload token, "url": short-lived URL to PUT the file to, "expires_in": seconds}
+    The upload is registered with /upload_file/<document_id>/finalize and the token
+    """
+    user = get_user_by_token()
+    try:
+        token, url = dataStoreController.get_presigned_upload_url(user.email, uuid.UUID(document_id))
+    except FileNotFoundError:
+        return jsonify({'error': 'Item not found'}), 404
+    except (NotAllowedError, AccessError):
+        return jsonify("No access to this space"), 401
+    return jsonify({'token': token, 'url': url, 'expires_in': presigned_url_expires}), 200
+
+
+@USER_REQUEST_API.route('/upload_file/<uuid_string:document_id>/finalize', methods=['POST'])
+@token_required
+def finalize_upload(document_id):
+    """
+    Path:
+        - document_id: id of document to replace
+    Body:
+        {"token": upload token given with the URL, "document_name": name of the new version}
+    Result:
+        {"id": id of the new version}
+    """
+    request_data = request.get_json()
+    try:
+        token = request_data['token']
+        document_name = request_data['document_name']
+    except KeyError:
+        return jsonify({'error': 'Invalid request body'}), 400
+
+    user = get_user_by_token()
+    try:
+        new_file_id = dataStoreController.finalize_document_upload(user.email, uuid.UUID(document_id), token,
+                                                                   document_name)
+    except ValueError:
+        return jsonify({'error': 'Invalid upload token'}), 400
+    except FileNotFoundError:
+        return jsonify({'error': 'File is not uploaded'}), 404
+    except (NotAllowedError, AccessError):
+        return jsonify("No access to this space"), 401
+    except VersionConflictError:
+        return jsonify({'error': 'Document was replaced by another version'}), 409
+    return jsonify({'id': new_file_id}), 200
+
+
 @USER_REQUEST_API.route('/whoiam', methods=['GET'])
 @token_required
 def get_user_list():
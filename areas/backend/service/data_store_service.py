@@ -3,12 +3,16 @@ from typing import Optional, BinaryIO
 import uuid
 from uuid import UUID
 
+from jwt import InvalidTokenError, decode, encode
+
+from config import presigned_url_expires, upload_token_secret
+
 from core.accesses import BaseAccess, DepartmentAccess, UserAccess, UrlAccess, AccessType
 from core.branch import Branch
 from core.document import Document
 from core.request import Request
 from core.workspace import WorkSpace
-from exceptions.exceptions import ItemNotFoundError, AlreadyExistsError, SpaceNotFoundError
+from exceptions.exceptions import ItemNotFoundError, AlreadyExistsError, SpaceNotFoundError, NotAllowedError
 from repository.data_store_storage_repository import DataStoreStorageRepository
 
 from core.workspace_status import WorkSpaceStatus
@@ -18,6 +22,9 @@ class DataStoreService:
     def __init__(self):
         self.data_store_storage_repo = DataStoreStorageRepository()
 
+    def get_cache_stats(self) -> list[dict]:
+        return self.data_store_storage_repo.get_cache_stats()
+
     #############
     # SEARCH
     #############
@@ -42,9 +49,21 @@ class DataStoreService:
     def get_workspaces_open(self) -> list[WorkSpace]:
         return self.data_store_storage_repo.get_workspaces_open()
 
+    def get_workspaces_summary(self, user_mail: str, archived: bool) -> list[tuple[WorkSpace, int]]:
+        return self.data_store_storage_repo.get_workspaces_summary(user_mail, archived)
+
+    def get_workspaces_access_summary(self, user_mail: str) -> list[tuple[WorkSpace, AccessType, int]]:
+        return self.data_store_storage_repo.get_workspaces_access_summary(user_mail)
+
+    def get_workspaces_open_summary(self) -> list[tuple[WorkSpace, int]]:
+        return self.data_store_storage_repo.get_workspaces_open_summary()
+
     def change_workspace_status(self, user_mail: str, space_id: uuid.UUID, status: str):
         self.data_store_storage_repo.change_workspace_status(user_mail=user_mail, space_id=space_id, status=status)
 
+    def get_workspace_revision(self, user_mail: str, space_id: UUID, archived: bool = False) -> int:
+        return self.data_store_storage_repo.get_workspace_revision(user_mail, space_id, archived)
+
     def get_workspace_by_id(self, user_mail: str, space_id: UUID, archived) -> Optional[tuple[str, str, WorkSpace]]:
         name, user_id, space = self.data_store_storage_repo.get_workspace_by_id(user_mail, space_id, archived)
 
@@ -53,8 +72,14 @@ class DataStoreService:
 
         return name, user_id, space
 
-    def create_workspace(self, user_mail: str, workspace: WorkSpace, document_name: str, document_data: str, task: str):
-        return self.data_store_storage_repo.create_workspace(user_mail, workspace, document_name, document_data, task)
+    def create_workspace(self, user_mail: str, workspace: WorkSpace, document_name: str,
+                         document_data: str | BinaryIO, task: str, document_length: int = -1):
+        return self.data_store_storage_repo.create_workspace(user_mail, workspace, document_name, document_data, task,
+                                                             document_length)
+
+    def copy_workspace(self, user_mail: str, workspace: WorkSpace, document_name: str,
+                       source_document_id: UUID, task: str):
+        return self.data_store_storage_repo.copy_workspace(user_mail, workspace, document_name, source_document_id, task)
 
     def get_all_workspaces(self, page: int, limit: int, deleted: bool) -> list[(str, WorkSpace)]:
         workspaces = self.data_store_storage_repo.get_all_workspaces(deleted)
@@ -138,9 +163,9 @@ class DataStoreService:
     # Create Document
 
     def add_new_document(self, user_email: str, workspace_id: uuid.UUID, new_document_name: str, new_document_type: str,
-                         new_file_data: str) -> UUID:
+                         new_file_data: str | BinaryIO, length: int = -1) -> UUID:
         try:
-            name, user_id, workspace = self.get_workspace_by_id(user_email, workspace_id)
+            name, user_id, workspace = self.get_workspace_by_id(user_email, workspace_id, False)
         except SpaceNotFoundError:
             raise ItemNotFoundError
         # TODO тут нужно проверять, есть ли файл с таким названием в воркспейсе
@@ -160,26 +185,47 @@ class DataStoreService:
 
         new_document = Document(name=full_file_name, file=uuid.uuid4(), task_id=uuid.uuid4(),
                                 time=datetime.datetime.now(), _id=uuid.uuid4())
-        return self.data_store_storage_repo.add_new_document(workspace, new_document, new_file_data)
+        return self.data_store_storage_repo.add_new_document(new_document, new_file_data, workspace.main_branch,
+                                                             length)
 
     # Create Document
 
-    def update_document(self, user_mail: str, document_id: uuid.UUID, document_name: str, new_file_data: str) -> UUID:
-        return self.data_store_storage_repo.update_document(user_mail, document_id, document_name, new_file_data)
+    def update_document(self, user_mail: str, document_id: uuid.UUID, document_name: str,
+                        new_file_data: str | BinaryIO, length: int = -1) -> UUID:
+        return self.data_store_storage_repo.update_document(user_mail, document_id, document_name, new_file_data,
+                                                            length)
 
-    def download_item(self, user_mail: str, item_id: UUID) -> [BinaryIO, Document]:
-        try:
-            item = self.get_file_by_id(user_mail=user_mail, item_id=item_id)
-        except FileNotFoundError:
-            raise FileNotFoundError
+    # Presigned URLs
 
-        if item is not None:
-            if isinstance(item, Document):
-                # result = self.data_store_storage_repo.get_binary_file_from_cloud_by_id(item.get_name())
-                result = self.data_store_storage_repo.get_binary_io_file_from_cache(str(item.get_id()) + item.get_name())
-                return [result, item]
-        else:
-            raise ItemNotFoundError  # pragma: no cover reason: We never get this error
+    def get_presigned_download_url(self, user_mail: str, document_id: UUID) -> str:
+        return self.data_store_storage_repo.get_presigned_download_url(user_mail, document_id)
+
+    def get_presigned_upload_url(self, user_mail: str, document_id: UUID) -> tuple[str, str]:
+        """
+        :return: upload token to pass to finalize_document_upload and the URL to upload the file to
+        """
+        upload_id, url = self.data_store_storage_repo.get_presigned_upload_url(user_mail, document_id)
+        # Valid longer than the URL, an upload started just before the URL expires can still be registered
+        expires = datetime.datetime.now(tz=datetime.timezone.utc) + \
+            datetime.timedelta(seconds=2 * presigned_url_expires)
+        token = encode({"upload": str(upload_id), "document": str(document_id), "user": user_mail, "exp": expires},
+                       upload_token_secret, algorithm="HS256")
+        return token, url
+
+    def finalize_document_upload(self, user_mail: str, document_id: UUID, token: str, document_name: str) -> UUID:
+        """
+        :param token: upload token given with the URL
+        :raise ValueError: invalid or expired token
+        :raise NotAllowedError: the token was given to another user or for another document
+        """
+        try:
+            payload = decode(token, upload_token_secret, ["HS256"])
+            upload_id = UUID(payload["upload"])
+        except (InvalidTokenError, KeyError, ValueError):
+            raise ValueError("Invalid upload token")
+        if payload.get("user") != user_mail or payload.get("document") != str(document_id):
+            raise NotAllowedError()
+        return self.data_store_storage_repo.finalize_document_upload(user_mail, document_id, upload_id, document_name)
 
     def get_file_by_id(self, user_mail: str, item_id: UUID) -> Document:
         return self.data_store_storage_repo.get_document_by_id(user_mail, item_id)
@@ -199,11 +245,14 @@ class DataStoreService:
 
         raise FileNotFoundError  # pragma: no cover reason: We never get this error
 
-    def get_binary_file_from_cloud_by_id(self, file_name: str) -> Optional[BinaryIO]:
-        return self.data_store_storage_repo.get_binary_file_from_cloud_by_id(file_name)
+    def get_binary_file_from_cloud_by_id(self, file_name: str, offset: int = 0, length: int = 0) -> Optional[BinaryIO]:
+        return self.data_store_storage_repo.get_binary_file_from_cloud_by_id(file_name, offset, length)
+
+    def get_file_size_from_cloud(self, file_name: str) -> int:
+        return self.data_store_storage_repo.get_file_size_from_cloud(file_name)
 
-    def get_base64_file_from_cloud_by_id(self, file_name: str) -> Optional[str]:
-        return self.data_store_storage_repo.get_base64_file_from_cloud_by_id(file_name)
+    def get_document_object_name(self, document_id: uuid.UUID) -> str:
+        return self.data_store_storage_repo.get_document_object_name(document_id)
 
     def rename_item_by_id(self, user_mail: str, item_id: UUID, new_name: str):
         try:
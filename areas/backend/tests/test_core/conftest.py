@@ -0,0 +1,73 @@
+import fnmatch
+import socketserver
+import threading
+import time
+
+import pytest
+
+
+class StandInRedisHandler(socketserver.StreamRequestHandler):
+    """
+    Local stand-in for a Redis server: serves the few commands RedisCacheBackend sends through redis-py
+    """
+
+    def handle(self):
+        while True:
+            command = self.read_command()
+            if command is None:
+                return
+            self.server.commands.append(command)
+            self.wfile.write(self.execute(command[0].upper().decode(), command[1:]))
+
+    def read_command(self):
+        line = self.rfile.readline()
+        if not line:
+            return None
+        arguments = []
+        for _ in range(int(line[1:])):
+            length = int(self.rfile.readline()[1:])
+            arguments.append(self.rfile.read(length + 2)[:-2])
+        return arguments
+
+    def execute(self, name: str, arguments: list[bytes]) -> bytes:
+        data: dict = self.server.data
+        now = time.monotonic()
+        for key in [key for key, (_, expires) in data.items() if expires is not None and expires < now]:
+            del data[key]
+
+        if name == 'SELECT':
+            return b'+OK\r\n'
+        if name == 'AUTH':
+            return b'+OK\r\n' if arguments[-1] == b'secret' else b'-WRONGPASS invalid password\r\n'
+        if name == 'SET':
+            expires = now + int(arguments[3]) / 1000 if len(arguments) > 2 else None
+            data[arguments[0]] = (arguments[1], expires)
+            return b'+OK\r\n'
+        if name == 'MGET':
+            reply = b'*%d\r\n' % len(arguments)
+            for key in arguments:
+                value = data.get(key)
+                reply += b'$-1\r\n' if value is None else b'$%d\r\n%s\r\n' % (len(value[0]), value[0])
+            return reply
+        if name == 'DEL':
+            return b':%d\r\n' % sum(data.pop(key, None) is not None for key in arguments)
+        if name == 'SCAN':
+            pattern = arguments[2].decode()
+            keys = [key for key in data if fnmatch.fnmatchcase(key.decode(), pattern)]
+            return b'*2\r\n$1\r\n0\r\n*%d\r\n' % len(keys) + b''.join(
+                b'$%d\r\n%s\r\n' % (len(key), key) for key in keys
+            )
+        return b'-ERR unknown command\r\n'
+
+
+@pytest.fixture
+def redis_server():
+    server = socketserver.ThreadingTCPServer(('127.0.0.1', 0), StandInRedisHandler)
+    server.daemon_threads = True
+    server.data = {}
+    server.commands = []
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
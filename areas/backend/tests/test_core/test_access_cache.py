@@ -0,0 +1,81 @@
+import pytest
+
+from cache.memory_backend import MemoryCacheBackend
+from core.accesses import Access
+from repository.cache import access_cache
+
+
+class Loader:
+    def __init__(self, level):
+        self.level = level
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return self.level
+
+
+class TestAccessCache:
+
+    @pytest.fixture(autouse=True)
+    def backend(self, monkeypatch):
+        backend = MemoryCacheBackend(name="access", max_size=100, ttl=60)
+        monkeypatch.setattr(access_cache, "_cache", backend)
+        return backend
+
+    def test_cached_until_invalidated(self):
+        load = Loader(Access.Edit)
+        assert access_cache.get_access_level("user1", "space1", load) == Access.Edit
+        assert access_cache.get_access_level("user1", "space1", load) == Access.Edit
+        assert load.calls == 1
+
+        access_cache.invalidate_workspace("space1")
+        load.level = Access.View
+        assert access_cache.get_access_level("user1", "space1", load) == Access.View
+        assert load.calls == 2
+
+        access_cache.invalidate_users(["user1"])
+        load.level = None
+        assert access_cache.get_access_level("user1", "space1", load) is None
+        assert access_cache.get_access_level("user1", "space1", load) is None
+        assert load.calls == 3
+
+    def test_invalidation_is_scoped(self):
+        loads = {key: Loader(Access.View) for key in ["user1-space1", "user2-space1", "user1-space2"]}
+        for key, load in loads.items():
+            user_id, space_id = key.split("-")
+            access_cache.get_access_level(user_id, space_id, load)
+
+        access_cache.invalidate_workspace("space1")
+        for key, load in loads.items():
+            user_id, space_id = key.split("-")
+            access_cache.get_access_level(user_id, space_id, load)
+
+        assert {key: load.calls for key, load in loads.items()} == {
+            "user1-space1": 2, "user2-space1": 2, "user1-space2": 1
+        }
+
+    def test_revocation_reaches_every_worker(self, monkeypatch, redis_server):
+        pytest.importorskip("redis")
+        from cache.redis_backend import RedisCacheBackend
+
+        host, port = redis_server.server_address
+        workers = [RedisCacheBackend(name="access", url=f"redis://{host}:{port}/0", ttl=60) for _ in range(2)]
+        load = Loader(Access.Edit)
+
+        monkeypatch.setattr(access_cache, "_cache", workers[0])
+        assert access_cache.get_access_level("user1", "space1", load) == Access.Edit
+
+        # Another worker handles the revocation
+        monkeypatch.setattr(access_cache, "_cache", workers[1])
+        assert access_cache.get_access_level("user1", "space1", load) == Access.Edit
+        assert load.calls == 1
+        access_cache.invalidate_workspace("space1")
+
+        monkeypatch.setattr(access_cache, "_cache", workers[0])
+        load.level = None
+        assert access_cache.get_access_level("user1", "space1", load) is None
+        assert load.calls == 2
+
+        for worker in workers:
+            worker.close()
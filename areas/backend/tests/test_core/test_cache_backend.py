@@ -0,0 +1,81 @@
+import pytest
+
+from cache import memory_backend
+from cache.decorators import cached
+from cache.memory_backend import MemoryCacheBackend
+
+
+class TestMemoryCacheBackend:
+
+    def test_get_set_delete_many(self):
+        cache = MemoryCacheBackend(name="test", max_size=10, ttl=60)
+        cache.set_many({"a": 1, "b": [2]})
+        cache.set("c", "3")
+
+        assert cache.get_many(["a", "b", "c", "d"]) == [1, [2], "3", None]
+        cache.delete_many(["a", "c", "d"])
+        assert cache.get_many(["a", "b", "c"]) == [None, [2], None]
+
+        stats = cache.stats()
+        assert stats["backend"] == "memory"
+        assert (stats["hits"], stats["misses"], stats["size"]) == (4, 3, 1)
+
+    def test_least_recently_used_evicted(self):
+        cache = MemoryCacheBackend(name="test", max_size=2, ttl=60)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        assert cache.get("a") == 1
+        cache.set("c", 3)
+
+        assert cache.get_many(["a", "b", "c"]) == [1, None, 3]
+        assert cache.stats()["evictions"] == 1
+
+    def test_entries_expire(self, monkeypatch):
+        now = [1000.0]
+        monkeypatch.setattr(memory_backend.time, "monotonic", lambda: now[0])
+        cache = MemoryCacheBackend(name="test", max_size=10, ttl=60)
+        cache.set("default", 1)
+        cache.set("short", 2, ttl=5)
+
+        now[0] += 10
+        assert cache.get_many(["default", "short"]) == [1, None]
+        now[0] += 60
+        assert cache.get("default") is None
+        assert cache.stats()["size"] == 0
+
+
+class TestCacheDecorators:
+
+    class Repository:
+        def __init__(self, cache):
+            self.calls = []
+            self.values = {"1": "one", "2": "two"}
+            self.cache = cache
+
+        def get(self, _id: str):
+            self.calls.append(_id)
+            if _id == "error":
+                raise KeyError(_id)
+            return self.values.get(_id)
+
+    @pytest.fixture
+    def repository(self):
+        cache = MemoryCacheBackend(name="test", max_size=10, ttl=60)
+        repository_class = type("CachedRepository", (self.Repository,), {
+            "get": cached(cache, key=lambda self, _id: f"value:{_id}")(self.Repository.get),
+        })
+        return repository_class(cache)
+
+    def test_cached_by_key(self, repository):
+        assert [repository.get("1"), repository.get("1"), repository.get("2")] == ["one", "one", "two"]
+        assert repository.calls == ["1", "2"]
+        assert repository.cache.get("value:1") == "one"
+
+    def test_none_and_errors_not_cached(self, repository):
+        assert repository.get("3") is None
+        assert repository.get("3") is None
+        with pytest.raises(KeyError):
+            repository.get("error")
+        with pytest.raises(KeyError):
+            repository.get("error")
+        assert repository.calls == ["3", "3", "error", "error"]
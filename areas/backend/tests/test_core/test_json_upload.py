@@ -0,0 +1,65 @@
+import base64
+import json
+from io import BytesIO
+
+import pytest
+
+from rest.json_upload import Base64JsonUpload
+
+
+class TestBase64JsonUpload:
+
+    @staticmethod
+    def upload(body: dict | str, chunk_size: int = 7) -> Base64JsonUpload:
+        if isinstance(body, dict):
+            body = json.dumps(body)
+        return Base64JsonUpload(BytesIO(body.encode()), 'document_data', chunk_size=chunk_size)
+
+    @pytest.mark.parametrize('prefix', ['', 'data:@file/plain;base64,', 'data:application/octet-stream;base64,'])
+    def test_fields_before_file(self, prefix):
+        content = bytes(range(256)) * 10
+        upload = self.upload({
+            'document_name': 'test.bin',
+            'size': 2560,
+            'tags': {'a': [1, '}']},
+            'document_data': prefix + base64.b64encode(content).decode(),
+            'task': None,
+        })
+
+        assert upload.read_fields() == {'document_name': 'test.bin', 'size': 2560, 'tags': {'a': [1, '}']}}
+
+        result = b''
+        while chunk := upload.read(100):
+            assert len(chunk) <= 100
+            result += chunk
+        assert result == content
+        assert upload.fields['task'] is None
+
+    def test_fields_after_file(self):
+        upload = self.upload({'document_data': base64.b64encode(b'Test document').decode(), 'document_name': 'x'})
+
+        assert upload.read_fields() == {}
+        assert upload.read() == b'Test document'
+        assert upload.fields == {'document_name': 'x'}
+
+    def test_escaped_characters(self):
+        encoded = base64.b64encode(b'\xfb\xff\xbf' * 50).decode()
+        assert '/' in encoded
+        body = '{"document_name": "t\\u00e9st\\"", "document_data": "%s\\n"}' % encoded.replace('/', '\\/')
+        upload = self.upload(body, chunk_size=3)
+
+        assert upload.read_fields() == {'document_name': 'tést"'}
+        assert upload.read() == b'\xfb\xff\xbf' * 50
+
+    @pytest.mark.parametrize('body, error', [
+        ('{"document_name": "x"}', KeyError),
+        ('["document_data"]', ValueError),
+        ('{"document_data": 5}', ValueError),
+        ('{"document_name": "x", "document_data": "VGVzdA', ValueError),
+        ('{"document_data": "VGVzd"}', ValueError),
+    ])
+    def test_invalid_body(self, body, error):
+        upload = self.upload(body)
+        with pytest.raises(error):
+            upload.read_fields()
+            upload.read()
@@ -0,0 +1,98 @@
+from io import BytesIO
+
+import pytest
+
+# The decoder comes from werkzeug, installed with requirements.txt but not in the pytest-only core job
+pytest.importorskip("werkzeug")
+
+from rest.multipart_upload import MultipartUpload
+
+BOUNDARY = b'----boundary42'
+
+
+def part(name: str, content: bytes, filename: str | None = None) -> bytes:
+    disposition = f'form-data; name="{name}"' + (f'; filename="{filename}"' if filename else '')
+    return b'--' + BOUNDARY + f'\r\nContent-Disposition: {disposition}\r\n\r\n'.encode() + content + b'\r\n'
+
+
+def body(*parts: bytes) -> bytes:
+    return b''.join(parts) + b'--' + BOUNDARY + b'--\r\n'
+
+
+class CountingStream(BytesIO):
+
+    def __init__(self, content: bytes):
+        super().__init__(content)
+        self.consumed = 0
+
+    def read(self, size=-1):
+        chunk = super().read(size)
+        self.consumed += len(chunk)
+        return chunk
+
+
+class TestMultipartUpload:
+
+    @staticmethod
+    def upload(content: bytes, chunk_size: int = 7) -> MultipartUpload:
+        return MultipartUpload(BytesIO(content), BOUNDARY, 'document_data', chunk_size=chunk_size)
+
+    def test_fields_before_file(self):
+        content = bytes(range(256)) * 10 + b'\r\n--' + BOUNDARY[:5]
+        upload = self.upload(body(
+            part('document_name', 'tést.bin'.encode()),
+            part('task', b''),
+            part('document_data', content, filename='test.bin'),
+            part('description', b'after'),
+        ))
+
+        assert upload.read_fields() == {'document_name': 'tést.bin', 'task': ''}
+
+        result = b''
+        while chunk := upload.read(100):
+            assert len(chunk) <= 100
+            result += chunk
+        assert result == content
+        assert upload.fields['description'] == 'after'
+
+    def test_fields_after_file(self):
+        upload = self.upload(body(
+            part('document_data', b'Test document', filename='test.txt'),
+            part('document_name', b'x'),
+        ))
+
+        assert upload.read_fields() == {}
+        assert upload.read() == b'Test document'
+        assert upload.fields == {'document_name': 'x'}
+
+    def test_other_files_skipped(self):
+        upload = self.upload(body(
+            part('attachment', b'other', filename='other.txt'),
+            part('document_data', b'first', filename='a.txt'),
+            part('document_data', b'second', filename='b.txt'),
+        ))
+
+        assert upload.read_fields() == {}
+        assert upload.read() == b'first'
+
+    def test_file_not_spooled(self):
+        content = b'x' * 1024 * 1024
+        stream = CountingStream(body(part('document_name', b'big'), part('document_data', content, filename='big')))
+        upload = MultipartUpload(stream, BOUNDARY, 'document_data', chunk_size=1024)
+
+        assert upload.read_fields() == {'document_name': 'big'}
+        assert upload.read(1024) == b'x' * 1024
+        assert stream.consumed < 8 * 1024
+
+    @pytest.mark.parametrize('content, error', [
+        (body(part('document_name', b'x')), KeyError),
+        (body(part('document_name', b'\xff'), part('document_data', b'x', filename='x')), ValueError),
+        (part('document_data', b'Test', filename='test.txt'), ValueError),
+        (b'--' + BOUNDARY + b'\r\nContent-Disposition: form-data; name="document_data"; filename="x"\r\n\r\nTe',
+         ValueError),
+    ])
+    def test_invalid_body(self, content, error):
+        upload = self.upload(content)
+        with pytest.raises(error):
+            upload.read_fields()
+            upload.read()
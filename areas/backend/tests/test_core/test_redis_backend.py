@@ -0,0 +1,103 @@
+import time
+
+import pytest
+
+# redis-py is installed with requirements.txt, not in the pytest-only core job.
+# No Redis server is needed: the redis_server fixture is a local stand-in (see conftest.py)
+pytest.importorskip("redis")
+
+from cache.redis_backend import RedisCacheBackend
+
+
+def create_backend(redis_server, **kwargs) -> RedisCacheBackend:
+    host, port = redis_server.server_address
+    return RedisCacheBackend(name="test", url=kwargs.pop("url", f"redis://{host}:{port}/0"), ttl=60, **kwargs)
+
+
+class TestRedisCacheBackend:
+
+    def test_get_set_delete_many(self, redis_server):
+        cache = create_backend(redis_server)
+        cache.set_many({"a": {"value": 1}, "b": [2]})
+
+        assert cache.get_many(["a", "b", "c"]) == [{"value": 1}, [2], None]
+        assert set(redis_server.data) == {b"test:a", b"test:b"}
+
+        cache.delete_many(["a", "c"])
+        assert cache.get_many(["a", "b"]) == [None, [2]]
+
+        stats = cache.stats()
+        assert stats["backend"] == "redis"
+        assert (stats["hits"], stats["misses"], stats["errors"]) == (3, 2, 0)
+        cache.close()
+
+    def test_one_command_per_batch(self, redis_server):
+        cache = create_backend(redis_server)
+        cache.set_many({str(index): index for index in range(10)})
+        assert cache.get_many([str(index) for index in range(10)]) == list(range(10))
+
+        commands = [command for command in redis_server.commands if command[0] != b"CLIENT"]
+        assert [command[0] for command in commands] == [b"SET"] * 10 + [b"MGET"]
+        assert commands[0][3:] == [b"PX", b"60000"]
+        cache.close()
+
+    @pytest.mark.parametrize('data', [
+        b"not a pickle",
+        b"\x80\x05",
+        b"cmodule_removed_by_a_new_release\nWorkSpace\n.",
+    ])
+    def test_unreadable_value_is_a_miss(self, redis_server, data):
+        cache = create_backend(redis_server)
+        cache.set("b", 2)
+        redis_server.data[b"test:a"] = (data, None)
+
+        assert cache.get_many(["a", "b"]) == [None, 2]
+        stats = cache.stats()
+        assert (stats["hits"], stats["misses"], stats["errors"]) == (1, 1, 1)
+        cache.close()
+
+    def test_entries_expire(self, redis_server):
+        cache = create_backend(redis_server)
+        cache.set("short", 1, ttl=0.05)
+        cache.set("default", 2)
+        time.sleep(0.1)
+        assert cache.get_many(["short", "default"]) == [None, 2]
+        cache.close()
+
+    def test_clear_keeps_other_prefixes(self, redis_server):
+        cache = create_backend(redis_server)
+        other = create_backend(redis_server, prefix="other:")
+        cache.set("a", 1)
+        other.set("a", 2)
+
+        cache.clear()
+        assert cache.get("a") is None
+        assert other.get("a") == 2
+        cache.close()
+        other.close()
+
+    def test_authentication(self, redis_server):
+        host, port = redis_server.server_address
+        cache = create_backend(redis_server, url=f"redis://:secret@{host}:{port}/1")
+        cache.set("a", 1)
+        assert cache.get("a") == 1
+        setup = [command for command in redis_server.commands if command[0] in (b"AUTH", b"SELECT")]
+        assert setup == [[b"AUTH", b"secret"], [b"SELECT", b"1"]]
+        cache.close()
+
+        wrong = create_backend(redis_server, url=f"redis://:wrong@{host}:{port}/0")
+        assert wrong.get("a") is None
+        assert wrong.stats()["errors"] == 1
+
+    def test_unavailable_server_is_a_miss(self, redis_server):
+        cache = create_backend(redis_server, timeout=0.5)
+        cache.set("a", 1)
+        redis_server.shutdown()
+        redis_server.server_close()
+        cache.close()
+
+        assert cache.get("a") is None
+        cache.set("a", 1)
+        cache.delete("a")
+        stats = cache.stats()
+        assert (stats["misses"], stats["errors"]) == (1, 3)
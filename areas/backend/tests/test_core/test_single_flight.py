@@ -0,0 +1,67 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from repository.single_flight import SingleFlight
+
+
+class TestSingleFlight:
+
+    def test_concurrent_calls_share_one_execution(self):
+        flight = SingleFlight(name="test")
+        started = threading.Event()
+        release = threading.Event()
+        executions = []
+
+        def load():
+            executions.append(1)
+            started.set()
+            release.wait(5)
+            return {"value": 42}
+
+        with ThreadPoolExecutor(max_workers=5) as executor:
+            leader = executor.submit(flight.do, "key", load)
+            assert started.wait(5)
+            followers = [executor.submit(flight.do, "key", load) for _ in range(4)]
+            while flight.stats()["shared"] < 4:
+                pass
+            release.set()
+
+            results = [leader.result()] + [follower.result() for follower in followers]
+
+        assert len(executions) == 1
+        assert all(result == ({"value": 42}, True) for result in results)
+        assert flight.stats() == {"name": "test", "in_flight": 0, "calls": 1, "shared": 4}
+
+    def test_sequential_calls_run_again(self):
+        flight = SingleFlight(name="test")
+        values = iter([1, 2])
+
+        assert flight.do("key", lambda: next(values)) == (1, False)
+        assert flight.do("key", lambda: next(values)) == (2, False)
+
+    def test_error_is_shared(self):
+        flight = SingleFlight(name="test")
+        started = threading.Event()
+        release = threading.Event()
+
+        def load():
+            started.set()
+            release.wait(5)
+            raise FileNotFoundError
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            leader = executor.submit(flight.do, "key", load)
+            assert started.wait(5)
+            follower = executor.submit(flight.do, "key", load)
+            while flight.stats()["shared"] < 1:
+                pass
+            release.set()
+
+            with pytest.raises(FileNotFoundError):
+                leader.result()
+            with pytest.raises(FileNotFoundError):
+                follower.result()
+
+        assert flight.stats()["in_flight"] == 0
@@ -0,0 +1,17 @@
+import pytest
+
+# The storage client needs minio and urllib3, which the pytest-only core job does not install
+pytest.importorskip("minio")
+
+from config import storage_pool_size, storage_connect_timeout, storage_read_timeout
+from repository.storage_client import create_http_client
+
+
+class TestStorageClient:
+
+    def test_http_client_pool(self):
+        http_client = create_http_client()
+
+        assert http_client.connection_pool_kw['maxsize'] == storage_pool_size
+        assert http_client.connection_pool_kw['timeout'].connect_timeout == storage_connect_timeout
+        assert http_client.connection_pool_kw['timeout'].read_timeout == storage_read_timeout
@@ -0,0 +1,132 @@
+import hashlib
+import os
+from io import BytesIO
+
+import pytest
+
+from repository.cache.tiered_cache import TieredBlobCache
+
+
+class TestTieredBlobCache:
+
+    @pytest.fixture
+    def cache(self, tmp_path):
+        return TieredBlobCache(name="test", directory=str(tmp_path / "blobs"), memory_max_size=10,
+                               memory_max_blob_size=4, disk_max_size=20, disk_max_blob_size=10)
+
+    @staticmethod
+    def read_through(cache: TieredBlobCache, key: str, data: bytes, amt: int = 3) -> bytes:
+        with cache.read_through(key, BytesIO(data), len(data)) as stream:
+            return b''.join(iter(lambda: stream.read(amt), b''))
+
+    def test_small_blob_in_memory(self, cache):
+        assert cache.open("a") is None
+        assert self.read_through(cache, "a", b"abcd") == b"abcd"
+
+        with cache.open("a") as stream:
+            assert stream.size == 4
+            assert stream.read() == b"abcd"
+        assert cache.get_size("a") == 4
+        assert cache.stats()["memory_items"] == 1
+        assert cache.stats()["disk_items"] == 0
+
+    def test_large_blob_on_disk(self, cache):
+        self.read_through(cache, "a", b"0123456789")
+
+        with cache.open("a") as stream:
+            assert stream.read() == b"0123456789"
+        with cache.open("a", offset=2, length=3) as stream:
+            assert stream.size == 3
+            assert stream.read() == b"234"
+        with cache.open("a", offset=7) as stream:
+            assert stream.read() == b"789"
+        assert cache.stats()["disk_items"] == 1
+        assert cache.stats()["disk_hits"] == 3
+
+    def test_disk_tier_survives_restart(self, cache, tmp_path):
+        self.read_through(cache, "a", b"0123456789")
+
+        restarted = TieredBlobCache(name="test", directory=str(tmp_path / "blobs"), memory_max_size=10,
+                                    memory_max_blob_size=4, disk_max_size=20, disk_max_blob_size=10)
+        assert restarted.get_size("a") == 10
+        assert restarted.open("a").read() == b"0123456789"
+
+    def test_disk_tier_shared_between_processes(self, cache, tmp_path):
+        other = TieredBlobCache(name="test", directory=str(tmp_path / "blobs"), memory_max_size=10,
+                                memory_max_blob_size=4, disk_max_size=20, disk_max_blob_size=10)
+        self.read_through(cache, "a", b"0123456789")
+        self.read_through(other, "b", b"abcdefghij")
+        os.utime(os.path.join(cache.directory, hashlib.sha256(b"a").hexdigest()), (1, 1))
+        os.utime(os.path.join(cache.directory, hashlib.sha256(b"b").hexdigest()), (2, 2))
+
+        # Used by the other process only, "a" is still the most recently used blob
+        assert other.open("a").read() == b"0123456789"
+        self.read_through(cache, "c", b"ABCDEFGHIJ")
+
+        assert cache.open("b") is None
+        assert cache.open("a").read() == b"0123456789"
+        assert cache.open("c").read() == b"ABCDEFGHIJ"
+        assert cache.stats()["disk_size"] == 20
+        assert sum(os.path.getsize(os.path.join(cache.directory, name)) for name in os.listdir(cache.directory)) == 20
+
+    def test_stale_temp_files_removed(self, tmp_path):
+        directory = tmp_path / "blobs"
+        directory.mkdir()
+        (directory / ".tmp-stale").write_bytes(b"left by a crash")
+        os.utime(directory / ".tmp-stale", (1, 1))
+        (directory / ".tmp-writing").write_bytes(b"still written")
+
+        cache = TieredBlobCache(name="test", directory=str(directory), memory_max_size=10,
+                                memory_max_blob_size=4, disk_max_size=20, disk_max_blob_size=10)
+        assert cache.get_size("a") is None
+        assert sorted(os.listdir(directory)) == [".tmp-writing"]
+        assert cache.stats()["disk_items"] == 0
+
+    def test_too_large_blob_not_cached(self, cache):
+        stream = BytesIO(b"0123456789a")
+        assert cache.read_through("a", stream, 11) is stream
+        assert cache.read_through("b", stream, None) is stream
+
+    def test_partial_read_not_cached(self, cache):
+        with cache.read_through("a", BytesIO(b"abcd"), 4) as stream:
+            stream.read(2)
+        with cache.read_through("b", BytesIO(b"0123456789"), 10) as stream:
+            stream.read(2)
+
+        assert cache.open("a") is None
+        assert cache.open("b") is None
+        assert os.listdir(cache.directory) == []
+
+    def test_evicts_least_recently_used_by_size(self, cache):
+        self.read_through(cache, "a", b"aaaa")
+        self.read_through(cache, "b", b"bbbb")
+        cache.open("a").read()
+        self.read_through(cache, "c", b"cccc")
+
+        assert cache.open("b") is None
+        assert cache.open("a").read() == b"aaaa"
+        assert cache.open("c").read() == b"cccc"
+        assert cache.stats()["memory_size"] == 8
+        assert cache.stats()["evictions"] == 1
+
+    def test_stats(self, cache):
+        self.read_through(cache, "a", b"abcd")
+        self.read_through(cache, "b", b"0123456789")
+        cache.open("a")
+        cache.open("b")
+        cache.open("c")
+
+        stats = cache.stats()
+        assert stats["memory_hits"] == 1
+        assert stats["disk_hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["hit_ratio"] == pytest.approx(2 / 3)
+
+    def test_clear(self, cache):
+        self.read_through(cache, "a", b"abcd")
+        self.read_through(cache, "b", b"0123456789")
+        cache.clear()
+
+        assert cache.open("a") is None
+        assert cache.open("b") is None
+        assert cache.stats()["disk_size"] == 0
@@ -1,4 +1,6 @@
-from datetime import datetime
+from datetime import datetime, timezone
+from io import BytesIO
+from types import SimpleNamespace
 
 import pytest
 from bcrypt import hashpw, gensalt
@@ -11,6 +13,83 @@ from web_server import create_app
 app_testing = create_app(True, db_uri=f'sqlite:///:memory:')
 
 
+class StandInMinio:
+    """
+    In-memory stand-in for the MinIO client: keeps objects of the calls the repository makes in a dict
+    """
+
+    def __init__(self):
+        self.objects: dict[tuple[str, str], tuple[bytes, datetime]] = {}
+
+    def bucket_exists(self, bucket_name: str) -> bool:
+        return True
+
+    def put_object(self, bucket_name: str, object_name: str, data, length: int, part_size: int = 0, **kwargs):
+        content = data.read() if length == -1 else data.read(length)
+        self.objects[bucket_name, object_name] = (content, datetime.now(timezone.utc))
+
+    def get_object(self, bucket_name: str, object_name: str, offset: int = 0, length: int = 0, **kwargs):
+        content = self.__content(bucket_name, object_name)
+        content = content[offset:offset + length] if length else content[offset:]
+        response = BytesIO(content)
+        response.headers = {'Content-Length': str(len(content))}
+        response.release_conn = lambda: None
+        return response
+
+    def stat_object(self, bucket_name: str, object_name: str, **kwargs):
+        content = self.__content(bucket_name, object_name)
+        return SimpleNamespace(object_name=object_name, size=len(content),
+                               last_modified=self.objects[bucket_name, object_name][1])
+
+    def copy_object(self, bucket_name: str, object_name: str, source, **kwargs):
+        self.objects[bucket_name, object_name] = (
+            self.__content(source.bucket_name, source.object_name), datetime.now(timezone.utc)
+        )
+
+    def compose_object(self, bucket_name: str, object_name: str, sources, **kwargs):
+        self.objects[bucket_name, object_name] = (
+            b''.join(
+                self.__content(source.bucket_name, source.object_name)[source.offset:source.offset + source.length]
+                for source in sources
+            ),
+            datetime.now(timezone.utc)
+        )
+
+    def remove_object(self, bucket_name: str, object_name: str, **kwargs):
+        self.objects.pop((bucket_name, object_name), None)
+
+    def list_objects(self, bucket_name: str, prefix: str = '', recursive: bool = False, **kwargs):
+        return [
+            SimpleNamespace(object_name=name, size=len(content), last_modified=modified)
+            for (bucket, name), (content, modified) in sorted(self.objects.items())
+            if bucket == bucket_name and name.startswith(prefix)
+        ]
+
+    def presigned_get_object(self, bucket_name: str, object_name: str, **kwargs) -> str:
+        return f'https://storage.test/{bucket_name}/{object_name}?X-Amz-Signature=stand-in'
+
+    def presigned_put_object(self, bucket_name: str, object_name: str, **kwargs) -> str:
+        return f'https://storage.test/{bucket_name}/{object_name}?X-Amz-Signature=stand-in'
+
+    def __content(self, bucket_name: str, object_name: str) -> bytes:
+        if (bucket_name, object_name) not in self.objects:
+            from minio.error import S3Error
+            raise S3Error('NoSuchKey', 'Object does not exist', object_name, None, None, None,
+                          bucket_name, object_name)
+        return self.objects[bucket_name, object_name][0]
+
+
+@pytest.fixture(scope='function', autouse=True)
+def minio_server(monkeypatch):
+    """
+    No MinIO server is needed: the shared storage client is replaced by a local stand-in
+    """
+    from repository import storage_client
+    stand_in = StandInMinio()
+    monkeypatch.setattr(storage_client, '_client', stand_in)
+    yield stand_in
+
+
 @pytest.fixture(scope='function', autouse=True)
 def user1_workspaces():
     from app_db import get_current_db
@@ -126,6 +205,12 @@ def client():
         app_testing.db.drop_all()
         app_testing.db.create_all()
 
+        from repository.cache import access_cache, principal_cache, blob_cache, workspace_cache
+        access_cache.clear()
+        principal_cache.clear()
+        blob_cache.clear()
+        workspace_cache.clear()
+
 
 @pytest.fixture
 def app_client_admin(client):
@@ -1,7 +1,10 @@
 import uuid
 
 import pytest
-from tests.test_new_api.conftest_constants import casual_user_email2
+
+from core.accesses import Access
+from tests.test_new_api.conftest_constants import casual_user_email2, casual_user_id2, user1_workspace1_id, \
+    user1_workspace2_id, user1_workspace3_id
 
 
 class TestUserAccess:
@@ -88,3 +91,73 @@ class TestUserAccess:
         assert get_workspace_accesses.status_code == 200
         accesses = get_workspace_accesses.json['accesses']
         assert len(accesses) == 0
+
+    @pytest.mark.parametrize('view_only', ['true', 'false'])
+    def test_department_access(self, client, casual_user_2, view_only):
+        client.put('/login', json={'email': 'user@mail.com', 'password': 'password'})
+        file_id, branch_id, workspace_id, document_name = self.add_workspace_with_file(client)
+
+        client.put('/login', json={'email': casual_user_email2, 'password': 'password'})
+        assert client.get(f'/get_workspace/{workspace_id}').status_code == 401
+
+        client.put('/login', json={'email': 'user@mail.com', 'password': 'password'})
+        add_access = client.put(f'/accesses/{workspace_id}/department/Test Department?view_only={view_only}')
+        assert add_access.status_code == 200
+
+        client.put('/login', json={'email': 'admin@mail.com', 'password': 'password'})
+        add_user = client.post(f'/department/users?name=Test Department', json={'users': [casual_user_id2]})
+        assert add_user.status_code == 200
+
+        client.put('/login', json={'email': casual_user_email2, 'password': 'password'})
+        assert client.get(f'/get_workspace/{workspace_id}').status_code == 200
+        assert client.get(f'/workspace/{workspace_id}/view/{branch_id}').status_code == 200
+        rename_response = client.put(f'/rename/{file_id}?new_name=renamed.txt')
+        assert rename_response.status_code == (401 if view_only == 'true' else 200)
+
+    def test_access_cache_invalidation(self, client, casual_user_2):
+        client.put('/login', json={'email': 'user@mail.com', 'password': 'password'})
+        file_id, branch_id, workspace_id, document_name = self.add_workspace_with_file(client)
+        assert client.put(f'/accesses/{workspace_id}/email/{casual_user_email2}?view_only=false').status_code == 200
+
+        client.put('/login', json={'email': casual_user_email2, 'password': 'password'})
+        assert client.get(f'/workspace/{workspace_id}/view/{branch_id}').status_code == 200
+        assert client.get(f'/workspace/{workspace_id}/view/{branch_id}').status_code == 200
+
+        client.put('/login', json={'email': 'user@mail.com', 'password': 'password'})
+        assert client.delete(f'/accesses/{workspace_id}/email/{casual_user_email2}').status_code == 200
+
+        client.put('/login', json={'email': casual_user_email2, 'password': 'password'})
+        assert client.get(f'/workspace/{workspace_id}/view/{branch_id}').status_code == 401
+
+        client.put('/login', json={'email': 'admin@mail.com', 'password': 'password'})
+        stats = client.get('/cache_stats')
+        assert stats.status_code == 200
+        access_stats = [cache for cache in stats.json['caches'] if cache['name'] == 'access'][0]
+        assert access_stats['hits'] > 0
+        assert access_stats['misses'] > 0
+
+    def test_access_cache_stats_count_entries(self, client):
+        from repository.cache import access_cache
+        access_cache.clear()
+        hits, misses = access_cache.stats()['hits'], access_cache.stats()['misses']
+
+        assert access_cache.get_access_level(casual_user_id2, user1_workspace1_id, lambda: Access.View) == Access.View
+        assert access_cache.get_access_level(casual_user_id2, user1_workspace1_id, lambda: None) == Access.View
+
+        # One miss and one hit of the entry, lookups of the version tokens are not counted
+        assert access_cache.stats()['misses'] - misses == 1
+        assert access_cache.stats()['hits'] - hits == 1
+
+    @pytest.mark.parametrize('space_id, level', [
+        (user1_workspace1_id, Access.Edit),
+        (user1_workspace2_id, None),
+        (user1_workspace3_id, None),
+    ])
+    def test_owner_access_follows_status(self, client, space_id, level):
+        from database.database import UserModel
+        from repository.data_store_storage_repository import DataStoreStorageRepository
+
+        user = UserModel.query.filter_by(email='user@mail.com').first()
+        repository = DataStoreStorageRepository()
+        assert repository.get_access_level_to_workspace(uuid.UUID(space_id), user) == level
+        assert repository.is_author_of_workspace(user.email, uuid.UUID(space_id)) == (level is not None)
@@ -2,7 +2,7 @@ import uuid
 
 import pytest
 
-from tests.test_new_api.conftest_constants import user1_workspace1_id
+from tests.test_new_api.conftest_constants import user1_workspace1_id, casual_user_email2
 
 
 class TestUserDocument:
@@ -117,3 +117,684 @@ class TestUserDocument:
         get_branch_response = app_client_user.get(f'/workspace/{workspace_id}/view/{branch_id}')
         assert get_branch_response.status_code == 200
         assert get_branch_response.json['document'] == new_filename
+
+    def test_download_file(self, app_client_user):
+        import base64
+        file_id, _, _, document_name, document_data = self.add_workspace_with_file(app_client_user)
+        content = base64.b64decode(document_data.split('base64,')[1])
+
+        get_file = app_client_user.get(f'/download/{file_id}')
+        assert get_file.status_code == 200
+        assert get_file.data == content
+        assert get_file.content_length == len(content)
+        assert document_name in get_file.headers['Content-Disposition']
+
+        assert app_client_user.get(f'/download/{uuid.uuid4()}').status_code == 404
+
+    @pytest.mark.parametrize('byte_range, status, expected, content_range', [
+        ('bytes=0-3', 206, b'Test', 'bytes 0-3/13'),
+        ('bytes=5-', 206, b'document', 'bytes 5-12/13'),
+        ('bytes=-3', 206, b'ent', 'bytes 10-12/13'),
+        ('bytes=100-200', 416, None, 'bytes */13'),
+    ])
+    def test_view_file_range(self, app_client_user, byte_range, status, expected, content_range):
+        file_id, _, _, _, _ = self.add_workspace_with_file(app_client_user)
+
+        get_file = app_client_user.get(f'/file/{file_id}/view', headers={'Range': byte_range})
+        assert get_file.status_code == status
+        assert get_file.headers['Content-Range'] == content_range
+        if expected is not None:
+            assert get_file.data == expected
+            assert get_file.content_length == len(expected)
+            assert get_file.headers['Accept-Ranges'] == 'bytes'
+
+    def test_download_file_without_range(self, app_client_user):
+        file_id, _, _, _, _ = self.add_workspace_with_file(app_client_user)
+
+        get_file = app_client_user.get(f'/download/{file_id}')
+        assert get_file.status_code == 200
+        assert get_file.headers['Accept-Ranges'] == 'bytes'
+        assert 'Content-Range' not in get_file.headers
+
+    def test_presigned_upload(self, app_client_user):
+        from io import BytesIO
+        from repository.data_store_storage_repository import DataStoreStorageRepository
+        file_id, branch_id, workspace_id, _, _ = self.add_workspace_with_file(app_client_user)
+
+        presigned = app_client_user.post(f'/upload_file/{file_id}/presigned')
+        assert presigned.status_code == 200
+        token = presigned.json['token']
+        assert '/sud/uploads/' in presigned.json['url']
+
+        finalize_data = {'token': token, 'document_name': 'test2.txt'}
+        assert app_client_user.post(f'/upload_file/{file_id}/finalize', json=finalize_data).status_code == 404
+
+        # The client uploads the file with the presigned URL
+        upload_name = presigned.json['url'].split('/sud/')[1].split('?')[0]
+        minio_client = DataStoreStorageRepository.get_minio_client()
+        minio_client.put_object("sud", upload_name, BytesIO(b'New test text'), len(b'New test text'))
+
+        finalize = app_client_user.post(f'/upload_file/{file_id}/finalize', json=finalize_data)
+        assert finalize.status_code == 200
+        new_file_id = finalize.json['id']
+        assert app_client_user.post(f'/upload_file/{file_id}/finalize', json=finalize_data).status_code == 404
+
+        get_branch_response = app_client_user.get(f'/workspace/{workspace_id}/view/{branch_id}')
+        assert get_branch_response.json['document_id'] == new_file_id
+        assert app_client_user.get(f'/file/{new_file_id}/view').data == b'New test text'
+
+        # The URL only reaches the staging object, not the registered content
+        object_name = DataStoreStorageRepository().get_document_object_name(new_file_id)
+        assert object_name != upload_name
+        minio_client.put_object("sud", upload_name, BytesIO(b'Overwritten'), len(b'Overwritten'))
+        assert app_client_user.get(f'/file/{new_file_id}/view').data == b'New test text'
+
+    def test_large_upload_composed_from_ranges(self, app_client_user, minio_server, monkeypatch):
+        from io import BytesIO
+        from repository import data_store_storage_repository
+        file_id, _, _, _, _ = self.add_workspace_with_file(app_client_user)
+
+        composed = []
+        compose_object = minio_server.compose_object
+
+        def counting_compose_object(bucket_name, object_name, sources, **kwargs):
+            composed.append([(source.offset, source.length) for source in sources])
+            compose_object(bucket_name, object_name, sources, **kwargs)
+
+        monkeypatch.setattr(minio_server, 'compose_object', counting_compose_object)
+        monkeypatch.setattr(data_store_storage_repository, 'MAX_COPY_SIZE', 5)
+
+        presigned = app_client_user.post(f'/upload_file/{file_id}/presigned').json
+        upload_name = presigned['url'].split('/sud/')[1].split('?')[0]
+        minio_server.put_object("sud", upload_name, BytesIO(b'New test text'), len(b'New test text'))
+
+        finalize_data = {'token': presigned['token'], 'document_name': 'test2.txt'}
+        finalize = app_client_user.post(f'/upload_file/{file_id}/finalize', json=finalize_data)
+        assert finalize.status_code == 200
+        assert composed == [[(0, 5), (5, 5), (10, 3)]]
+        assert app_client_user.get(f'/file/{finalize.json["id"]}/view').data == b'New test text'
+
+    def test_unfinalized_upload_is_collected(self, app_client_user, monkeypatch):
+        from io import BytesIO
+        from flask import current_app
+        from repository import data_store_storage_repository
+        from repository.data_store_storage_repository import DataStoreStorageRepository
+        from repository.storage_sweeper import sweep_storage
+        file_id, _, _, _, _ = self.add_workspace_with_file(app_client_user)
+
+        presigned = app_client_user.post(f'/upload_file/{file_id}/presigned').json
+        upload_name = presigned['url'].split('/sud/')[1].split('?')[0]
+        minio_client = DataStoreStorageRepository.get_minio_client()
+        minio_client.put_object("sud", upload_name, BytesIO(b'Abandoned'), len(b'Abandoned'))
+
+        # Still within the grace period: the client may finalize the upload
+        assert sweep_storage(current_app) == 0
+        minio_client.stat_object("sud", upload_name)
+
+        monkeypatch.setattr(data_store_storage_repository, 'storage_grace_period', 0)
+        assert sweep_storage(current_app) == 1
+        with pytest.raises(Exception):
+            minio_client.stat_object("sud", upload_name)
+        finalize_data = {'token': presigned['token'], 'document_name': 'test2.txt'}
+        assert app_client_user.post(f'/upload_file/{file_id}/finalize', json=finalize_data).status_code == 404
+        assert app_client_user.get(f'/file/{file_id}/view').data == b'Test document'
+
+    def test_concurrent_finalize_registers_once(self, app_client_user):
+        import datetime
+        from io import BytesIO
+        from flask import current_app
+        from repository.data_store_storage_repository import DataStoreStorageRepository
+        file_id, branch_id, workspace_id, _, _ = self.add_workspace_with_file(app_client_user)
+
+        presigned = app_client_user.post(f'/upload_file/{file_id}/presigned').json
+        upload_name = presigned['url'].split('/sud/')[1].split('?')[0]
+        repository = DataStoreStorageRepository()
+        repository.minio_client.put_object("sud", upload_name, BytesIO(b'New test text'), len(b'New test text'))
+
+        # Another request with the same token claimed the upload and is still copying it
+        assert repository._register_blob(upload_name.split('/')[-1], 13, released_at=datetime.datetime.now())
+        current_app.db.session.commit()
+
+        finalize_data = {'token': presigned['token'], 'document_name': 'test2.txt'}
+        assert app_client_user.post(f'/upload_file/{file_id}/finalize', json=finalize_data).status_code == 404
+        assert app_client_user.get(f'/workspace/{workspace_id}/view/{branch_id}').json['document_id'] == file_id
+        repository.minio_client.stat_object("sud", upload_name)
+
+    def test_failed_finalize_leaves_content_to_collection(self, app_client_user, monkeypatch):
+        from io import BytesIO
+        from flask import current_app
+        from database.database import BlobModel
+        from repository import data_store_storage_repository
+        from repository.data_store_storage_repository import DataStoreStorageRepository
+        file_id, _, _, _, _ = self.add_workspace_with_file(app_client_user)
+
+        presigned = app_client_user.post(f'/upload_file/{file_id}/presigned').json
+        upload_name = presigned['url'].split('/sud/')[1].split('?')[0]
+        blob_id = upload_name.split('/')[-1]
+        repository = DataStoreStorageRepository()
+        repository.minio_client.put_object("sud", upload_name, BytesIO(b'New test text'), len(b'New test text'))
+
+        def failing_add_document_version(*args, **kwargs):
+            raise RuntimeError('Database is gone')
+
+        monkeypatch.setattr(DataStoreStorageRepository, '_add_document_version', failing_add_document_version)
+        finalize_data = {'token': presigned['token'], 'document_name': 'test2.txt'}
+        with pytest.raises(RuntimeError):
+            app_client_user.post(f'/upload_file/{file_id}/finalize', json=finalize_data)
+
+        blob = current_app.db.session.get(BlobModel, blob_id)
+        assert (blob.ref_count, blob.released_at is not None) == (0, True)
+        monkeypatch.setattr(data_store_storage_repository, 'storage_grace_period', 0)
+        assert repository.collect_unreferenced_blobs() == 1
+        with pytest.raises(Exception):
+            repository.minio_client.stat_object("sud", f'blobs/{blob_id}')
+
+    def test_presigned_upload_token(self, client, casual_user_2):
+        from io import BytesIO
+        from repository.data_store_storage_repository import DataStoreStorageRepository
+        client.put('/login', json={'email': 'user@mail.com', 'password': 'password'})
+        file_id, _, workspace_id, _, _ = self.add_workspace_with_file(client)
+        other_file_id, _, _, _, _ = self.add_workspace_with_file(client)
+        assert client.put(f'/accesses/{workspace_id}/email/{casual_user_email2}?view_only=false').status_code == 200
+
+        presigned = client.post(f'/upload_file/{file_id}/presigned').json
+        upload_name = presigned['url'].split('/sud/')[1].split('?')[0]
+        DataStoreStorageRepository.get_minio_client().put_object(
+            "sud", upload_name, BytesIO(b'New test text'), len(b'New test text')
+        )
+        finalize_data = {'token': presigned['token'], 'document_name': 'test2.txt'}
+
+        forged = {'token': presigned['token'][:-2] + 'xx', 'document_name': 'test2.txt'}
+        assert client.post(f'/upload_file/{file_id}/finalize', json=forged).status_code == 400
+        assert client.post(f'/upload_file/{other_file_id}/finalize', json=finalize_data).status_code == 401
+
+        # Another editor of the workspace can't register an upload given to someone else
+        client.put('/login', json={'email': casual_user_email2, 'password': 'password'})
+        assert client.post(f'/upload_file/{file_id}/finalize', json=finalize_data).status_code == 401
+
+    def test_presigned_download(self, app_client_user):
+        file_id, _, _, document_name, _ = self.add_workspace_with_file(app_client_user)
+
+        presigned = app_client_user.get(f'/download/{file_id}/presigned')
+        assert presigned.status_code == 200
+        from repository.data_store_storage_repository import DataStoreStorageRepository
+        assert DataStoreStorageRepository().get_document_object_name(file_id) in presigned.json['url']
+        assert presigned.json['expires_in'] > 0
+
+        assert app_client_user.get(f'/download/{uuid.uuid4()}/presigned').status_code == 404
+
+    def test_same_content_is_stored_once(self, app_client_user):
+        import hashlib
+        from flask import current_app
+        from database.database import BlobModel, DocumentModel
+        file_id, branch_id, workspace_id, _, document_data = self.add_workspace_with_file(app_client_user)
+        blob_id = hashlib.sha256(b'Test document').hexdigest()
+
+        req_data = {"document_name": "test2.txt", "document_data": document_data}
+        upload_new_file = app_client_user.post(f'/upload_file/{file_id}', json=req_data)
+        assert upload_new_file.status_code == 200
+        new_file_id = upload_new_file.json['id']
+
+        branch_response = app_client_user.post(f'/workspace/{workspace_id}/add_branch', json={
+            'name': 'branch', 'parent_branch_id': branch_id, 'document_id': new_file_id,
+        })
+        assert branch_response.status_code == 200
+
+        session = current_app.db.session
+        documents = session.query(DocumentModel).filter(DocumentModel.id.in_([file_id, new_file_id])).all()
+        assert {document.blob_id for document in documents} == {blob_id}
+        assert session.query(DocumentModel).filter(DocumentModel.blob_id == blob_id).count() == 3
+        assert session.get(BlobModel, blob_id).size == len(b'Test document')
+        # The first version is replaced, its branch and the new branch use the content
+        assert session.get(BlobModel, blob_id).ref_count == 2
+
+    def test_rename_keeps_content(self, app_client_user):
+        file_id, _, _, _, _ = self.add_workspace_with_file(app_client_user)
+
+        assert app_client_user.put(f'/rename/{file_id}?new_name=renamed.txt').status_code == 200
+        assert app_client_user.get(f'/file/{file_id}/view').data == b'Test document'
+
+    def test_replaced_content_is_collected(self, app_client_user, monkeypatch):
+        import hashlib
+        from flask import current_app
+        from database.database import BlobModel
+        from repository import data_store_storage_repository
+        from repository.data_store_storage_repository import DataStoreStorageRepository
+        file_id, branch_id, workspace_id, _, _ = self.add_workspace_with_file(app_client_user)
+        old_blob_id = hashlib.sha256(b'Test document').hexdigest()
+
+        upload_new_file = app_client_user.post(f'/upload_file/{file_id}', json={
+            'document_name': 'test2.txt', 'document_data': 'TmV3IHRlc3QgdGV4dA==',
+        })
+        assert upload_new_file.status_code == 200
+
+        session = current_app.db.session
+        old_blob = session.get(BlobModel, old_blob_id)
+        assert (old_blob.ref_count, old_blob.released_at is not None) == (0, True)
+
+        repository = DataStoreStorageRepository()
+        # Still within the grace period: presigned URLs and reads under way keep working
+        assert repository.collect_unreferenced_blobs() == 0
+        monkeypatch.setattr(data_store_storage_repository, 'storage_grace_period', 0)
+        assert repository.collect_unreferenced_blobs() == 1
+
+        session.expire_all()
+        assert session.get(BlobModel, old_blob_id) is None
+        with pytest.raises(Exception):
+            repository.minio_client.stat_object("sud", f'blobs/{old_blob_id}')
+        new_file_id = upload_new_file.json['id']
+        assert app_client_user.get(f'/file/{new_file_id}/view').data == b'New test text'
+
+        # The same content uploaded again is stored again
+        again = app_client_user.post(f'/upload_file/{new_file_id}', json={
+            'document_name': 'test.txt', 'document_data': 'VGVzdCBkb2N1bWVudA==',
+        })
+        assert app_client_user.get(f'/file/{again.json["id"]}/view').data == b'Test document'
+        assert session.get(BlobModel, old_blob_id).ref_count == 1
+
+    def test_deleted_branch_releases_content(self, app_client_user):
+        import hashlib
+        from flask import current_app
+        from database.database import BlobModel
+        file_id, branch_id, workspace_id, _, _ = self.add_workspace_with_file(app_client_user)
+        blob_id = hashlib.sha256(b'Test document').hexdigest()
+
+        branch_response = app_client_user.post(f'/workspace/{workspace_id}/add_branch', json={
+            'name': 'branch', 'parent_branch_id': branch_id, 'document_id': file_id,
+        })
+        session = current_app.db.session
+        assert session.get(BlobModel, blob_id).ref_count == 2
+
+        response = app_client_user.delete(f'/workspace/{workspace_id}/branch/{branch_response.json["id"]}')
+        assert response.status_code == 200
+        session.expire_all()
+        assert session.get(BlobModel, blob_id).ref_count == 1
+        assert session.get(BlobModel, blob_id).released_at is None
+
+    def test_concurrent_versions_release_old_content_once(self, app_client_user):
+        import hashlib
+        from flask import current_app
+        from database.database import BlobModel, BranchModel, DocumentModel
+        from exceptions.exceptions import VersionConflictError
+        from repository.data_store_storage_repository import DataStoreStorageRepository
+        file_id, branch_id, workspace_id, _, _ = self.add_workspace_with_file(app_client_user)
+        old_blob_id = hashlib.sha256(b'Test document').hexdigest()
+        app_client_user.post(f'/workspace/{workspace_id}/add_branch', json={
+            'name': 'branch', 'parent_branch_id': branch_id, 'document_id': file_id,
+        })
+
+        repository = DataStoreStorageRepository()
+        session = current_app.db.session
+        # Both writers read the branch and its document before either added a version
+        branch = session.get(BranchModel, branch_id)
+        old_document = session.get(DocumentModel, file_id)
+        first_blob_id, _ = repository.save_blob_to_cloud(b'First version')
+        first = repository._add_document_version(branch, old_document, uuid.uuid4(), 'first.txt', first_blob_id)
+        second_blob_id, _ = repository.save_blob_to_cloud(b'Second version')
+        with pytest.raises(VersionConflictError):
+            repository._add_document_version(branch, old_document, uuid.uuid4(), 'second.txt', second_blob_id)
+
+        session.expire_all()
+        assert session.get(BranchModel, branch_id).document_id == first.id
+        # The other branch still uses the old content
+        assert (session.get(BlobModel, old_blob_id).ref_count, session.get(BlobModel, old_blob_id).released_at) \
+            == (1, None)
+        assert session.get(BlobModel, first_blob_id).ref_count == 1
+        second_blob = session.get(BlobModel, second_blob_id)
+        assert (second_blob.ref_count, second_blob.released_at is not None) == (0, True)
+
+    def test_released_content_written_again_when_reused(self, app_client_user):
+        import hashlib
+        from flask import current_app
+        from database.database import BlobModel
+        from repository.data_store_storage_repository import DataStoreStorageRepository
+        file_id, _, _, _, _ = self.add_workspace_with_file(app_client_user)
+        blob_id = hashlib.sha256(b'Test document').hexdigest()
+
+        upload_new_file = app_client_user.post(f'/upload_file/{file_id}', json={
+            'document_name': 'test2.txt', 'document_data': 'TmV3IHRlc3QgdGV4dA==',
+        })
+        # A collection interrupted after removing the content leaves the row at 0
+        DataStoreStorageRepository.get_minio_client().remove_object("sud", f'blobs/{blob_id}')
+
+        again = app_client_user.post(f'/upload_file/{upload_new_file.json["id"]}', json={
+            'document_name': 'test.txt', 'document_data': 'VGVzdCBkb2N1bWVudA==',
+        })
+        assert app_client_user.get(f'/file/{again.json["id"]}/view').data == b'Test document'
+        blob = current_app.db.session.get(BlobModel, blob_id)
+        assert (blob.ref_count, blob.released_at) == (1, None)
+
+    def test_rename_migrates_legacy_object(self, app_client_user):
+        from io import BytesIO
+        from flask import current_app
+        from sqlalchemy import update
+        from database.database import BlobModel, DocumentModel
+        from repository.data_store_storage_repository import DataStoreStorageRepository
+        file_id, _, _, document_name, _ = self.add_workspace_with_file(app_client_user)
+
+        # Documents created before blobs keep their content in "<document_id>_<name>" objects
+        minio_client = DataStoreStorageRepository.get_minio_client()
+        minio_client.put_object("sud", f'{file_id}_{document_name}', BytesIO(b'Legacy text'), len(b'Legacy text'))
+        session = current_app.db.session
+        session.execute(update(DocumentModel).where(DocumentModel.id == file_id).values(blob_id=None))
+        session.commit()
+        assert app_client_user.get(f'/file/{file_id}/view').data == b'Legacy text'
+
+        assert app_client_user.put(f'/rename/{file_id}?new_name=renamed.txt').status_code == 200
+        assert app_client_user.get(f'/file/{file_id}/view').data == b'Legacy text'
+
+        assert session.get(DocumentModel, file_id).blob_id == file_id
+        assert session.get(BlobModel, file_id).size == len(b'Legacy text')
+        assert session.get(BlobModel, file_id).ref_count == 1
+        with pytest.raises(Exception):
+            minio_client.stat_object("sud", f'{file_id}_{document_name}')
+
+    def test_legacy_object_migrated_once(self, app_client_user):
+        from io import BytesIO
+        from flask import current_app
+        from sqlalchemy import update
+        from database.database import BlobModel, DocumentModel
+        from repository.data_store_storage_repository import DataStoreStorageRepository
+        file_id, _, _, document_name, _ = self.add_workspace_with_file(app_client_user)
+
+        repository = DataStoreStorageRepository()
+        repository.minio_client.put_object("sud", f'{file_id}_{document_name}', BytesIO(b'Legacy text'),
+                                           len(b'Legacy text'))
+        session = current_app.db.session
+        session.execute(update(DocumentModel).where(DocumentModel.id == file_id).values(blob_id=None))
+        session.commit()
+
+        document = session.get(DocumentModel, file_id)
+        assert repository._migrate_legacy_object(document) == file_id
+        session.commit()
+
+        # A concurrent request read the document before it was moved
+        document.blob_id = None
+        assert repository._migrate_legacy_object(document) == file_id
+        session.commit()
+        assert session.get(BlobModel, file_id).ref_count == 1
+
+    def test_copy_document_shares_content(self, app_client_user):
+        from flask import current_app
+        from database.database import BlobModel, DocumentModel
+        file_id, branch_id, workspace_id, _, _ = self.add_workspace_with_file(app_client_user)
+
+        req_data = {'title': 'Test Copy', 'description': 'Test Description Copy'}
+        copy_response = app_client_user.post(f'/workspace/{workspace_id}/copy/{branch_id}', json=req_data)
+        assert copy_response.status_code == 200
+
+        copy_id = copy_response.json['id']
+        copy_branch_id = app_client_user.get(f'/get_workspace/{copy_id}').json['branches'][0]['id']
+        copy_file_id = app_client_user.get(f'/workspace/{copy_id}/view/{copy_branch_id}').json['document_id']
+        assert copy_file_id != file_id
+
+        session = current_app.db.session
+        blob_id = session.get(DocumentModel, file_id).blob_id
+        assert session.get(DocumentModel, copy_file_id).blob_id == blob_id
+        assert session.query(DocumentModel).filter(DocumentModel.blob_id == blob_id).count() == 2
+        assert session.get(BlobModel, blob_id).ref_count == 2
+
+    def test_create_branch_migrates_legacy_object(self, app_client_user):
+        from io import BytesIO
+        from flask import current_app
+        from sqlalchemy import update
+        from database.database import BlobModel, DocumentModel
+        from repository.data_store_storage_repository import DataStoreStorageRepository
+        file_id, branch_id, workspace_id, document_name, _ = self.add_workspace_with_file(app_client_user)
+
+        minio_client = DataStoreStorageRepository.get_minio_client()
+        minio_client.put_object("sud", f'{file_id}_{document_name}', BytesIO(b'Legacy text'), len(b'Legacy text'))
+        session = current_app.db.session
+        session.execute(update(DocumentModel).where(DocumentModel.id == file_id).values(blob_id=None))
+        session.commit()
+
+        branch_response = app_client_user.post(f'/workspace/{workspace_id}/add_branch', json={
+            'name': 'branch', 'parent_branch_id': branch_id, 'document_id': file_id,
+        })
+        assert branch_response.status_code == 200
+        new_file_id = app_client_user.get(
+            f'/workspace/{workspace_id}/view/{branch_response.json["id"]}'
+        ).json['document_id']
+
+        assert app_client_user.get(f'/file/{file_id}/view').data == b'Legacy text'
+        assert app_client_user.get(f'/file/{new_file_id}/view').data == b'Legacy text'
+        assert session.get(DocumentModel, new_file_id).blob_id == file_id
+        assert session.query(DocumentModel).filter(DocumentModel.blob_id == file_id).count() == 2
+        assert session.get(BlobModel, file_id).ref_count == 2
+        with pytest.raises(Exception):
+            minio_client.stat_object("sud", f'{file_id}_{document_name}')
+
+    def test_storage_client_is_shared(self, app_client_user):
+        from repository.data_store_storage_repository import DataStoreStorageRepository
+        from repository.storage_client import get_storage_client
+
+        assert DataStoreStorageRepository().minio_client is get_storage_client()
+        assert DataStoreStorageRepository.get_minio_client() is get_storage_client()
+
+    def test_storage_client_created_on_first_use(self, app_client_user, monkeypatch):
+        from repository import storage_client
+        from repository.data_store_storage_repository import DataStoreStorageRepository
+
+        class Client:
+            def __init__(self, **kwargs):
+                created.append(kwargs)
+
+            def bucket_exists(self, bucket: str) -> bool:
+                return True
+
+        created = []
+        monkeypatch.setattr(storage_client, '_client', None)
+        monkeypatch.setattr(storage_client, 'Minio', Client)
+
+        repository = DataStoreStorageRepository()
+        assert created == []
+        assert isinstance(repository.minio_client, Client)
+        assert repository.minio_client is repository.minio_client
+        assert len(created) == 1
+
+    def test_view_file_from_blob_cache(self, app_client_user):
+        from repository.cache import blob_cache
+        file_id, _, _, _, _ = self.add_workspace_with_file(app_client_user)
+
+        assert app_client_user.get(f'/file/{file_id}/view').data == b'Test document'
+        hits = blob_cache.stats()['memory_hits']
+
+        assert app_client_user.get(f'/file/{file_id}/view').data == b'Test document'
+        get_file = app_client_user.get(f'/file/{file_id}/view', headers={'Range': 'bytes=5-'})
+        assert get_file.status_code == 206
+        assert get_file.data == b'document'
+        assert blob_cache.stats()['memory_hits'] == hits + 2
+
+    def test_ranged_read_of_cold_blob_not_cached(self, app_client_user):
+        from repository.cache import blob_cache
+        from repository.data_store_storage_repository import DataStoreStorageRepository
+        file_id, _, _, _, _ = self.add_workspace_with_file(app_client_user)
+        object_name = DataStoreStorageRepository().get_document_object_name(file_id)
+
+        get_file = app_client_user.get(f'/file/{file_id}/view', headers={'Range': 'bytes=5-'})
+        assert get_file.status_code == 206
+        assert get_file.data == b'document'
+        assert blob_cache.get_size(object_name) is None
+
+        assert app_client_user.get(f'/file/{file_id}/view').data == b'Test document'
+        assert blob_cache.get_size(object_name) == len(b'Test document')
+
+    def test_large_blob_streamed_into_cache(self, app_client_user, monkeypatch):
+        from repository.cache import blob_cache
+        from repository.data_store_storage_repository import DataStoreStorageRepository, _blob_fetches
+        file_id, _, _, _, _ = self.add_workspace_with_file(app_client_user)
+        object_name = DataStoreStorageRepository().get_document_object_name(file_id)
+        # Only blobs up to 4 bytes fit the memory tier, the document goes to the disk tier
+        monkeypatch.setattr(blob_cache._cache, 'memory_max_blob_size', 4)
+        fetches = _blob_fetches.stats()['calls']
+
+        assert app_client_user.get(f'/file/{file_id}/view').data == b'Test document'
+        assert _blob_fetches.stats()['calls'] == fetches
+        assert blob_cache.get_size(object_name) == len(b'Test document')
+
+        disk_hits = blob_cache.stats()['disk_hits']
+        assert app_client_user.get(f'/file/{file_id}/view').data == b'Test document'
+        assert blob_cache.stats()['disk_hits'] == disk_hits + 1
+
+    @pytest.mark.parametrize('path', ['/file/{}/view', '/download/{}'])
+    def test_file_not_modified(self, app_client_user, path):
+        from repository.cache import blob_cache
+        from repository.data_store_storage_repository import DataStoreStorageRepository
+        file_id, _, _, _, _ = self.add_workspace_with_file(app_client_user)
+
+        get_file = app_client_user.get(path.format(file_id))
+        assert get_file.status_code == 200
+        etag = get_file.headers['ETag']
+        assert etag.startswith(f'"{file_id}-')
+        assert get_file.cache_control.private
+        assert get_file.cache_control.no_cache
+        assert not get_file.cache_control.immutable
+
+        # Not modified answers do not read the storage
+        repository = DataStoreStorageRepository()
+        repository.minio_client.remove_object("sud", repository.get_document_object_name(file_id))
+        blob_cache.clear()
+
+        not_modified = app_client_user.get(path.format(file_id), headers={'If-None-Match': etag})
+        assert not_modified.status_code == 304
+        assert not_modified.data == b''
+        assert not_modified.headers['ETag'] == etag
+
+    @pytest.mark.parametrize('path', ['/file/{}/view', '/download/{}'])
+    def test_renamed_file_modified(self, app_client_user, path):
+        file_id, _, _, _, _ = self.add_workspace_with_file(app_client_user)
+        etag = app_client_user.get(path.format(file_id)).headers['ETag']
+
+        assert app_client_user.put(f'/rename/{file_id}?new_name=renamed.txt').status_code == 200
+
+        get_file = app_client_user.get(path.format(file_id), headers={'If-None-Match': etag})
+        assert get_file.status_code == 200
+        assert get_file.data == b'Test document'
+        assert get_file.headers['ETag'] != etag
+        if path.startswith('/download'):
+            assert 'renamed.txt' in get_file.headers['Content-Disposition']
+
+        assert app_client_user.put(f'/rename/{file_id}?new_name=renamed.png').status_code == 200
+        if path.startswith('/file'):
+            assert app_client_user.get(path.format(file_id)).mimetype == 'image/png'
+
+    def test_file_range_if_range(self, app_client_user):
+        file_id, _, _, _, _ = self.add_workspace_with_file(app_client_user)
+
+        etag = app_client_user.get(f'/file/{file_id}/view').headers['ETag']
+
+        matching = app_client_user.get(f'/file/{file_id}/view', headers={'Range': 'bytes=0-3', 'If-Range': etag})
+        assert matching.status_code == 206
+        assert matching.data == b'Test'
+
+        other = app_client_user.get(f'/file/{file_id}/view', headers={'Range': 'bytes=0-3', 'If-Range': '"other"'})
+        assert other.status_code == 200
+        assert other.data == b'Test document'
+
+    def test_add_workspace_multipart(self, app_client_user):
+        from io import BytesIO
+        req_data = {
+            'title': 'Test add title',
+            'description': 'Test add description',
+            'document_name': 'test.txt',
+            'task': str(uuid.uuid4()),
+            'document_data': (BytesIO(b'Multipart document'), 'test.txt'),
+        }
+        response = app_client_user.post('/workspace/add', data=req_data, content_type='multipart/form-data')
+        assert response.status_code == 200
+        workspace_id = response.json['id']
+
+        branch_id = app_client_user.get(f'/get_workspace/{workspace_id}').json['branches'][0]['id']
+        file_id = app_client_user.get(f'/workspace/{workspace_id}/view/{branch_id}').json['document_id']
+        assert app_client_user.get(f'/file/{file_id}/view').data == b'Multipart document'
+
+    def test_upload_file_multipart(self, app_client_user):
+        from io import BytesIO
+        file_id, branch_id, workspace_id, _, _ = self.add_workspace_with_file(app_client_user)
+        content = bytes(range(256)) * 1024
+
+        upload_new_file = app_client_user.post(f'/upload_file/{file_id}', data={
+            'document_name': 'test2.txt',
+            'document_data': (BytesIO(content), 'test2.txt'),
+        }, content_type='multipart/form-data')
+        assert upload_new_file.status_code == 200
+
+        file_id = app_client_user.get(f'/workspace/{workspace_id}/view/{branch_id}').json['document_id']
+        assert app_client_user.get(f'/file/{file_id}/view').data == content
+
+    def test_upload_file_octet_stream(self, app_client_user):
+        file_id, branch_id, workspace_id, _, _ = self.add_workspace_with_file(app_client_user)
+
+        upload_new_file = app_client_user.post(f'/upload_file/{file_id}?document_name=test2.txt',
+                                               data=b'Raw test text', content_type='application/octet-stream')
+        assert upload_new_file.status_code == 200
+
+        file_id = app_client_user.get(f'/workspace/{workspace_id}/view/{branch_id}').json['document_id']
+        assert file_id == upload_new_file.json['id']
+        assert app_client_user.get(f'/file/{file_id}/view').data == b'Raw test text'
+
+    def test_add_document_octet_stream(self, app_client_user):
+        _, branch_id, workspace_id, _, _ = self.add_workspace_with_file(app_client_user)
+
+        response = app_client_user.post(
+            f'/document?workspace_id={workspace_id}&new_document_name=notes&new_document_type=.txt',
+            data=b'Raw notes', content_type='application/octet-stream'
+        )
+        assert response.status_code == 200
+
+        file_id = app_client_user.get(f'/workspace/{workspace_id}/view/{branch_id}').json['document_id']
+        assert file_id == response.json['id']
+        assert app_client_user.get(f'/file/{file_id}/view').data == b'Raw notes'
+
+    def test_upload_file_missing_content(self, app_client_user):
+        file_id, _, _, _, _ = self.add_workspace_with_file(app_client_user)
+
+        response = app_client_user.post(f'/upload_file/{file_id}', data={'document_name': 'test2.txt'},
+                                        content_type='multipart/form-data')
+        assert response.status_code == 400
+
+    @pytest.mark.parametrize('body', [
+        '{"document_name": "test2.txt", "document_data": "data:@file/plain;base64,TmV3IHRlc3QgdGV4dA=="}',
+        '{"document_data": "TmV3IHRlc3QgdGV4dA==", "document_name": "test2.txt"}',
+    ])
+    def test_upload_file_json_stream(self, app_client_user, body):
+        file_id, branch_id, workspace_id, _, _ = self.add_workspace_with_file(app_client_user)
+
+        upload_new_file = app_client_user.post(f'/upload_file/{file_id}', data=body, content_type='application/json')
+        assert upload_new_file.status_code == 200
+
+        file_id = app_client_user.get(f'/workspace/{workspace_id}/view/{branch_id}').json['document_id']
+        assert app_client_user.get(f'/file/{file_id}/view').data == b'New test text'
+
+    def test_upload_file_fields_after_data_spooled(self, app_client_user, monkeypatch):
+        import base64
+        import json
+        from repository.data_store_storage_repository import DataStoreStorageRepository
+        from rest.routes import user
+        file_id, branch_id, workspace_id, _, _ = self.add_workspace_with_file(app_client_user)
+        content = b'New test text' * 100
+
+        spooled = []
+        save_blob_to_cloud = DataStoreStorageRepository.save_blob_to_cloud
+
+        def spying_save_blob_to_cloud(repository, data, length=-1):
+            spooled.append(data._rolled)
+            return save_blob_to_cloud(repository, data, length)
+
+        monkeypatch.setattr(user, 'UPLOAD_SPOOL_MEMORY_SIZE', 64)
+        monkeypatch.setattr(DataStoreStorageRepository, 'save_blob_to_cloud', spying_save_blob_to_cloud)
+        body = json.dumps({'document_data': base64.b64encode(content).decode(), 'document_name': 'test2.txt'})
+        upload_new_file = app_client_user.post(f'/upload_file/{file_id}', data=body, content_type='application/json')
+        assert upload_new_file.status_code == 200
+
+        # The file is on disk, not in memory, until the name that follows it is read
+        assert spooled == [True]
+        assert app_client_user.get(f'/file/{upload_new_file.json["id"]}/view').data == content
+
+    def test_upload_file_invalid_base64(self, app_client_user):
+        file_id, branch_id, workspace_id, _, _ = self.add_workspace_with_file(app_client_user)
+
+        upload_new_file = app_client_user.post(f'/upload_file/{file_id}',
+                                               json={'document_name': 'test2.txt', 'document_data': 'TmV3I'})
+        assert upload_new_file.status_code == 400
+        assert app_client_user.get(f'/workspace/{workspace_id}/view/{branch_id}').json['document_id'] == file_id
@@ -0,0 +1,68 @@
+import uuid
+
+from flask import current_app
+from sqlalchemy import event
+
+from tests.test_new_api.conftest_constants import *
+
+
+class TestRequestLoader:
+
+    @staticmethod
+    def count_queries(action) -> int:
+        statements = []
+
+        def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        engine = current_app.db.engine
+        event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+        try:
+            action()
+        finally:
+            event.remove(engine, 'before_cursor_execute', before_cursor_execute)
+        return len(statements)
+
+    def test_repeated_lookups_hit_database_once(self, client):
+        from database.database import UserModel
+        from repository import request_loader
+
+        with current_app.test_request_context():
+            assert self.count_queries(lambda: request_loader.load(UserModel.id, casual_user_id)) == 1
+            assert self.count_queries(lambda: request_loader.load(UserModel.id, casual_user_id)) == 0
+            missing = str(uuid.uuid4())
+            assert self.count_queries(lambda: request_loader.load(UserModel.id, missing)) == 1
+            assert self.count_queries(lambda: request_loader.load(UserModel.id, missing)) == 0
+
+    def test_malformed_ids_are_not_queried(self, client):
+        from database.database import UserModel
+        from repository import request_loader
+
+        with current_app.test_request_context():
+            keys = ["missing", casual_user_id, "' OR 1=1 --"]
+            assert self.count_queries(lambda: request_loader.load_many(UserModel.id, keys)) == 1
+
+            users = request_loader.load_many(UserModel.id, keys)
+            assert users[0] is None and users[2] is None
+            assert str(users[1].id) == casual_user_id
+            assert self.count_queries(lambda: request_loader.load(UserModel.email, "missing")) == 1
+
+    def test_lookups_are_batched(self, client):
+        from database.database import UserModel
+        from repository import request_loader
+
+        with current_app.test_request_context():
+            keys = [admin_id, casual_user_id, admin_id]
+            assert self.count_queries(lambda: request_loader.load_many(UserModel.id, keys)) == 1
+
+            users = request_loader.load_many(UserModel.id, keys)
+            assert [str(user.id) for user in users] == keys
+
+    def test_commit_drops_memoized_rows(self, client):
+        from database.database import UserModel
+        from repository import request_loader
+
+        with current_app.test_request_context():
+            request_loader.load(UserModel.id, casual_user_id)
+            current_app.db.session.commit()
+            assert self.count_queries(lambda: request_loader.load(UserModel.id, casual_user_id)) == 1
@@ -0,0 +1,30 @@
+from flask import current_app
+from sqlalchemy import inspect, text
+
+
+class TestSchema:
+
+    def test_schema_is_up_to_date(self, client):
+        from database.migrations import MIGRATIONS, upgrade
+
+        latest = MIGRATIONS[-1][0]
+        assert upgrade(current_app.db) == latest
+        with current_app.db.engine.connect() as connection:
+            versions = connection.execute(text('SELECT version FROM schema_version')).scalars().all()
+        assert sorted(versions) == [version for version, _, _ in MIGRATIONS]
+
+    def test_hot_lookup_indexes(self, client):
+        inspector = inspect(current_app.db.engine)
+
+        def indexes(table):
+            return {tuple(index['column_names']): bool(index['unique']) for index in inspector.get_indexes(table)}
+
+        assert indexes('branch')[('workspace_id',)] is False
+        assert indexes('branch')[('document_id',)] is False
+        assert indexes('request')[('source_branch_id',)] is False
+        assert indexes('request')[('target_branch_id',)] is False
+        assert indexes('accesses')[('workspace_id',)] is False
+        assert indexes('accesses')[('access_type', 'value')] is False
+        assert indexes('workspace')[('user_id',)] is False
+        assert indexes('user')[('email',)] is True
+        assert indexes('user')[('username',)] is False
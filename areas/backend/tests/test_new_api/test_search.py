@@ -68,3 +68,31 @@ class TestUserSearch:
         assert search_res[0]['branch_id'] == branch_id
         assert search_res[0]['space_id'] == workspace_id
         assert search_res[0]['name'] == document_name
+
+    def test_search_queries_do_not_grow_with_matches(self, app_client_user):
+        from flask import current_app
+        from sqlalchemy import event
+        from repository.cache import workspace_cache
+
+        def count_search_queries() -> tuple[int, int]:
+            statements = []
+
+            def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+                statements.append(statement)
+
+            workspace_cache.clear()
+            event.listen(current_app.db.engine, 'before_cursor_execute', before_cursor_execute)
+            try:
+                search_response = app_client_user.get('search?name=test.txt')
+            finally:
+                event.remove(current_app.db.engine, 'before_cursor_execute', before_cursor_execute)
+            assert search_response.status_code == 200
+            return len(statements), len(search_response.json['items'])
+
+        self.add_workspace_with_file(app_client_user)
+        queries, items = count_search_queries()
+        assert items == 1
+
+        self.add_workspace_with_file(app_client_user)
+        self.add_workspace_with_file(app_client_user)
+        assert count_search_queries() == (queries, 3)
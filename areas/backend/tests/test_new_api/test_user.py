@@ -42,3 +42,48 @@ class TestAdminUserManagement:
         assert user1_workspace3_id in workspaces_ids
         archived_ws = [ws for ws in response.json['workspaces'] if ws['id'] == user1_workspace1_id]
         assert archived_ws[0]['status'] == WorkSpaceStatus.Archived.value
+
+
+class TestAuthentication:
+
+    @pytest.mark.parametrize('url', ['/get_workspaces', f'/get_workspace/{user1_workspace1_id}',
+                                     f'/accesses/{user1_workspace1_id}'])
+    def test_token_is_checked_once_per_request(self, app_client_user, monkeypatch, url):
+        from service.user_service import UserService
+
+        calls = []
+        authentication = UserService.authentication
+
+        def counting_authentication(self, token):
+            calls.append(token)
+            return authentication(self, token)
+
+        monkeypatch.setattr(UserService, 'authentication', counting_authentication)
+
+        assert app_client_user.get(url).status_code == 200
+        assert len(calls) == 1
+
+        assert app_client_user.get(url).status_code == 200
+        assert len(calls) == 2
+
+    def test_principal_cache_invalidated_on_delete_user(self, client):
+        client.put('/login', json={'email': 'user@mail.com', 'password': 'password'})
+        user_token = client.get_cookie('token').value
+        assert client.get('/get_workspaces').status_code == 200
+        assert client.get('/get_workspaces').status_code == 200
+
+        client.put('/login', json={'email': 'admin@mail.com', 'password': 'password'})
+        stats = client.get('/cache_stats').json['caches']
+        assert [cache for cache in stats if cache['name'] == 'principal'][0]['hits'] > 0
+        assert client.delete(f'/user/{casual_user_id}').status_code == 200
+
+        client.set_cookie('token', user_token)
+        assert client.get('/get_workspaces').status_code == 403
+
+    def test_principal_cached_without_password(self, app_client_user):
+        from repository.cache import principal_cache
+
+        assert app_client_user.get('/get_workspaces').status_code == 200
+        principal = principal_cache.backend.get(principal_cache.key(casual_user_id))
+        assert principal.email == 'user@mail.com'
+        assert principal.password is None
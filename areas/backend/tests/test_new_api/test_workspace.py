@@ -5,7 +5,7 @@ import pytest
 from core.workspace_status import WorkSpaceStatus
 from database.database import WorkspaceModel
 from tests.test_new_api.conftest_constants import user1_workspace1_id, user1_workspace2_id, user1_workspace3_id, \
-    casual_user_id
+    casual_user_id, casual_user_email2
 
 
 class TestUserWorkspace:
@@ -79,6 +79,45 @@ class TestUserWorkspace:
         assert response.status_code == 400
         assert response.json['error'] == 'Invalid request body'
 
+    @pytest.mark.parametrize('method, url', [
+        ('get', '/get_workspace/not-a-uuid'),
+        ('get', f'/workspace/{user1_workspace1_id}/view/not-a-uuid'),
+        ('get', '/accesses/not-a-uuid'),
+        ('get', '/file/not-a-uuid/view'),
+        ('get', '/download/not-a-uuid'),
+        ('get', '/download/1234/presigned'),
+        ('put', '/rename/not-a-uuid?new_name=x'),
+        ('post', '/workspace/not-a-uuid/archive'),
+    ])
+    def test_malformed_id_not_found(self, app_client_user, method, url):
+        from flask import current_app
+        from sqlalchemy import event
+
+        parameters = []
+
+        def before_cursor_execute(conn, cursor, statement, params, context, executemany):
+            parameters.append(repr(params))
+
+        event.listen(current_app.db.engine, 'before_cursor_execute', before_cursor_execute)
+        try:
+            response = getattr(app_client_user, method)(url)
+        finally:
+            event.remove(current_app.db.engine, 'before_cursor_execute', before_cursor_execute)
+
+        assert response.status_code == 404
+        # PostgreSQL would reject a query with the malformed id and fail the transaction
+        assert not any('not-a-uuid' in params or "'1234'" in params for params in parameters)
+        assert app_client_user.get(f'/get_workspace/{user1_workspace1_id}').status_code == 200
+
+    @pytest.mark.parametrize('url, body', [
+        ('add_branch', {'name': 'branch', 'document_id': 'not-a-uuid', 'parent_branch_id': str(uuid.uuid4())}),
+        ('request', {'title': 't', 'description': 'd', 'source_branch_id': 'not-a-uuid',
+                     'target_branch_id': str(uuid.uuid4())}),
+    ])
+    def test_malformed_id_in_body(self, app_client_user, url, body):
+        response = app_client_user.post(f'/workspace/{user1_workspace1_id}/{url}', json=body)
+        assert response.status_code == 400
+
     def test_archive_workspace_1_11(self, app_client_user):
         """
         Номер теста 1.11
@@ -195,3 +234,195 @@ class TestAdminWorkspace:
         assert len(resp['workspaces']) == 2
         unarchived_workspace = [ws for ws in response.json['workspaces'] if ws['id'] == workspace_id]
         assert unarchived_workspace[0]['status'] == WorkSpaceStatus.Active.value
+
+
+class TestWorkspaceQueries:
+
+    @staticmethod
+    def count_queries(app_client_user, url: str) -> int:
+        from flask import current_app
+        from sqlalchemy import event
+
+        statements = []
+
+        def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        engine = current_app.db.engine
+        event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+        try:
+            response = app_client_user.get(url)
+        finally:
+            event.remove(engine, 'before_cursor_execute', before_cursor_execute)
+        assert response.status_code == 200
+        return len(statements)
+
+    @staticmethod
+    def add_workspace(app_client_user, branches: int):
+        req_data = {
+            'title': 'Test add title',
+            'description': 'Test add description',
+            'document_name': 'test.txt',
+            'document_data': 'data:@file/plain;base64,VGVzdCBkb2N1bWVudA==',
+            'task': str(uuid.uuid4())
+        }
+        response = app_client_user.post(f'/workspace/add', json=req_data)
+        assert response.status_code == 200
+        workspace_id = response.json['id']
+        get_response = app_client_user.get(f'/get_workspace/{workspace_id}')
+        branch_id = get_response.json['branches'][0]['id']
+        file_id = app_client_user.get(f'/workspace/{workspace_id}/view/{branch_id}').json['document_id']
+        for index in range(branches):
+            add_branch = app_client_user.post(f'/workspace/{workspace_id}/add_branch', json={
+                'name': f'branch_{index}',
+                'document_id': file_id,
+                'parent_branch_id': branch_id
+            })
+            assert add_branch.status_code == 200
+
+    def test_get_workspaces_queries_do_not_grow(self, app_client_user):
+        self.add_workspace(app_client_user, branches=1)
+        app_client_user.get('/get_workspaces')
+        queries_small = self.count_queries(app_client_user, '/get_workspaces')
+
+        self.add_workspace(app_client_user, branches=3)
+        self.add_workspace(app_client_user, branches=3)
+        queries_big = self.count_queries(app_client_user, '/get_workspaces')
+
+        assert queries_big == queries_small
+
+    def test_get_workspace_queries_do_not_depend_on_owned_workspaces(self, app_client_user):
+        url = f'/get_workspace/{user1_workspace1_id}'
+        app_client_user.get(url)
+        queries_small = self.count_queries(app_client_user, url)
+
+        for _ in range(3):
+            self.add_workspace(app_client_user, branches=1)
+        queries_big = self.count_queries(app_client_user, url)
+
+        assert queries_big == queries_small
+
+    def test_get_workspaces_branches_num(self, app_client_user):
+        self.add_workspace(app_client_user, branches=2)
+        response = app_client_user.get(f'/get_workspaces')
+        assert response.status_code == 200
+        branches_num = {ws['id']: ws['branches_num'] for ws in response.json['workspaces']}
+        assert branches_num.pop(user1_workspace1_id) == 0
+        assert list(branches_num.values()) == [3]
+
+    def test_get_workspaces_access_and_open(self, client, casual_user_2):
+        client.put('/login', json={'email': 'user@mail.com', 'password': 'password'})
+        self.add_workspace(client, branches=1)
+        workspace_id = [ws['id'] for ws in client.get('/get_workspaces').json['workspaces']
+                        if ws['id'] != user1_workspace1_id][0]
+        assert client.put(f'/accesses/{workspace_id}/email/{casual_user_email2}').status_code == 200
+        assert client.put(f'/accesses/{workspace_id}/url').status_code == 200
+
+        client.put('/login', json={'email': casual_user_email2, 'password': 'password'})
+        shared = client.get('/get_workspaces_access').json['workspaces']
+        assert [(ws['id'], ws['branches_num'], ws['access_type']) for ws in shared] == [(workspace_id, 2, 2)]
+        opened = client.get('/get_workspaces_open').json['workspaces']
+        assert [(ws['id'], ws['branches_num']) for ws in opened] == [(workspace_id, 2)]
+
+
+class TestWorkspaceRevision:
+
+    @staticmethod
+    def add_workspace(app_client_user) -> tuple[str, str, str]:
+        TestWorkspaceQueries.add_workspace(app_client_user, branches=0)
+        workspace_id = [ws['id'] for ws in app_client_user.get('/get_workspaces').json['workspaces']
+                        if ws['id'] != user1_workspace1_id][0]
+        branch_id = app_client_user.get(f'/get_workspace/{workspace_id}').json['branches'][0]['id']
+        file_id = app_client_user.get(f'/workspace/{workspace_id}/view/{branch_id}').json['document_id']
+        return workspace_id, branch_id, file_id
+
+    @staticmethod
+    def get_with_statements(app_client_user, url: str, **kwargs):
+        from flask import current_app
+        from sqlalchemy import event
+
+        statements = []
+
+        def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(current_app.db.engine, 'before_cursor_execute', before_cursor_execute)
+        try:
+            return app_client_user.get(url, **kwargs), statements
+        finally:
+            event.remove(current_app.db.engine, 'before_cursor_execute', before_cursor_execute)
+
+    def test_get_workspace_not_modified(self, app_client_user):
+        url = f'/get_workspace/{user1_workspace1_id}'
+        response = app_client_user.get(url)
+        assert response.status_code == 200
+        etag = response.headers['ETag']
+        assert response.cache_control.private
+        assert response.cache_control.no_cache
+
+        not_modified, statements = self.get_with_statements(app_client_user, url, headers={'If-None-Match': etag})
+        assert not_modified.status_code == 304
+        assert not_modified.headers['ETag'] == etag
+        # User row and workspace row, the aggregate is not built
+        assert len(statements) <= 2
+        assert not any('FROM branch' in statement for statement in statements)
+
+    def test_writes_change_etag(self, app_client_user):
+        workspace_id, branch_id, file_id = self.add_workspace(app_client_user)
+        urls = [
+            f'/get_workspace/{workspace_id}',
+            f'/workspace/{workspace_id}/view/{branch_id}',
+            f'/accesses/{workspace_id}',
+        ]
+
+        def etags():
+            responses = [app_client_user.get(url) for url in urls]
+            assert all(response.status_code == 200 for response in responses)
+            return [response.headers['ETag'] for response in responses]
+
+        writes = [
+            lambda: app_client_user.post(f'/workspace/{workspace_id}/add_branch', json={
+                'name': 'branch', 'document_id': file_id, 'parent_branch_id': branch_id
+            }),
+            lambda: app_client_user.put(f'/rename/{file_id}?new_name=renamed.txt'),
+            lambda: app_client_user.put(f'/accesses/{workspace_id}/url'),
+        ]
+        for write in writes:
+            previous = etags()
+            for url, etag in zip(urls, previous):
+                assert app_client_user.get(url, headers={'If-None-Match': etag}).status_code == 304
+
+            assert write().status_code == 200
+            current = etags()
+            assert all(etag != previous_etag for etag, previous_etag in zip(current, previous))
+            for url, etag in zip(urls, previous):
+                assert app_client_user.get(url, headers={'If-None-Match': etag}).status_code == 200
+
+    def test_not_modified_requires_access(self, client, casual_user_2):
+        client.put('/login', json={'email': 'user@mail.com', 'password': 'password'})
+        etag = client.get(f'/get_workspace/{user1_workspace1_id}').headers['ETag']
+
+        client.put('/login', json={'email': casual_user_email2, 'password': 'password'})
+        response = client.get(f'/get_workspace/{user1_workspace1_id}', headers={'If-None-Match': etag})
+        assert response.status_code == 401
+
+    def test_workspace_cached_by_revision(self, app_client_user):
+        workspace_id, branch_id, file_id = self.add_workspace(app_client_user)
+        url = f'/get_workspace/{workspace_id}'
+        first = app_client_user.get(url)
+
+        cached, statements = self.get_with_statements(app_client_user, url)
+        assert cached.status_code == 200
+        assert cached.json == first.json
+        assert not any('FROM branch' in statement for statement in statements)
+
+        assert app_client_user.post(f'/workspace/{workspace_id}/add_branch', json={
+            'name': 'branch', 'document_id': file_id, 'parent_branch_id': branch_id
+        }).status_code == 200
+        assert app_client_user.put(f'/rename/{file_id}?new_name=renamed.txt').status_code == 200
+
+        updated = app_client_user.get(url).json
+        assert len(updated['branches']) == 2
+        assert 'branch' in {branch['name'] for branch in updated['branches']}
+        view = app_client_user.get(f'/workspace/{workspace_id}/view/{branch_id}').json
+        assert view['document'] == 'renamed.txt'
@@ -1,4 +1,4 @@
-from flask import Flask, make_response, jsonify
+from flask import Flask, g, make_response, jsonify
 from flask_cors import CORS
 from flask_swagger_ui import get_swaggerui_blueprint
 from flask_sqlalchemy import SQLAlchemy
@@ -30,6 +30,9 @@ def create_app(testing=False, db_uri=app_db.SQLALCHEMY_DATABASE_URI):
         db = SQLAlchemy(app)
         app.db = db
 
+        from rest.converters import UUIDStringConverter
+        app.url_map.converters['uuid_string'] = UUIDStringConverter
+
         from rest.routes import user, admin
 
         app.register_blueprint(user.get_blueprint())
@@ -38,6 +41,13 @@ def create_app(testing=False, db_uri=app_db.SQLALCHEMY_DATABASE_URI):
         db.create_all()
         db.session.commit()
 
+        from database.migrations import upgrade
+        upgrade(db)
+
+        if not testing:
+            from repository.storage_sweeper import start_storage_sweeper
+            start_storage_sweeper(app)
+
         # Добавление админа
         from controller.user_controller import UserController
         from core.role import Role
@@ -55,6 +65,13 @@ def create_app(testing=False, db_uri=app_db.SQLALCHEMY_DATABASE_URI):
         except AlreadyExistsError:
             print(f'Admin already exists! Credentials: {email} / {password}')
 
+    @app.before_request
+    def reset_request_scope():
+        """Drop per-request state left on flask.g when the app context outlives a single request"""
+        from repository import request_loader
+        g.pop('principal', None)
+        request_loader.clear()
+
     @app.errorhandler(400)
     def handle_400_error(_error):
         """Return a http 400 error to client"""  # pragma: no cover